@@ -0,0 +1,96 @@
+"""
+ANN index over the embeddings table for the compressed VECTOR_STORAGE modes.
+
+cocoindex only builds full-precision vector indexes. With VECTOR_STORAGE=halfvec
+or binary, the index is an HNSW expression index over the quantized embedding,
+while the table keeps the full-precision vectors search_codebase re-ranks with.
+Postgres maintains the index on later updates, so run this once after the
+first `cocoindex update main.py`:
+
+    python ann_index.py
+    python ann_index.py --mode binary --drop-others
+"""
+
+import argparse
+import json
+import os
+import time
+
+import psycopg
+
+from main import table_name, vector_storage
+
+EMBEDDING_DIMENSIONS = 384
+
+# Indexed expression and operator class of the ANN index for each storage mode
+ANN_INDEXES = {
+    "vector": "embedding vector_cosine_ops",
+    "halfvec": f"(embedding::halfvec({EMBEDDING_DIMENSIONS})) halfvec_cosine_ops",
+    "binary": (
+        f"(binary_quantize(embedding)::bit({EMBEDDING_DIMENSIONS})) bit_hamming_ops"
+    ),
+}
+
+
+def index_name(mode: str) -> str:
+    return f"{table_name()}__{mode}_ann"
+
+
+def create_ann_index(
+    conn: psycopg.Connection, mode: str, drop_others: bool = False
+) -> dict:
+    """Build the ANN index for `mode` and return its build time and size"""
+    if mode not in ANN_INDEXES:
+        raise ValueError(
+            f"Unknown vector storage '{mode}', expected one of: {', '.join(ANN_INDEXES)}"
+        )
+
+    if drop_others:
+        for other in ANN_INDEXES:
+            if other != mode:
+                conn.execute(f"DROP INDEX IF EXISTS {index_name(other)}")
+
+    started_at = time.perf_counter()
+    conn.execute(
+        f"CREATE INDEX IF NOT EXISTS {index_name(mode)} "
+        f"ON {table_name()} USING hnsw ({ANN_INDEXES[mode]})"
+    )
+    seconds = time.perf_counter() - started_at
+
+    index_bytes = conn.execute(
+        "SELECT pg_relation_size(%s::regclass)", (index_name(mode),)
+    ).fetchone()[0]
+    return {
+        "mode": mode,
+        "index": index_name(mode),
+        "seconds": seconds,
+        "bytes": index_bytes,
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Build the ANN index for the embeddings table."
+    )
+    parser.add_argument(
+        "--mode",
+        choices=list(ANN_INDEXES),
+        default=vector_storage(),
+        help="Storage mode of the index (default: VECTOR_STORAGE).",
+    )
+    parser.add_argument(
+        "--drop-others",
+        action="store_true",
+        help="Drop the indexes of the other modes.",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    with psycopg.connect(os.getenv("COCOINDEX_DATABASE_URL"), autocommit=True) as conn:
+        print(json.dumps(create_ann_index(conn, args.mode, args.drop_others)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Files the indexing flow indexes, selected by INDEX_LANGUAGES.
+
+Also loaded by process/src/agents/tools/codebase_index.py, which re-indexes
+the files the agents edit, so that both select the same files; it therefore
+only uses the standard library.
+"""
+
+import fnmatch
+
+DEFAULT_LANGUAGES = "python,text"
+
+# File patterns indexed for each language that can be enabled in INDEX_LANGUAGES
+LANGUAGE_PATTERNS = {
+    "python": ["*.py"],
+    "javascript": ["*.js", "*.jsx", "*.mjs", "*.cjs"],
+    "typescript": ["*.ts", "*.tsx"],
+    "java": ["*.java"],
+    "kotlin": ["*.kt", "*.kts"],
+    "csharp": ["*.cs"],
+    "go": ["*.go"],
+    "rust": ["*.rs"],
+    "ruby": ["*.rb"],
+    "php": ["*.php"],
+    "c": ["*.c", "*.h"],
+    "cpp": ["*.cpp", "*.cc", "*.hpp"],
+    "sql": ["*.sql"],
+    "markdown": ["*.md"],
+    "text": ["*.txt"],
+    "yaml": ["*.yaml", "*.yml"],
+    "toml": ["*.toml"],
+    "json": ["*.json"],
+}
+
+# Dependency and build directories skipped besides hidden ones
+EXCLUDED_DIRS = ("node_modules", "venv", "__pycache__", "build", "dist")
+EXCLUDED_PATTERNS = ["**/.*", *(f"**/{name}" for name in EXCLUDED_DIRS)]
+
+
+def included_patterns(languages: str) -> list[str]:
+    """File patterns of a comma-separated INDEX_LANGUAGES value"""
+    patterns = []
+    for language in languages.split(","):
+        language = language.strip().lower()
+        if not language:
+            continue
+        if language not in LANGUAGE_PATTERNS:
+            raise ValueError(
+                f"Unknown language '{language}' in INDEX_LANGUAGES, "
+                f"expected one of: {', '.join(LANGUAGE_PATTERNS)}"
+            )
+        patterns.extend(LANGUAGE_PATTERNS[language])
+    return patterns
+
+
+def is_excluded_dir(name: str) -> bool:
+    return name.startswith(".") or name in EXCLUDED_DIRS
+
+
+def is_indexed(path: str, languages: str) -> bool:
+    """Whether a "/"-separated path relative to the input directory is indexed"""
+    *dirs, name = path.split("/")
+    if name.startswith(".") or any(is_excluded_dir(d) for d in dirs):
+        return False
+    return any(
+        fnmatch.fnmatch(path, pattern) for pattern in included_patterns(languages)
+    )
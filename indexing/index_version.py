@@ -0,0 +1,62 @@
+"""
+Version counter of the embeddings table, used to invalidate cached searches.
+
+Installs a statement-level trigger that increments the table's row in
+code_index_versions whenever rows are inserted, updated or deleted, so the
+version bumps with every change the indexing flow commits. search_codebase
+only caches results while the trigger is installed. Run after
+`cocoindex setup main.py` (and again after a `--reset`, which recreates the
+table):
+
+    python index_version.py
+"""
+
+import os
+
+import psycopg
+
+from main import table_name
+
+VERSION_TABLE = "code_index_versions"
+VERSION_TRIGGER = "bump_code_index_version"
+
+
+def install_version_trigger(conn: psycopg.Connection):
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {VERSION_TABLE} (
+            table_name TEXT PRIMARY KEY,
+            version BIGINT NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION {VERSION_TRIGGER}() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO {VERSION_TABLE} (table_name, version)
+            VALUES (TG_TABLE_NAME, 1)
+            ON CONFLICT (table_name)
+            DO UPDATE SET version = {VERSION_TABLE}.version + 1;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE OR REPLACE TRIGGER {VERSION_TRIGGER}
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table_name()}
+        FOR EACH STATEMENT EXECUTE FUNCTION {VERSION_TRIGGER}()
+        """
+    )
+
+
+def main():
+    with psycopg.connect(os.getenv("COCOINDEX_DATABASE_URL"), autocommit=True) as conn:
+        install_version_trigger(conn)
+    print(f"Version trigger installed on {table_name()}")
+
+
+if __name__ == "__main__":
+    main()
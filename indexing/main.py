@@ -1,12 +1,48 @@
+import re
+
 import cocoindex
 from numpy.typing import NDArray
 import numpy as np
 from dotenv import load_dotenv
 import os
 
+from file_selection import DEFAULT_LANGUAGES, EXCLUDED_PATTERNS, included_patterns
+
 load_dotenv()
 
 
+def project_id() -> str | None:
+    """
+    Repository/project the index is built for (PROJECT_ID), normalised so it
+    can be used in table names.
+    """
+    value = os.getenv("PROJECT_ID", "").strip().lower()
+    return re.sub(r"[^a-z0-9_]+", "_", value) or None
+
+
+def flow_name() -> str:
+    """
+    Every project gets its own flow and therefore its own table
+    (<flow name>__code_embeddings) with its own vector index.
+    """
+    project = project_id()
+    return f"CodeEmbedding_{project}" if project else "CodeEmbedding"
+
+
+def table_name() -> str:
+    """Postgres table of the code_embeddings export, as named by cocoindex"""
+    return f"{flow_name()}__code_embeddings".lower()
+
+
+def vector_storage() -> str:
+    """
+    How vectors are indexed for the ANN stage (VECTOR_STORAGE). With "vector"
+    cocoindex builds a full-precision index; "halfvec" and "binary" indexes are
+    built by ann_index.py instead.
+    """
+    return os.getenv("VECTOR_STORAGE", "vector").strip().lower()
+
+
 @cocoindex.transform_flow()
 def code_to_embedding(
     text: cocoindex.DataSlice[str],
@@ -21,7 +57,7 @@ def code_to_embedding(
     )
 
 
-@cocoindex.flow_def(name="CodeEmbedding")
+@cocoindex.flow_def(name=flow_name())
 def code_embedding_flow(
     flow_builder: cocoindex.FlowBuilder, data_scope: cocoindex.DataScope
 ) -> None:
@@ -31,8 +67,10 @@ def code_embedding_flow(
     data_scope["files"] = flow_builder.add_source(
         cocoindex.sources.LocalFile(
             path=os.getenv("INPUT_DIR_PATH"),
-            included_patterns=["*.py", "*.txt"],
-            excluded_patterns=[".venv/**"],
+            included_patterns=included_patterns(
+                os.getenv("INDEX_LANGUAGES", DEFAULT_LANGUAGES)
+            ),
+            excluded_patterns=EXCLUDED_PATTERNS,
         )
     )
     code_embeddings = data_scope.add_collector()
@@ -63,10 +101,14 @@ def code_embedding_flow(
         "code_embeddings",
         cocoindex.targets.Postgres(),
         primary_key_fields=["filename", "location"],
-        vector_indexes=[
-            cocoindex.VectorIndexDef(
-                field_name="embedding",
-                metric=cocoindex.VectorSimilarityMetric.COSINE_SIMILARITY,
-            )
-        ],
+        vector_indexes=(
+            [
+                cocoindex.VectorIndexDef(
+                    field_name="embedding",
+                    metric=cocoindex.VectorSimilarityMetric.COSINE_SIMILARITY,
+                )
+            ]
+            if vector_storage() == "vector"
+            else []
+        ),
     )
@@ -1,10 +1,10 @@
 from typing import List
-from deepagents import create_deep_agent
 from pydantic import BaseModel, Field
 
 from agents.tools.check_errors_tool import CheckErrorsTool
-from utils.getenv_bool import getenv_bool
 from utils.create_model import create_model
+from utils.model_cascade import model_cascade_middleware
+from utils.settings import get_settings
 
 
 class CodeQualityReport(BaseModel):
@@ -16,10 +16,6 @@ class CodeQualityReport(BaseModel):
     )
 
 
-tools = [
-    CheckErrorsTool(),
-]
-
 system_prompt = """You are a code quality agent specialized in evaluating code quality and detecting critical errors in the codebase.
 
 YOUR ROLE:
@@ -74,12 +70,19 @@ IMPORTANT GUIDELINES:
 Remember: Your primary task is to detect and report all critical errors found by the static analysis tool."""
 
 
-def create_code_quality_agent(model_name: str):
+def create_code_quality_agent(model_name: str, root_dir: str | None = None):
+    from deepagents import create_deep_agent
+
+    tools = [
+        CheckErrorsTool(root_dir=root_dir),
+    ]
+
     return create_deep_agent(
-        model=create_model(model_name),
+        model=create_model(model_name, agent_name="code_quality_agent"),
         tools=tools,
         name="code_quality_agent",
-        debug=getenv_bool("DEBUG"),
+        middleware=model_cascade_middleware("code_quality_agent"),
+        debug=get_settings().debug,
         system_prompt=system_prompt,
         response_format=CodeQualityReport,
     )
@@ -1,26 +1,14 @@
-from deepagents import create_deep_agent
-from deepagents.backends import FilesystemBackend
-
+from agents.tools.read_artifact_tool import ReadArtifactTool
+from agents.tools.apply_patch_tool import ApplyPatchTool
+from agents.tools.run_tests_tool import RunTestsTool
 from agents.tools.terminal_tool import TerminalTool
 from agents.tools.create_folder_tool import CreateFolderCommandTool
 from agents.tools.delete_folder_tool import DeleteFolderCommandTool
 from agents.tools.list_codebase_tool import ListCodebaseTool
 from agents.tools.search_codebase_tool import SearchCodebaseTool
-from utils.getenv_bool import getenv_bool
 from utils.create_model import create_model
-from dotenv import load_dotenv
-import os
-
-load_dotenv()
-
-tools = [
-    ListCodebaseTool(),
-    TerminalTool(),
-    CreateFolderCommandTool(),
-    DeleteFolderCommandTool(),
-    SearchCodebaseTool(),
-]
-
+from utils.model_cascade import model_cascade_middleware
+from utils.settings import get_settings
 
 system_prompt = """You are an implementation agent specialized in writing high-quality code based on task descriptions and requirements.
 
@@ -32,6 +20,8 @@ Your primary responsibility is to implement code changes, features, or modificat
 
 AVAILABLE TOOLS:
 - list_codebase: Recursively list all projects files and folders. Use this at the beginning of every session to understand the workspace layout. ALWAYS use list_codebase instead of ls, dir, or any other file listing commands.
+- apply_patch: Apply a unified diff or SEARCH/REPLACE blocks to one or more files in a single atomic call. Prefer it over rewriting whole files when changing existing files; if some hunks do not apply, nothing is changed and the failing hunks are reported, so re-read those parts and retry.
+- run_tests: Run only the tests affected by your changes (selected through the import graph), in parallel, and get pass/fail results with durations. Use it to validate changes instead of running the whole test suite through terminal_tool.
 - terminal_tool: Execute terminal commands to install dependencies or perform any shell operations necessary for development.
 - create_folder_tool: Create one or many folders using Windows md. Input: array of relative paths (e.g., ["src/components", "src/utils"]).
 - delete_folder_tool: Delete a single folder using Windows rmdir. Input: a single relative path (e.g., "src/components").
@@ -84,7 +74,7 @@ IMPORTANT OPERATIONAL GUIDELINES:
 - **File Operations**:
   - Read existing files before modifying them
   - Preserve existing functionality unless explicitly required to change it
-  - Make incremental changes when possible
+  - Make incremental changes when possible, with apply_patch instead of rewriting whole files
 
 - **Error Analysis**:
   - When terminal commands return errors, read STDERR carefully
@@ -105,15 +95,30 @@ OUTPUT EXPECTATIONS:
 Remember: Your code will be automatically evaluated, so prioritize correctness, quality, and following best practices"""
 
 
-def create_implementation_agent(model_name: str):
+def create_implementation_agent(model_name: str, root_dir: str | None = None):
+    from deepagents import create_deep_agent
+    from deepagents.backends import FilesystemBackend
+
+    tools = [
+        ListCodebaseTool(root_dir=root_dir),
+        TerminalTool(root_dir=root_dir),
+        ApplyPatchTool(root_dir=root_dir),
+        RunTestsTool(root_dir=root_dir),
+        CreateFolderCommandTool(root_dir=root_dir),
+        DeleteFolderCommandTool(root_dir=root_dir),
+        SearchCodebaseTool(),
+        ReadArtifactTool(),
+    ]
+
     return create_deep_agent(
-        model=create_model(model_name),
+        model=create_model(model_name, agent_name="implementation_agent"),
         tools=tools,
         name="implementation_agent",
-        debug=getenv_bool("DEBUG"),
+        middleware=model_cascade_middleware("implementation_agent"),
+        debug=get_settings().debug,
         system_prompt=system_prompt,
         backend=FilesystemBackend(
-            root_dir=os.getenv("INPUT_DIR_PATH"),
+            root_dir=root_dir or get_settings().input_dir_path,
             virtual_mode=True,
         ),
     )
@@ -1,63 +1,48 @@
-from deepagents import CompiledSubAgent, create_deep_agent
 from agents.development.workflow import create_development_workflow
-from utils.getenv_bool import getenv_bool
+from agents.tools.get_task_tool import GetTaskTool
+from agents.tools.next_ready_task_tool import NextReadyTaskTool
+from agents.tools.set_task_status_tool import SetTaskStatusTool
 from utils.create_model import create_model
-from deepagents.backends import FilesystemBackend
-from dotenv import load_dotenv
-import os
+from utils.model_cascade import model_cascade_middleware
+from utils.settings import get_settings
 
-load_dotenv()
-
-tools = []
+tools = [NextReadyTaskTool(), GetTaskTool(), SetTaskStatusTool()]
 
 system_prompt = """You are a task iterator agent responsible for managing and executing tasks from the execution plan.
 
-Your workflow is as follows:
-
-1. **Read the plan**: Read `/output/plan.json` to see all available tasks.
+The plan is kept in a task store. Never read or edit `/output/plan.json` directly; use the task tools instead.
 
-2. **Select the next task**: Choose the next task to execute based on:
-   - Status must be "todo" or "in progress" (not "done")
-   - All task dependencies (listed in the `dependencies` array) must have status "done"
-   - Consider priority when multiple tasks are available
-   - If no tasks meet criteria, inform that all tasks are completed or blocked
+Your workflow is as follows:
 
-3. **Update task status**: When you select a task:
-   - Read the current `/output/plan.json`
-   - Find the task by its `id`
-   - Update its `status` field to "in progress"
-   - Edit the updated JSON back to `/output/plan.json`
-   - To update the plan.json file, use the edit_file tool
+1. **Select the next task**: Call `next_ready_task`.
+   - It returns the first task whose dependencies are all "done" and marks it as "in progress"
+   - If it reports that no tasks are ready, inform that all tasks are completed or blocked and stop
 
-4. **Execute the task**: Use the `development_workflow` subagent to execute the selected task:
+2. **Execute the task**: Use the `development_workflow` subagent to execute the selected task:
    - Pass the full task description including: id, title, description, and any relevant context
    - The subagent will handle planning, implementation, and code quality checks
    - Wait for the subagent to complete before proceeding
 
-5. **Mark task as done**: After successful execution:
-   - Read `/output/plan.json` again
-   - Find the task by its `id`
-   - Update its `status` field to "done"
-   - Edit the updated JSON back to `/output/plan.json`
-   - To update the plan.json file, use the edit_file tool
+3. **Record the result**: Call `set_task_status` with the task `id`:
+   - "done" after successful execution
+   - "failed" if the subagent could not complete the task
 
-6. **Repeat**: Continue with the next iteration, selecting the next available task.
+4. **Repeat**: Continue with the next iteration by calling `next_ready_task` again.
 
 IMPORTANT GUIDELINES:
-- Always read the plan.json file before making any updates to ensure you have the latest state
-- Always update status in the plan.json before starting to work on the task using development_workflow subagent
-- When updating plan.json, preserve the entire JSON structure and formatting
-- Only update the status field of the specific task you're working on
-- Always verify dependencies are satisfied before selecting a task
-- If a task fails during execution, you may need to handle it (mark as failed or retry)
+- Only change the status of the task you're working on, and only through `set_task_status`
+- Use `get_task` if you need to look up a task (e.g. a dependency) by its id
 - Continue iterating until all tasks are completed or no more tasks can be executed
-- If you didn't find the plan.json file, just end the conversation with the message "No plan.json file found"
-- NEVER use ls, dir, or any other file listing commands. Use read_file or other available file operations instead.
+- If `next_ready_task` reports that no plan.json file was found, just end the conversation with the message "No plan.json file found"
+- NEVER use ls, dir, or any other file listing commands.
 
-Start by reading `/output/plan.json` and selecting the first available task."""
+Start by calling `next_ready_task`."""
 
 
 def create_task_iterator_agent(model_name: str):
+    from deepagents import CompiledSubAgent, create_deep_agent
+    from deepagents.backends import FilesystemBackend
+
     development_workflow = create_development_workflow()
     development_workflow_subagent = CompiledSubAgent(
         name="development_workflow",
@@ -66,14 +51,15 @@ def create_task_iterator_agent(model_name: str):
     )
 
     return create_deep_agent(
-        model=create_model(model_name),
+        model=create_model(model_name, agent_name="task_iterator_agent"),
         tools=tools,
         name="task_iterator_agent",
-        debug=getenv_bool("DEBUG"),
+        middleware=model_cascade_middleware("task_iterator_agent"),
+        debug=get_settings().debug,
         system_prompt=system_prompt,
         subagents=[development_workflow_subagent],
         backend=FilesystemBackend(
-            root_dir=os.getenv("DATA_DIR_PATH"),
+            root_dir=get_settings().data_dir_path,
             virtual_mode=True,
         ),
     )
@@ -0,0 +1,282 @@
+from concurrent.futures import FIRST_COMPLETED, wait
+from uuid import uuid4
+import shutil
+import subprocess
+import tempfile
+import threading
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+
+from agents.development.workflow import create_development_workflow
+from agents.planning.plan_store import PlanStore
+from utils.settings import get_settings
+import os
+
+
+class TaskScheduler:
+    """
+    Deterministic scheduler for the tasks in the plan store.
+
+    Tasks whose dependencies are all done run concurrently (up to max_workers),
+    each in its own git worktree of the input repository. Finished worktrees are
+    merged back into the input repository in dependency order; a merge conflict
+    marks the task as failed and leaves its dependents blocked.
+
+    Task branches are named devflow/<run id>/task-<id>, so existing branches of
+    the repository are never reset or deleted. Git commands that touch the
+    input repository are serialised, as they share its index and refs.
+    """
+
+    def __init__(self, store: PlanStore, repo_dir: str, max_workers: int | None = None):
+        self.store = store
+        self.repo_dir = repo_dir
+        self.max_workers = max_workers or get_settings().development_max_workers
+        self.run_id = uuid4().hex[:8]
+        self._git_lock = threading.Lock()
+
+    def run(self) -> str:
+        """
+        Run all runnable tasks and return a short summary.
+        """
+        tasks = self.store.list_tasks()
+        order = topological_order(tasks)
+        position = {task_id: i for i, task_id in enumerate(order)}
+        by_id = {str(task["id"]): task for task in tasks}
+
+        use_worktrees = self._can_use_worktrees()
+        max_workers = self.max_workers if use_worktrees else 1
+
+        results = {}
+        running = {}
+        # Tasks run with this node's context, so they inherit the run's config,
+        # callbacks (e.g. telemetry) and settings
+        with ContextThreadPoolExecutor(max_workers=max_workers) as executor:
+            while True:
+                for task_id in order:
+                    if len(running) >= max_workers:
+                        break
+                    task = by_id[task_id]
+                    if task_id in running or not self._is_ready(task, by_id):
+                        continue
+
+                    self._set_status(task, "in progress")
+                    running[task_id] = executor.submit(
+                        self._run_task, task, use_worktrees
+                    )
+
+                if not running:
+                    break
+
+                finished, _ = wait(running.values(), return_when=FIRST_COMPLETED)
+                finished_ids = sorted(
+                    (task_id for task_id, f in running.items() if f in finished),
+                    key=position.get,
+                )
+                for task_id in finished_ids:
+                    future = running.pop(task_id)
+                    results[task_id] = self._complete_task(
+                        by_id[task_id], future.result(), use_worktrees
+                    )
+
+        lines = [f"- Task {task_id}: {result}" for task_id, result in results.items()]
+        blocked = [
+            task_id
+            for task_id in order
+            if by_id[task_id].get("status") not in ("done", "failed")
+        ]
+        if blocked:
+            lines.append(f"- Blocked tasks: {', '.join(blocked)}")
+        return "Task scheduling finished:\n" + "\n".join(lines)
+
+    def _run_task(self, task: dict, use_worktree: bool) -> dict:
+        worktree_dir = None
+        branch = None
+        try:
+            if use_worktree:
+                worktree_dir = tempfile.mkdtemp(prefix=f"task-{task['id']}-")
+                new_branch = f"devflow/{self.run_id}/task-{task['id']}"
+                self._git(["worktree", "add", "-b", new_branch, worktree_dir])
+                branch = new_branch
+
+            workflow = create_development_workflow(root_dir=worktree_dir)
+            result = workflow.invoke({"messages": [HumanMessage(describe_task(task))]})
+            return {
+                "success": result.get("error") is None,
+                "worktree_dir": worktree_dir,
+                "branch": branch,
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "worktree_dir": worktree_dir,
+                "branch": branch,
+            }
+
+    def _complete_task(self, task: dict, outcome: dict, use_worktree: bool) -> str:
+        try:
+            if not outcome["success"]:
+                self._set_status(task, "failed")
+                error = outcome.get("error")
+                return f"failed: {error}" if error else "failed"
+
+            if use_worktree:
+                error = self._merge(task, outcome["worktree_dir"], outcome["branch"])
+                if error:
+                    self._set_status(task, "failed")
+                    return error
+
+            self._set_status(task, "done")
+            return "done"
+        finally:
+            if use_worktree and outcome["worktree_dir"]:
+                self._remove_worktree(outcome["worktree_dir"], outcome["branch"])
+
+    def _merge(self, task: dict, worktree_dir: str, branch: str) -> str | None:
+        """
+        Commit the worktree changes and merge them back.
+
+        Returns:
+            None on success, otherwise why the task could not be merged
+        """
+        add = self._git(["add", "-A"], worktree_dir)
+        if add.returncode:
+            return f"git add failed: {add.stderr.strip()}"
+        if self._git(["diff", "--cached", "--quiet"], worktree_dir).returncode:
+            # Fails e.g. without user.name/user.email or on a pre-commit hook
+            commit = self._git(
+                ["commit", "-m", f"Task {task['id']}: {task.get('title', '')}"],
+                worktree_dir,
+            )
+            if commit.returncode:
+                return f"git commit failed: {(commit.stderr or commit.stdout).strip()}"
+
+        merge = self._git(["merge", "--no-ff", "--no-edit", branch])
+        if merge.returncode == 0:
+            self._reindex_merge()
+            return None
+
+        conflicts = self._git(["diff", "--name-only", "--diff-filter=U"]).stdout.split()
+        self._git(["merge", "--abort"])
+        if conflicts:
+            return f"merge conflict in {', '.join(conflicts)}"
+        return f"merge failed: {merge.stderr.strip()}"
+
+    def _reindex_merge(self):
+        """Re-index the files changed by the merge (see create_generate)"""
+        settings = get_settings()
+        if not settings.reindex_on_edit or not settings.cocoindex_database_url:
+            return
+        from agents.tools.codebase_index import reindex_paths
+
+        # Relative to the input directory, which may be below the repository root
+        diff = self._git(
+            ["diff", "--name-only", "--relative", "-z", "ORIG_HEAD", "HEAD"]
+        )
+        changed = [path for path in diff.stdout.split("\0") if path]
+        if changed:
+            reindex_paths(changed, root_dir=self.repo_dir)
+
+    def _remove_worktree(self, worktree_dir: str, branch: str | None):
+        self._git(["worktree", "remove", "--force", worktree_dir])
+        # Only the branch this run created for the task
+        if branch:
+            self._git(["branch", "-D", branch])
+        shutil.rmtree(worktree_dir, ignore_errors=True)
+
+    def _git(self, args: list[str], cwd: str | None = None):
+        """Run git in the input repository (or one of its worktrees), one at a time"""
+        with self._git_lock:
+            return git(args, cwd or self.repo_dir, check=False)
+
+    def _can_use_worktrees(self) -> bool:
+        """Worktrees need a git repository without uncommitted changes"""
+        inside = git(["rev-parse", "--is-inside-work-tree"], self.repo_dir, check=False)
+        if inside.returncode != 0:
+            return False
+        status = git(["status", "--porcelain"], self.repo_dir, check=False)
+        return status.returncode == 0 and not status.stdout.strip()
+
+    def _is_ready(self, task: dict, by_id: dict[str, dict]) -> bool:
+        if task.get("status") not in ("todo", "in progress"):
+            return False
+        return all(
+            by_id[str(dependency)].get("status") == "done"
+            for dependency in task.get("dependencies", [])
+        )
+
+    def _set_status(self, task: dict, status: str):
+        task["status"] = status
+        self.store.set_status(task["id"], status)
+
+
+def topological_order(tasks: list[dict]) -> list[str]:
+    """
+    Order task ids so that every task comes after its dependencies.
+
+    Ties are broken by the task's position in the plan, so the order is stable.
+
+    Raises:
+        ValueError: If a dependency is unknown or the dependencies form a cycle
+    """
+    ids = [str(task["id"]) for task in tasks]
+    dependencies = {
+        str(task["id"]): {str(d) for d in task.get("dependencies", [])}
+        for task in tasks
+    }
+    for task_id, deps in dependencies.items():
+        unknown = deps - set(ids)
+        if unknown:
+            raise ValueError(
+                f"Task {task_id} depends on unknown task(s): {', '.join(sorted(unknown))}"
+            )
+
+    order = []
+    remaining = list(ids)
+    while remaining:
+        ready = [
+            task_id for task_id in remaining if dependencies[task_id] <= set(order)
+        ]
+        if not ready:
+            raise ValueError(f"Dependency cycle between tasks: {', '.join(remaining)}")
+        order.extend(ready)
+        remaining = [task_id for task_id in remaining if task_id not in ready]
+    return order
+
+
+def describe_task(task: dict) -> str:
+    return (
+        f"Task {task['id']}: {task.get('title', '')}\n\n"
+        f"{task.get('description', '')}"
+    ).strip()
+
+
+def git(args: list[str], cwd: str, check: bool = True) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        ["git", *args], cwd=cwd, capture_output=True, text=True, check=check
+    )
+
+
+def create_task_scheduler():
+    """Graph node that runs the tasks from the plan store"""
+
+    def task_scheduler(state):
+        try:
+            store = PlanStore.open_default()
+            if not os.path.exists(store.plan_path):
+                return {"messages": [AIMessage("No plan.json file found")]}
+
+            scheduler = TaskScheduler(store, get_settings().input_dir_path)
+            return {"messages": [AIMessage(scheduler.run())]}
+        except (ValueError, KeyError, TypeError) as e:
+            # The planner's error object, an unknown dependency or a cycle
+            return {
+                "messages": [
+                    AIMessage(
+                        f"Invalid plan.json, no task was run: {type(e).__name__}: {e}"
+                    )
+                ]
+            }
+
+    return task_scheduler
@@ -1,96 +1,283 @@
-from langchain_core.messages import AIMessage
+from datetime import datetime, timezone
+import json
+
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import MessagesState
 from langgraph.graph import END, StateGraph, START
 
 from agents.development.code_quality_agent import create_code_quality_agent
 from agents.development.implementation_agent import create_implementation_agent
-from dotenv import load_dotenv
+from utils.compact_messages import (
+    REFLECTION_MESSAGE_NAME,
+    SUMMARY_MESSAGE_NAME,
+    compact_messages,
+)
+from utils.fingerprint_errors import fingerprint_errors, pyright_errors
+from utils.settings import get_settings
 import os
 
-load_dotenv()
-
 
 class DevelopmentState(MessagesState):
     error: str | None
     iterations: int
+    tokens_saved: int
+    error_fingerprints: list[str]
+    escalations: int
+    stop_reason: str | None
 
 
 MAX_ITERATIONS = 25
 
-implementation_agent = create_implementation_agent(
-    model_name=os.getenv("IMPLEMENTATION_AGENT_MODEL_NAME")
-)
-code_quality_agent = create_code_quality_agent(
-    model_name=os.getenv("CODE_QUALITY_AGENT_MODEL_NAME")
-)
+CHECK_PASSED_MESSAGE = "Code Quality Check Passed"
+
+
+def create_generate(implementation_agent, root_dir: str | None):
+    """
+    Generate step that keeps the embedding index in sync with the agent's edits.
+
+    Files changed by the step are re-indexed once it finishes, when
+    REINDEX_ON_EDIT is set and the agent works in INPUT_DIR_PATH itself; edits
+    made in task worktrees are re-indexed once they are merged.
+    """
+    settings = get_settings()
+    reindex = (
+        settings.reindex_on_edit
+        and bool(settings.cocoindex_database_url)
+        and (root_dir is None or same_path(root_dir, settings.input_dir_path))
+    )
+    if not reindex:
+        return implementation_agent
+
+    def generate(state: DevelopmentState, config: RunnableConfig):
+        from agents.tools.codebase_index import (
+            changed_files,
+            reindex_paths,
+            snapshot_files,
+        )
+
+        before = snapshot_files(settings.input_dir_path)
+        result = implementation_agent.invoke(state, config)
+        changed = changed_files(before, snapshot_files(settings.input_dir_path))
+        if changed:
+            # Latency and errors are recorded in reindex_stats
+            reindex_paths(changed)
+        return result
+
+    return generate
+
+
+def same_path(a: str, b: str | None) -> bool:
+    return b is not None and os.path.realpath(a) == os.path.realpath(b)
 
 
-def check(state: DevelopmentState) -> DevelopmentState:
-    quality_report = code_quality_agent.invoke({"messages": state["messages"]})
-    report_data = quality_report.get("structured_output", {})
-    has_critical_issues = report_data.get("has_critical_issues", False)
-    errors = report_data.get("errors", [])
+def create_check(code_quality_agent):
+    def check(state: DevelopmentState) -> DevelopmentState:
+        quality_report = code_quality_agent.invoke({"messages": state["messages"]})
+        report_data = quality_report.get("structured_output", {})
+        has_critical_issues = report_data.get("has_critical_issues", False)
+        errors = report_data.get("errors", [])
 
-    if has_critical_issues:
-        error_message = f"Critical code quality issues found:\n"
-        for error in errors:
-            error_message += f"- {error}\n"
+        if has_critical_issues:
+            error_message = f"Critical code quality issues found:\n"
+            for error in errors:
+                error_message += f"- {error}\n"
+
+            # The agent words the same errors differently from one check to the
+            # next, so the pyright diagnostics it was given are fingerprinted
+            diagnostics = last_pyright_errors(quality_report.get("messages", []))
+            return {
+                **state,
+                "error": f"Code Quality Check Failed:\n{error_message}",
+                "error_fingerprints": state.get("error_fingerprints", [])
+                + [fingerprint_errors(diagnostics or errors)],
+            }
 
         return {
             **state,
-            "error": f"Code Quality Check Failed:\n{error_message}",
+            "error": None,
+            "messages": state["messages"] + [AIMessage(content=CHECK_PASSED_MESSAGE)],
         }
 
+    return check
+
+
+def last_pyright_errors(messages: list[BaseMessage]) -> list[str]:
+    """Errors of the latest check_errors_tool run among the agent's messages"""
+    for message in reversed(messages):
+        if isinstance(message, ToolMessage) and message.name == "check_errors_tool":
+            return pyright_errors(message.text)
+    return []
+
+
+def reflect(state: DevelopmentState):
+    reflection = f"""
+    Reflection: 
+    Errors detected during code quality check: {state['error']}
+
+    Analyze the errors and fix the code accordingly.
+    """
     return {
         **state,
-        "error": None,
         "messages": state["messages"]
-        + [AIMessage(content=f"Code Quality Check Passed")],
+        + [
+            AIMessage(reflection, name=REFLECTION_MESSAGE_NAME),
+        ],
+        "iterations": state.get("iterations", 0) + 1,
     }
 
 
-def reflect(state: DevelopmentState):
+def escalate(state: DevelopmentState):
     reflection = f"""
-    Reflection: 
+    Reflection (no progress):
     Errors detected during code quality check: {state['error']}
 
-    Analyze the errors and fix the code accordingly.
+    These exact errors were already reported in an earlier attempt, so the previous approach is not working.
+    Do not repeat the same fix. Re-read the affected files, revert changes that introduced the errors if needed,
+    and take a different approach to resolve them.
     """
     return {
         **state,
         "messages": state["messages"]
         + [
-            AIMessage(reflection),
+            AIMessage(reflection, name=REFLECTION_MESSAGE_NAME),
+        ],
+        "iterations": state.get("iterations", 0) + 1,
+        "escalations": state.get("escalations", 0) + 1,
+    }
+
+
+def compact(state: DevelopmentState):
+    """Keep the history within the token budget before the next generate step"""
+    messages, tokens_saved = compact_messages(
+        state["messages"], get_settings().development_history_token_budget
+    )
+    if not messages:
+        return {}
+
+    return {
+        "messages": messages,
+        "tokens_saved": state.get("tokens_saved", 0) + tokens_saved,
+    }
+
+
+def report(state: DevelopmentState):
+    if state["error"] is None:
+        status, stop_reason = "passed", None
+    elif state.get("iterations", 0) >= MAX_ITERATIONS:
+        status, stop_reason = "failed", "max iterations"
+    else:
+        status, stop_reason = "aborted", "no progress"
+
+    fingerprints = state.get("error_fingerprints", [])
+    stats = {
+        "status": status,
+        "stop_reason": stop_reason,
+        "iterations": state.get("iterations", 0),
+        "escalations": state.get("escalations", 0),
+        "error_sets": len(fingerprints),
+        "distinct_error_sets": len(set(fingerprints)),
+        "tokens_saved": state.get("tokens_saved", 0),
+    }
+    record_stats(stats)
+
+    # This message is the result the task iterator gets back, so it carries the
+    # remaining errors or the implementation agent's summary
+    outcome = state["error"] or last_agent_message(state["messages"])
+    return {
+        "stop_reason": stop_reason,
+        "messages": [
+            AIMessage(
+                content="Development task finished: "
+                + ", ".join(f"{key}={value}" for key, value in stats.items())
+                + (f"\n\n{outcome}" if outcome else "")
+            )
         ],
-        "iterations": state["iterations"] + 1,
     }
 
 
+def last_agent_message(messages: list[BaseMessage]) -> str:
+    """Text of the implementation agent's latest answer"""
+    for message in reversed(messages):
+        if (
+            isinstance(message, AIMessage)
+            and message.name not in (REFLECTION_MESSAGE_NAME, SUMMARY_MESSAGE_NAME)
+            and message.text.strip()
+            and message.text != CHECK_PASSED_MESSAGE
+        ):
+            return message.text
+    return ""
+
+
+def record_stats(stats: dict):
+    """Append per-task statistics to output/development_stats.jsonl"""
+    stats_path = os.path.join(get_settings().output_dir, "development_stats.jsonl")
+    os.makedirs(os.path.dirname(stats_path), exist_ok=True)
+    with open(stats_path, "a", encoding="utf-8") as f:
+        record = {"timestamp": datetime.now(timezone.utc).isoformat(), **stats}
+        f.write(json.dumps(record) + "\n")
+
+
+def has_no_progress(state: DevelopmentState) -> bool:
+    """Whether the latest error set repeats an earlier one (a repeat or an oscillation)"""
+    fingerprints = state.get("error_fingerprints", [])
+    return len(fingerprints) > 1 and fingerprints[-1] in fingerprints[:-1]
+
+
 def is_reflection_needed(state: DevelopmentState):
-    state
     if state["error"] is None:
         return "next"
 
-    if state["iterations"] == MAX_ITERATIONS:
+    if state.get("iterations", 0) >= MAX_ITERATIONS:
         return "end"
 
+    if has_no_progress(state):
+        if state.get("escalations", 0) >= get_settings().development_max_escalations:
+            return "end"
+        return "escalate"
+
     return "reflect"
 
 
-def create_development_workflow():
+def create_development_workflow(root_dir: str | None = None):
+    """
+    Create the generate/check/reflect workflow.
+
+    Args:
+        root_dir: Directory the agents work in (defaults to INPUT_DIR_PATH)
+    """
+    implementation_agent = create_implementation_agent(
+        model_name=get_settings().implementation_agent_model_name,
+        root_dir=root_dir,
+    )
+    code_quality_agent = create_code_quality_agent(
+        model_name=get_settings().code_quality_agent_model_name,
+        root_dir=root_dir,
+    )
+
     workflow = StateGraph(DevelopmentState)
 
-    workflow.add_node("generate", implementation_agent)
-    workflow.add_node("check", check)
+    workflow.add_node("generate", create_generate(implementation_agent, root_dir))
+    workflow.add_node("check", create_check(code_quality_agent))
     workflow.add_node("reflect", reflect)
+    workflow.add_node("escalate", escalate)
+    workflow.add_node("compact", compact)
+    workflow.add_node("report", report)
 
     workflow.add_edge(START, "generate")
     workflow.add_edge("generate", "check")
     workflow.add_conditional_edges(
         "check",
         is_reflection_needed,
-        {"end": END, "reflect": "reflect", "next": END},
+        {
+            "end": "report",
+            "reflect": "reflect",
+            "escalate": "escalate",
+            "next": "report",
+        },
     )
-    workflow.add_edge("reflect", "generate")
-    workflow.add_edge("reflect", END)
+    workflow.add_edge("reflect", "compact")
+    workflow.add_edge("escalate", "compact")
+    workflow.add_edge("compact", "generate")
+    workflow.add_edge("report", END)
     return workflow.compile()
@@ -1,15 +1,20 @@
-from deepagents import create_deep_agent
-from deepagents.backends import FilesystemBackend
-from utils.getenv_bool import getenv_bool
+from typing import Sequence
+from langchain.agents.middleware import AgentMiddleware
 from utils.create_model import create_model
+from utils.model_cascade import model_cascade_middleware
+from utils.settings import get_settings
+from utils.retrieval_first import with_retrieval_first
+from agents.tools.read_artifact_tool import ReadArtifactTool
 from agents.tools.read_codebase_tool import ReadCodebaseTool
 from agents.tools.list_codebase_tool import ListCodebaseTool
-from dotenv import load_dotenv
-import os
+from agents.tools.search_codebase_tool import SearchCodebaseTool
 
-load_dotenv()
-
-tools = [ListCodebaseTool(), ReadCodebaseTool()]
+tools = [
+    ListCodebaseTool(),
+    ReadCodebaseTool(),
+    SearchCodebaseTool(),
+    ReadArtifactTool(),
+]
 
 system_prompt = """
 You are the Code Analyst Agent. Your job is to perform deep, read-only static analysis of the repository inside the input directory and produce a precise, actionable report.
@@ -36,9 +41,10 @@ Objectives
 Available tools
 - list_codebase: Enumerate files and directories to understand structure. Use to discover code locations before deep reads. ALWAYS use list_codebase instead of ls, dir, or any other file listing commands.
 - read_codebase: Read file contents (non-executing). Use to inspect modules, imports, call sites, and route/handler definitions.
+- search_codebase: Semantic search over the indexed codebase. Use to locate specific routes, handlers, repositories or call sites without reading everything.
 
 Execution order
-- After the pre-check passes (file missing/empty), run list_codebase first to build a map of the codebase.
+- Run list_codebase first to build a map of the codebase.
 - Only after you have the structure and candidate targets, use read_codebase to open specific files.
 Constraints: Do not execute code. Only write the final report.
 
@@ -58,11 +64,6 @@ Output requirements
   5. API Surface
   6. Risks and Smells (cycles, god modules, high fan-in/out, tight coupling)
 
-Pre-check
-- Before starting the analysis, check whether output/docs/code_analyst_results.md already exists and is non-empty using read-only tools.
-- If the report exists and contains content, immediately stop and return a short confirmation that the artifact is already present; do not redo the analysis.
-- Only proceed with the full workflow if the report is missing or empty.
-
 Completion criteria
 - Do not finish until the final report file is written.
 - ALWAYS after writing, verify that output/docs/code_analyst_results.md exists and is non-empty. If not, retry writing and report the issue explicitly.
@@ -77,16 +78,22 @@ Guidelines
 """
 
 
-def create_code_analyst_agent(model_name: str):
+def create_code_analyst_agent(
+    model_name: str, middleware: Sequence[AgentMiddleware] = ()
+):
     """Factory for creating code analyst agent"""
+    from deepagents import create_deep_agent
+    from deepagents.backends import FilesystemBackend
+
     return create_deep_agent(
-        model=create_model(model_name),
+        model=create_model(model_name, agent_name="code_analyst_agent"),
         tools=tools,
         name="code_analyst_agent",
-        debug=getenv_bool("DEBUG"),
-        system_prompt=system_prompt,
+        debug=get_settings().debug,
+        system_prompt=with_retrieval_first(system_prompt),
+        middleware=[*middleware, *model_cascade_middleware("code_analyst_agent")],
         backend=FilesystemBackend(
-            root_dir=os.getenv("DATA_DIR_PATH"),
+            root_dir=get_settings().data_dir_path,
             virtual_mode=True,
         ),
     )
@@ -1,17 +1,19 @@
-from deepagents import create_deep_agent
-from deepagents.backends import FilesystemBackend
-from utils.getenv_bool import getenv_bool
+from typing import Sequence
+from langchain.agents.middleware import AgentMiddleware
 from utils.create_model import create_model
+from utils.model_cascade import model_cascade_middleware
+from utils.settings import get_settings
+from utils.retrieval_first import with_retrieval_first
+from agents.tools.read_artifact_tool import ReadArtifactTool
 from agents.tools.read_codebase_tool import ReadCodebaseTool
 from agents.tools.list_codebase_tool import ListCodebaseTool
-from dotenv import load_dotenv
-import os
-
-load_dotenv()
+from agents.tools.search_codebase_tool import SearchCodebaseTool
 
 tools = [
     ListCodebaseTool(),
     ReadCodebaseTool(),
+    SearchCodebaseTool(),
+    ReadArtifactTool(),
 ]
 
 system_prompt = """
@@ -52,9 +54,10 @@ Objectives
 Available tools
 - list_codebase: Enumerate files and directories to understand structure. Use to discover code locations before deep reads. ALWAYS use list_codebase instead of ls, dir, or any other file listing commands.
 - read_codebase: Read file contents (non-executing). Use to inspect modules, imports, migrations/models, repositories/DAOs, and raw SQL usage.
+- search_codebase: Semantic search over the indexed codebase. Use to find data access code (models, repositories, raw SQL) for a given table or entity.
 
 Workflow
-- After the pre-check confirms the report still needs to be generated, run list_codebase first to build a map of the codebase and locate modules, models, repositories, and migrations.
+- Run list_codebase first to build a map of the codebase and locate modules, models, repositories, and migrations.
 - Then read all relevant code once to gather signals for ownership and cross-module access.
 - Perform the analysis and write the final report.
 
@@ -70,11 +73,6 @@ Output requirements
   6. Top Violators to Block First (ranked)
   7. Notes and Assumptions
 
-Pre-check
-- Before starting the analysis, verify whether output/docs/data_governance_results.md already exists and is non-empty.
-- If the file exists with content, immediately conclude with a message indicating the artifact is already produced and skip the workflow.
-- Only continue with the standard process if the report is missing or empty.
-
 Completion criteria
 - Do not finish until the final report file is written.
 - After writing, verify that output/docs/data_governance_results.md exists and is non-empty. If not, retry writing and report the issue explicitly.
@@ -88,16 +86,22 @@ Guidelines
 """
 
 
-def create_data_governance_agent(model_name: str):
+def create_data_governance_agent(
+    model_name: str, middleware: Sequence[AgentMiddleware] = ()
+):
     """Factory for creating data governance agent"""
+    from deepagents import create_deep_agent
+    from deepagents.backends import FilesystemBackend
+
     return create_deep_agent(
-        model=create_model(model_name),
+        model=create_model(model_name, agent_name="data_governance_agent"),
         tools=tools,
         name="data_governance_agent",
-        debug=getenv_bool("DEBUG"),
-        system_prompt=system_prompt,
+        debug=get_settings().debug,
+        system_prompt=with_retrieval_first(system_prompt),
+        middleware=[*middleware, *model_cascade_middleware("data_governance_agent")],
         backend=FilesystemBackend(
-            root_dir=os.getenv("DATA_DIR_PATH"),
+            root_dir=get_settings().data_dir_path,
             virtual_mode=True,
         ),
     )
@@ -1,15 +1,20 @@
-from deepagents import create_deep_agent
-from deepagents.backends import FilesystemBackend
-from utils.getenv_bool import getenv_bool
+from typing import Sequence
+from langchain.agents.middleware import AgentMiddleware
 from utils.create_model import create_model
+from utils.model_cascade import model_cascade_middleware
+from utils.settings import get_settings
+from utils.retrieval_first import with_retrieval_first
+from agents.tools.read_artifact_tool import ReadArtifactTool
 from agents.tools.read_codebase_tool import ReadCodebaseTool
 from agents.tools.list_codebase_tool import ListCodebaseTool
-from dotenv import load_dotenv
-import os
+from agents.tools.search_codebase_tool import SearchCodebaseTool
 
-load_dotenv()
-
-tools = [ListCodebaseTool(), ReadCodebaseTool()]
+tools = [
+    ListCodebaseTool(),
+    ReadCodebaseTool(),
+    SearchCodebaseTool(),
+    ReadArtifactTool(),
+]
 
 system_prompt = """
 You are the Domain Context Agent. Your job is to apply Domain-Driven Design (DDD) thinking to a legacy monolith to propose ideal Modular Monolith boundaries centered on business concepts.
@@ -23,6 +28,7 @@ Goal
 Available tools
 - list_codebase: Enumerate files and directories to understand current structure and locate domain language. ALWAYS use list_codebase instead of ls, dir, or any other file listing commands.
 - read_codebase: Read file contents in a single, deliberate pass (no repeated re-reads) to capture terminology, entities, and invariants.
+- search_codebase: Semantic search over the indexed codebase. Use to find where a domain term, entity or rule is defined or used.
 
 Workflow (strict)
 1) Explore (list_codebase): Map structure to target likely domain-heavy areas (models, services, controllers, docs, constants, enums).
@@ -61,14 +67,9 @@ Format and structure
 - Keep the report deterministic and reproducible given only static evidence.
 
 Execution order
-- Once the pre-check determines the report still needs to be written, run list_codebase first.
+- Run list_codebase first.
 - Then run read_codebase in a single pass over selected targets discovered during exploration.
 
-Pre-check
-- Before starting the analysis, verify whether output/docs/domain_context_results.md already exists and is non-empty.
-- If the file exists with content, immediately report that the deliverable is already available and end execution without repeating the workflow.
-- Only execute the full workflow when the report is missing or empty.
-
 
 Completion criteria
 - Do not finish until output/docs/domain_context_results.md has been written.
@@ -77,16 +78,22 @@ Completion criteria
 """
 
 
-def create_domain_context_agent(model_name: str):
+def create_domain_context_agent(
+    model_name: str, middleware: Sequence[AgentMiddleware] = ()
+):
     """Factory for creating domain context agent"""
+    from deepagents import create_deep_agent
+    from deepagents.backends import FilesystemBackend
+
     return create_deep_agent(
-        model=create_model(model_name),
+        model=create_model(model_name, agent_name="domain_context_agent"),
         tools=tools,
         name="domain_context_agent",
-        debug=getenv_bool("DEBUG"),
-        system_prompt=system_prompt,
+        debug=get_settings().debug,
+        system_prompt=with_retrieval_first(system_prompt),
+        middleware=[*middleware, *model_cascade_middleware("domain_context_agent")],
         backend=FilesystemBackend(
-            root_dir=os.getenv("DATA_DIR_PATH"),
+            root_dir=get_settings().data_dir_path,
             virtual_mode=True,
         ),
     )
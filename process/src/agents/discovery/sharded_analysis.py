@@ -0,0 +1,219 @@
+from dataclasses import dataclass, field
+import os
+
+from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
+
+from utils.create_model import create_model
+from utils.event_stream import emit_event
+from utils.settings import get_settings
+
+SHARD_INSTRUCTIONS = """
+Sharded mode
+- You only see one part of the repository: {shard} (shard {index} of {count}).
+- The content of its files is included in the user message, so no tools are needed.
+- Analyse only these files and answer with your findings as Markdown, using the sections required above. Refer to files by their path.
+- Do not write any files. Your answer is merged with the answers for the other shards.
+"""
+
+REDUCE_INSTRUCTIONS = """
+Merge mode
+- The user message contains partial reports, each covering one part of the repository.
+- Merge them into a single report with the structure required above: combine and deduplicate findings, and reconcile relationships that span parts (dependencies, call chains, data flows).
+- Do not write any files. Answer with the merged Markdown report only.
+"""
+
+
+@dataclass
+class Shard:
+    name: str
+    files: list[str] = field(default_factory=list)
+    size: int = 0
+
+
+def partition_codebase(root_dir: str, max_chars: int) -> list[Shard]:
+    """
+    Split a codebase into shards of at most max_chars, following its directories.
+
+    A directory that fits the budget becomes one shard; a larger one is split
+    into its subdirectories, with its own files chunked into separate shards.
+    Consecutive small shards are then packed together up to the budget. Hidden
+    directories are skipped, as in list_codebase.
+    """
+    # One walk, with the size of every directory computed bottom-up
+    own_files: dict[str, list[tuple[str, int]]] = {}
+    subdirs: dict[str, list[str]] = {}
+    for root, dirs, names in os.walk(root_dir):
+        dirs[:] = sorted(
+            d
+            for d in dirs
+            if not d.startswith(".") and not os.path.islink(os.path.join(root, d))
+        )
+        subdirs[root] = [os.path.join(root, d) for d in dirs]
+        paths = [os.path.join(root, name) for name in sorted(names)]
+        own_files[root] = [
+            (path, os.path.getsize(path)) for path in paths if os.path.isfile(path)
+        ]
+    sizes: dict[str, int] = {}
+    for dir_path in reversed(list(own_files)):
+        sizes[dir_path] = sum(size for _, size in own_files[dir_path]) + sum(
+            sizes[subdir] for subdir in subdirs[dir_path]
+        )
+
+    def files_under(dir_path: str) -> list[str]:
+        return [path for path, _ in own_files[dir_path]] + [
+            path for subdir in subdirs[dir_path] for path in files_under(subdir)
+        ]
+
+    shards: list[Shard] = []
+
+    def visit(dir_path: str):
+        name = os.path.relpath(dir_path, root_dir).replace(os.sep, "/")
+        if name == ".":
+            name = "repository root"
+        if sizes[dir_path] <= max_chars:
+            files = files_under(dir_path)
+            if files:
+                shards.append(Shard(name, files, sizes[dir_path]))
+            return
+
+        own_shard = Shard(name)
+        for path, file_size in own_files[dir_path]:
+            if own_shard.files and own_shard.size + file_size > max_chars:
+                shards.append(own_shard)
+                own_shard = Shard(name)
+            own_shard.files.append(path)
+            own_shard.size += file_size
+        if own_shard.files:
+            shards.append(own_shard)
+
+        for subdir in subdirs[dir_path]:
+            visit(subdir)
+
+    visit(root_dir)
+
+    packed: list[Shard] = []
+    for shard in shards:
+        if packed and packed[-1].size + shard.size <= max_chars:
+            packed[-1] = Shard(
+                f"{packed[-1].name}, {shard.name}",
+                packed[-1].files + shard.files,
+                packed[-1].size + shard.size,
+            )
+        else:
+            packed.append(shard)
+    return packed
+
+
+def read_shard(shard: Shard, max_chars: int) -> str:
+    """Content of the shard's files in the read_codebase format"""
+    output = []
+    for file_path in shard.files:
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                content = f.read(max_chars + 1)
+        except (OSError, UnicodeDecodeError):
+            continue
+        if len(content) > max_chars:
+            content = content[:max_chars] + "\n... (truncated)"
+        output.append(f"File {file_path}:\n{content}")
+    return "\n".join(output)
+
+
+def group_by_size(texts: list[str], max_chars: int) -> list[list[str]]:
+    groups: list[list[str]] = []
+    size = 0
+    for text in texts:
+        if groups and size + len(text) <= max_chars:
+            groups[-1].append(text)
+            size += len(text)
+        else:
+            groups.append([text])
+            size = len(text)
+    return groups
+
+
+def merge_groups(reports: list[str], max_chars: int) -> list[list[str]]:
+    """Partial reports merged by one call each in the next reduce round"""
+    groups = group_by_size(reports, max_chars)
+    if len(groups) == len(reports):
+        # No two partial reports fit together, merge pairwise instead
+        groups = [reports[i : i + 2] for i in range(0, len(reports), 2)]
+    return groups
+
+
+class ShardedAnalysis:
+    """
+    Map-reduce variant of a discovery agent for repositories too large for one context.
+
+    The codebase is partitioned into shards (see partition_codebase). Each shard is
+    analysed by one model call with the agent's system prompt, concurrently up to
+    DISCOVERY_SHARD_CONCURRENCY. The partial reports are then merged, in rounds
+    if they do not fit the budget together, into the agent's single report file.
+    """
+
+    def __init__(
+        self, agent_name: str, model_name: str, system_prompt: str, report_path: str
+    ):
+        self.agent_name = agent_name
+        self.model_name = model_name
+        self.system_prompt = system_prompt
+        self.report_path = report_path
+
+    def invoke(self, state, config: RunnableConfig | None = None):
+        settings = get_settings()
+        max_chars = settings.discovery_shard_max_chars
+        batch_config = {
+            **(config or {}),
+            "max_concurrency": settings.discovery_shard_concurrency,
+        }
+        model = create_model(self.model_name, agent_name=self.agent_name)
+
+        shards = partition_codebase(settings.input_dir_path, max_chars)
+        emit_event(f"analysing {len(shards)} shards", node=self.agent_name)
+        responses = model.batch(
+            [
+                [
+                    SystemMessage(
+                        self.system_prompt
+                        + SHARD_INSTRUCTIONS.format(
+                            shard=shard.name, index=index, count=len(shards)
+                        )
+                    ),
+                    HumanMessage(read_shard(shard, max_chars)),
+                ]
+                for index, shard in enumerate(shards, 1)
+            ],
+            batch_config,
+        )
+        if len(shards) == 1:
+            reports = [responses[0].text]
+        else:
+            reports = [
+                f"## Partial report for {shard.name}\n\n{response.text}"
+                for shard, response in zip(shards, responses)
+            ]
+
+        while len(reports) > 1:
+            groups = merge_groups(reports, max_chars)
+            responses = model.batch(
+                [
+                    [
+                        SystemMessage(self.system_prompt + REDUCE_INSTRUCTIONS),
+                        HumanMessage("\n\n".join(group)),
+                    ]
+                    for group in groups
+                ],
+                batch_config,
+            )
+            reports = [response.text for response in responses]
+
+        os.makedirs(os.path.dirname(self.report_path), exist_ok=True)
+        with open(self.report_path, "w", encoding="utf-8") as f:
+            f.write(reports[0] if reports else "")
+        return {}
+
+
+def sharded_prompt(system_prompt: str) -> str:
+    """Everything that shapes a sharded report, for artifact memoization"""
+    return system_prompt + SHARD_INSTRUCTIONS + REDUCE_INSTRUCTIONS
@@ -1,15 +1,11 @@
-from deepagents import create_deep_agent
-from deepagents.backends import FilesystemBackend
+from agents.tools.read_artifact_tool import ReadArtifactTool
 from agents.tools.list_codebase_tool import ListCodebaseTool
 from agents.tools.read_codebase_tool import ReadCodebaseTool
-from utils.getenv_bool import getenv_bool
 from utils.create_model import create_model
-from dotenv import load_dotenv
-import os
+from utils.model_cascade import model_cascade_middleware
+from utils.settings import get_settings
 
-load_dotenv()
-
-tools = [ReadCodebaseTool(), ListCodebaseTool()]
+tools = [ReadCodebaseTool(), ListCodebaseTool(), ReadArtifactTool()]
 
 system_prompt = """
 You are the Synthesizer Agent. Your job is to integrate and reconcile the findings from three upstream analyses to produce a single, actionable migration brief for moving from a monolith to a modular monolith.
@@ -30,7 +26,6 @@ Available tools
 - read_codebase: Read the three reports once to extract facts, entities, dependencies, violations, contexts, and risks.
 
 Workflow (strict)
-0) Pre-check: Skip the entire workflow if the synthesizer report already exists and is non-empty.
 1) Verify inputs
    - Confirm all three input files exist and are non-empty. If any is missing/empty, clearly state the issue and proceed with partial synthesis while marking gaps.
 2) Single-pass extraction
@@ -92,11 +87,6 @@ Constraints
 Planning requirement
 - Begin the report with a short, numbered plan you will follow during synthesis.
 
-Pre-check
-- Before starting the synthesis, verify whether output/docs/synthesizer_results.md already exists and is non-empty.
-- If the report is already present with content, stop immediately and state that no further work is required.
-- Only proceed with verification of inputs and the rest of the flow when the report is missing or empty.
-
 Completion criteria
 - Do not finish until output/docs/synthesizer_results.md is written and non-empty.
 - If any upstream file is missing/empty, clearly state which, proceed with partial synthesis, and flag exact missing inputs in the output.
@@ -106,14 +96,18 @@ Completion criteria
 
 def create_synthesizer_agent(model_name: str):
     """Factory for creating synthesizer agent"""
+    from deepagents import create_deep_agent
+    from deepagents.backends import FilesystemBackend
+
     return create_deep_agent(
-        model=create_model(model_name),
+        model=create_model(model_name, agent_name="synthesizer_agent"),
         tools=tools,
         name="synthesizer_agent",
-        debug=getenv_bool("DEBUG"),
+        middleware=model_cascade_middleware("synthesizer_agent"),
+        debug=get_settings().debug,
         system_prompt=system_prompt,
         backend=FilesystemBackend(
-            root_dir=os.getenv("DATA_DIR_PATH"),
+            root_dir=get_settings().data_dir_path,
             virtual_mode=True,
         ),
     )
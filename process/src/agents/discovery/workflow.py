@@ -1,42 +1,131 @@
 from typing import TypedDict
 from langgraph.graph import StateGraph, START, END
 from .code_analyst_agent import create_code_analyst_agent
+from .code_analyst_agent import system_prompt as code_analyst_prompt
 from .domain_context_agent import create_domain_context_agent
+from .domain_context_agent import system_prompt as domain_context_prompt
 from .data_governance_agent import create_data_governance_agent
+from .data_governance_agent import system_prompt as data_governance_prompt
 from .synthesizer_agent import create_synthesizer_agent
-from dotenv import load_dotenv
+from .synthesizer_agent import system_prompt as synthesizer_prompt
+from .sharded_analysis import ShardedAnalysis, sharded_prompt
+from utils.artifact_memo import memoize_artifact_node
+from utils.lazy_agent import LazyAgent
+from utils.retrieval_first import with_retrieval_first
+from utils.settings import get_settings
+from utils.stable_prefix_middleware import StablePrefixMiddleware, codebase_snapshot
 import os
 
-load_dotenv()
-
 
 class DiscoveryState(TypedDict):
     pass
 
 
-code_analyst_agent = create_code_analyst_agent(
-    model_name=os.getenv("CODE_ANALYST_AGENT_MODEL_NAME")
-)
-domain_context_agent = create_domain_context_agent(
-    model_name=os.getenv("DOMAIN_CONTEXT_AGENT_MODEL_NAME")
-)
-data_governance_agent = create_data_governance_agent(
-    model_name=os.getenv("DATA_GOVERNANCE_AGENT_MODEL_NAME")
-)
-synthesizer_agent = create_synthesizer_agent(
-    model_name=os.getenv("SYNTHESIZER_AGENT_MODEL_NAME")
-)
+def report_path(name: str) -> str:
+    return os.path.join(get_settings().output_dir, "docs", name)
+
+
+def stable_prefix_middleware(agent_name: str, model_name: str):
+    """Shared codebase prefix for the parallel discovery agents, if enabled"""
+    if not get_settings().discovery_stable_prefix:
+        return ()
+
+    return (
+        StablePrefixMiddleware(
+            agent_name=agent_name,
+            model_name=model_name,
+            prefix=lambda: codebase_snapshot(get_settings().input_dir_path),
+        ),
+    )
+
+
+def analysis_node(name: str, factory, model_name: str, prompt: str, artifact_path: str):
+    """
+    Memoized node for a discovery agent that analyses the codebase, run as a
+    single agent or, with DISCOVERY_SHARDED, as a map-reduce over shards.
+    """
+    if get_settings().discovery_sharded:
+        agent = ShardedAnalysis(name, model_name, prompt, artifact_path)
+        prompt = sharded_prompt(prompt)
+    else:
+        prompt = with_retrieval_first(prompt)
+        agent = LazyAgent(
+            lambda: factory(
+                model_name=model_name,
+                middleware=stable_prefix_middleware(name, model_name),
+            )
+        )
+
+    return memoize_artifact_node(
+        name=name,
+        agent=agent,
+        artifact_path=artifact_path,
+        upstream_paths=[],
+        prompt=prompt,
+        model_name=model_name,
+    )
 
 
 def create_discovery_workflow():
-    """Create and configure the discovery workflow"""
+    """Create and configure the discovery workflow; agents are built when first run"""
+    settings = get_settings()
+    synthesizer_agent = LazyAgent(
+        lambda: create_synthesizer_agent(
+            model_name=settings.synthesizer_agent_model_name
+        )
+    )
 
     workflow_builder = StateGraph(DiscoveryState)
 
-    workflow_builder.add_node("code_analyst_agent", code_analyst_agent)
-    workflow_builder.add_node("domain_context_agent", domain_context_agent)
-    workflow_builder.add_node("data_governance_agent", data_governance_agent)
-    workflow_builder.add_node("synthesizer_agent", synthesizer_agent)
+    code_analyst_report = report_path("code_analyst_results.md")
+    domain_context_report = report_path("domain_context_results.md")
+    data_governance_report = report_path("data_governance_results.md")
+
+    workflow_builder.add_node(
+        "code_analyst_agent",
+        analysis_node(
+            name="code_analyst_agent",
+            factory=create_code_analyst_agent,
+            model_name=settings.code_analyst_agent_model_name,
+            prompt=code_analyst_prompt,
+            artifact_path=code_analyst_report,
+        ),
+    )
+    workflow_builder.add_node(
+        "domain_context_agent",
+        analysis_node(
+            name="domain_context_agent",
+            factory=create_domain_context_agent,
+            model_name=settings.domain_context_agent_model_name,
+            prompt=domain_context_prompt,
+            artifact_path=domain_context_report,
+        ),
+    )
+    workflow_builder.add_node(
+        "data_governance_agent",
+        analysis_node(
+            name="data_governance_agent",
+            factory=create_data_governance_agent,
+            model_name=settings.data_governance_agent_model_name,
+            prompt=data_governance_prompt,
+            artifact_path=data_governance_report,
+        ),
+    )
+    workflow_builder.add_node(
+        "synthesizer_agent",
+        memoize_artifact_node(
+            name="synthesizer_agent",
+            agent=synthesizer_agent,
+            artifact_path=report_path("synthesizer_results.md"),
+            upstream_paths=[
+                code_analyst_report,
+                data_governance_report,
+                domain_context_report,
+            ],
+            prompt=synthesizer_prompt,
+            model_name=settings.synthesizer_agent_model_name,
+        ),
+    )
 
     workflow_builder.add_edge(START, "code_analyst_agent")
     workflow_builder.add_edge(START, "domain_context_agent")
@@ -0,0 +1,255 @@
+from contextlib import closing, contextmanager
+from uuid import uuid4
+import hashlib
+import json
+import sqlite3
+import threading
+import os
+
+from utils.settings import get_settings
+
+STATUSES = ("todo", "in progress", "done", "failed")
+
+_export_lock = threading.Lock()
+
+# Owner of the "in progress" claims made by this process; claims of any other
+# owner were left behind by an interrupted run
+CLAIM_OWNER = f"{os.getpid()}-{uuid4().hex[:8]}"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dependencies (
+    task_id TEXT NOT NULL,
+    dependency_id TEXT NOT NULL,
+    PRIMARY KEY (task_id, dependency_id)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS claims (
+    task_id TEXT PRIMARY KEY,
+    owner TEXT NOT NULL
+);
+"""
+
+
+class PlanStore:
+    """
+    SQLite-backed store for the tasks in plan.json.
+
+    Every status change is a single-row update in its own transaction, and the
+    store is exported back to plan.json after each change so the file keeps the
+    planner's schema. plan.json is re-imported whenever it was changed outside
+    of the store (e.g. regenerated by the planner).
+
+    Tasks are claimed "in progress" by the process that works on them. Claims
+    left by another process, i.e. a crashed or interrupted run, are returned
+    to "todo" by sync, so a new run picks those tasks up again.
+    """
+
+    def __init__(self, db_path: str, plan_path: str):
+        self.db_path = db_path
+        self.plan_path = plan_path
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+        self.sync()
+
+    @classmethod
+    def open_default(cls) -> "PlanStore":
+        """Open the store next to output/plan.json in DATA_DIR_PATH"""
+        output_dir = get_settings().output_dir
+        os.makedirs(output_dir, exist_ok=True)
+        return cls(
+            db_path=os.path.join(output_dir, "plan.db"),
+            plan_path=os.path.join(output_dir, "plan.json"),
+        )
+
+    def sync(self):
+        """
+        Import plan.json if it differs from what the store last imported or
+        exported, and release the claims of other processes
+        """
+        if not os.path.exists(self.plan_path):
+            return
+        self._import_plan()
+        with self._transaction() as conn:
+            reset = conn.execute(
+                """
+                UPDATE tasks SET status = 'todo'
+                WHERE status = 'in progress'
+                  AND id NOT IN (SELECT task_id FROM claims WHERE owner = ?)
+                """,
+                (CLAIM_OWNER,),
+            ).rowcount
+            conn.execute("DELETE FROM claims WHERE owner != ?", (CLAIM_OWNER,))
+        if reset:
+            self.export()
+
+    def _import_plan(self):
+        with open(self.plan_path, "rb") as f:
+            content = f.read()
+        digest = hashlib.sha256(content).hexdigest()
+
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT value FROM meta WHERE key = 'plan_digest'"
+            ).fetchone()
+            if row and row[0] == digest:
+                return
+
+            tasks = json.loads(content)
+            if not isinstance(tasks, list):
+                raise ValueError(f"{self.plan_path} does not contain a list of tasks")
+
+            conn.execute("DELETE FROM tasks")
+            conn.execute("DELETE FROM dependencies")
+            for position, task in enumerate(tasks):
+                task_id = str(task["id"])
+                conn.execute(
+                    "INSERT INTO tasks (id, position, status, data) VALUES (?, ?, ?, ?)",
+                    (task_id, position, task.get("status", "todo"), json.dumps(task)),
+                )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO dependencies (task_id, dependency_id) VALUES (?, ?)",
+                    [(task_id, str(d)) for d in task.get("dependencies", [])],
+                )
+            self._set_digest(conn, digest)
+
+    def list_tasks(self) -> list[dict]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT status, data FROM tasks ORDER BY position"
+            ).fetchall()
+        return [_to_task(row) for row in rows]
+
+    def get_task(self, task_id: str) -> dict | None:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT status, data FROM tasks WHERE id = ?", (str(task_id),)
+            ).fetchone()
+        return _to_task(row) if row else None
+
+    def next_ready_task(self, claim: bool = True) -> dict | None:
+        """
+        Return the first task (in plan order) whose dependencies are all done.
+
+        Args:
+            claim: Atomically mark the task "in progress" so no other caller picks it
+
+        Returns:
+            The task, or None if every remaining task is done or blocked
+        """
+        statuses = ("todo",) if claim else ("todo", "in progress")
+        with self._transaction() as conn:
+            row = conn.execute(
+                f"""
+                SELECT t.id, t.status, t.data FROM tasks t
+                WHERE t.status IN ({", ".join("?" for _ in statuses)})
+                  AND NOT EXISTS (
+                    SELECT 1 FROM dependencies d
+                    LEFT JOIN tasks p ON p.id = d.dependency_id
+                    WHERE d.task_id = t.id AND (p.status IS NULL OR p.status != 'done')
+                  )
+                ORDER BY t.position
+                LIMIT 1
+                """,
+                statuses,
+            ).fetchone()
+            if row is None:
+                return None
+
+            task_id, status, data = row
+            if claim:
+                status = "in progress"
+                conn.execute(
+                    "UPDATE tasks SET status = ? WHERE id = ?", (status, task_id)
+                )
+                _set_claim(conn, task_id, status)
+        if claim:
+            self.export()
+        return _to_task((status, data))
+
+    def set_status(self, task_id: str, status: str):
+        """
+        Raises:
+            ValueError: If the status is not supported or the task does not exist
+        """
+        if status not in STATUSES:
+            raise ValueError(
+                f"Unsupported status '{status}', expected one of: {', '.join(STATUSES)}"
+            )
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE tasks SET status = ? WHERE id = ?", (status, str(task_id))
+            ).rowcount
+            _set_claim(conn, str(task_id), status)
+        if not updated:
+            raise ValueError(f"Task {task_id} does not exist")
+        self.export()
+
+    def reset_in_progress(self) -> int:
+        """Return tasks left "in progress" by an interrupted run to "todo" """
+        with self._transaction() as conn:
+            reset = conn.execute(
+                "UPDATE tasks SET status = 'todo' WHERE status = 'in progress'"
+            ).rowcount
+            conn.execute("DELETE FROM claims")
+        if reset:
+            self.export()
+        return reset
+
+    def export(self):
+        """Write the tasks back to plan.json, keeping the planner's schema"""
+        with _export_lock:
+            content = json.dumps(self.list_tasks(), indent=2).encode("utf-8")
+            temp_path = f"{self.plan_path}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(content)
+            os.replace(temp_path, self.plan_path)
+
+            with self._transaction() as conn:
+                self._set_digest(conn, hashlib.sha256(content).hexdigest())
+
+    def _set_digest(self, conn: sqlite3.Connection, digest: str):
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('plan_digest', ?)",
+            (digest,),
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connect()
+        conn.isolation_level = None
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+
+def _set_claim(conn: sqlite3.Connection, task_id: str, status: str):
+    if status == "in progress":
+        conn.execute(
+            "INSERT OR REPLACE INTO claims (task_id, owner) VALUES (?, ?)",
+            (task_id, CLAIM_OWNER),
+        )
+    else:
+        conn.execute("DELETE FROM claims WHERE task_id = ?", (task_id,))
+
+
+def _to_task(row: tuple) -> dict:
+    status, data = row
+    return {**json.loads(data), "status": status}
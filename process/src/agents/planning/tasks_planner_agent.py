@@ -1,16 +1,18 @@
-from deepagents import create_deep_agent
-from deepagents.backends import FilesystemBackend
-
+from agents.tools.read_artifact_tool import ReadArtifactTool
 from agents.tools.list_codebase_tool import ListCodebaseTool
+from agents.tools.search_codebase_tool import SearchCodebaseTool
 from agents.tools.read_codebase_tool import ReadCodebaseTool
-from utils.getenv_bool import getenv_bool
 from utils.create_model import create_model
-from dotenv import load_dotenv
-import os
-
-load_dotenv()
-
-tools = [ReadCodebaseTool(), ListCodebaseTool()]
+from utils.model_cascade import model_cascade_middleware
+from utils.settings import get_settings
+from utils.retrieval_first import with_retrieval_first
+
+tools = [
+    ReadCodebaseTool(),
+    ListCodebaseTool(),
+    SearchCodebaseTool(),
+    ReadArtifactTool(),
+]
 
 system_prompt = """You are a taskmaster agent responsible for deriving an actionable task list from synthesizer results and codebase analysis, then saving it to the repository.
 
@@ -25,11 +27,6 @@ AVAILABLE TOOLS:
 - list_codebase: Enumerate files and directories to understand structure. Use to discover code locations before deep reads. ALWAYS use list_codebase instead of ls, dir, or any other file listing commands.
 - read_codebase: Read file contents (non-executing). Use to inspect modules, imports, call sites, and route/handler definitions.
 
-Pre-check:
-- Before any planning or tool usage, verify whether output/plan.json already exists and is non-empty.
-- If the file exists with content, immediately terminate and acknowledge that the task list is already present; do not regenerate it.
-- Only perform the workflow below if the file is missing or empty.
-
 RULES:
 - Only use the available tools to read synthesizer_results.md, search the codebase, and write output/plan.json.
 - Do not print the full tasks content in your final message; write them to output/plan.json.
@@ -49,7 +46,6 @@ ARCHITECTURAL INTEGRATION:
 - Consider module boundaries and data ownership when creating tasks.
 
 WORKFLOW:
-0) Run the pre-check. Continue only if output/plan.json is missing or empty.
 1) Locate and open synthesizer_results.md from output/docs/ directory using list_directory and read_file.
 2) Analyze architectural insights, module boundaries, conflicts, and refactoring priorities from synthesizer results.
 3) Search the codebase for specific components mentioned in conflicts (e.g., "Performance Review command handlers", "Company Management persistence", "Shared project dependencies").
@@ -90,14 +86,18 @@ Completion criteria
 
 
 def create_tasks_planner_agent(model_name: str):
+    from deepagents import create_deep_agent
+    from deepagents.backends import FilesystemBackend
+
     return create_deep_agent(
-        model=create_model(model_name),
+        model=create_model(model_name, agent_name="tasks_planner_agent"),
         tools=tools,
         name="tasks_planner_agent",
-        debug=getenv_bool("DEBUG"),
-        system_prompt=system_prompt,
+        middleware=model_cascade_middleware("tasks_planner_agent"),
+        debug=get_settings().debug,
+        system_prompt=with_retrieval_first(system_prompt),
         backend=FilesystemBackend(
-            root_dir=os.getenv("DATA_DIR_PATH"),
+            root_dir=get_settings().data_dir_path,
             virtual_mode=True,
         ),
     )
@@ -0,0 +1,351 @@
+from dataclasses import dataclass, field
+import re
+
+from langchain.tools import BaseTool
+
+from utils.settings import get_settings
+import os
+
+HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+\d+(?:,(\d+))? @@")
+
+
+@dataclass
+class Hunk:
+    """A unified diff hunk, or a search/replace block when old_start is None"""
+
+    header: str
+    old: list[str]
+    new: list[str]
+    old_start: int | None = None
+
+
+@dataclass
+class FilePatch:
+    path: str
+    hunks: list[Hunk] = field(default_factory=list)
+    delete: bool = False
+
+
+class PatchError(Exception):
+    pass
+
+
+def _strip_eol(line: str) -> str:
+    return line.rstrip("\r\n")
+
+
+def _short(line: str, limit: int = 80) -> str:
+    line = _strip_eol(line).strip()
+    return repr(line if len(line) <= limit else line[:limit] + "...")
+
+
+def _diff_path(value: str) -> str | None:
+    path = value.split("\t")[0].strip()
+    if path == "/dev/null":
+        return None
+    if path.startswith(("a/", "b/")):
+        path = path[2:]
+    return path
+
+
+def parse_unified_diff(patch: str) -> list[FilePatch]:
+    """
+    Parse a unified diff. Hunk bodies are read by the old/new line counts of
+    their @@ header, so removed lines starting with '-- ' (SQL, Lua or Haskell
+    comments) are not taken for file headers.
+    """
+    files: list[FilePatch] = []
+    lines = patch.splitlines()
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if line.startswith("--- ") and i + 1 < len(lines):
+            if not lines[i + 1].startswith("+++ "):
+                raise PatchError(f"Expected '+++' after '{line}'")
+            old_path = _diff_path(line[4:])
+            new_path = _diff_path(lines[i + 1][4:])
+            if old_path is None and new_path is None:
+                raise PatchError(f"No file path in '{line}'")
+            files.append(FilePatch(new_path or old_path, delete=new_path is None))
+            i += 2
+            continue
+
+        match = HUNK_HEADER.match(line)
+        if match:
+            if not files:
+                raise PatchError(f"Hunk '{line}' before any '---'/'+++' file header")
+            hunk = Hunk(line, [], [], int(match.group(1)))
+            old_count = int(match.group(2) or 1)
+            new_count = int(match.group(3) or 1)
+            i += 1
+            while i < len(lines) and (old_count > 0 or new_count > 0):
+                body = lines[i]
+                if body.startswith("-"):
+                    hunk.old.append(body[1:])
+                    old_count -= 1
+                elif body.startswith("+"):
+                    hunk.new.append(body[1:])
+                    new_count -= 1
+                elif body.startswith(" ") or body == "":
+                    # Blank context lines often lose their leading space
+                    hunk.old.append(body[1:])
+                    hunk.new.append(body[1:])
+                    old_count -= 1
+                    new_count -= 1
+                elif not body.startswith("\\"):
+                    # Header counts larger than the hunk: end it here
+                    break
+                i += 1
+            while i < len(lines) and lines[i].startswith("\\"):
+                i += 1
+            while hunk.old and hunk.new and hunk.old[-1] == hunk.new[-1] == "":
+                hunk.old.pop()
+                hunk.new.pop()
+            files[-1].hunks.append(hunk)
+            continue
+
+        if files and files[-1].hunks and line.startswith(("+", "-")):
+            raise PatchError(
+                f"Line '{line}' is outside of any hunk; "
+                f"check the line counts of '{files[-1].hunks[-1].header}'"
+            )
+        i += 1
+
+    if not files:
+        raise PatchError("No '---'/'+++' file headers found")
+    return files
+
+
+def parse_search_replace(patch: str) -> list[FilePatch]:
+    files: dict[str, FilePatch] = {}
+    path = None
+    section = None
+    for line in patch.splitlines():
+        stripped = line.strip()
+        if section is None:
+            if stripped == "<<<<<<< SEARCH":
+                if path is None:
+                    raise PatchError("SEARCH block without a file path line before it")
+                file_patch = files.setdefault(path, FilePatch(path))
+                hunk = Hunk(f"block {len(file_patch.hunks) + 1}", [], [])
+                file_patch.hunks.append(hunk)
+                section = hunk.old
+            elif stripped and not stripped.startswith("```"):
+                path = stripped
+        elif stripped == "=======" and section is hunk.old:
+            section = hunk.new
+        elif stripped == ">>>>>>> REPLACE" and section is hunk.new:
+            section = None
+        else:
+            section.append(line)
+
+    if section is not None:
+        raise PatchError("Unterminated SEARCH/REPLACE block")
+    if not files:
+        raise PatchError("No SEARCH/REPLACE blocks found")
+    return list(files.values())
+
+
+def _find(lines: list[str], old: list[str], expected: int) -> list[int]:
+    """Positions where old matches, closest to the expected one first"""
+    wanted = [_strip_eol(line) for line in old]
+    stripped = [_strip_eol(line) for line in lines]
+    positions = [
+        position
+        for position in range(len(lines) - len(old) + 1)
+        if stripped[position : position + len(old)] == wanted
+    ]
+    return sorted(positions, key=lambda position: abs(position - expected))
+
+
+def _mismatch(lines: list[str], old: list[str], position: int) -> str:
+    """First line that differs from the hunk at its stated position"""
+    for offset, expected in enumerate(old):
+        line_number = position + offset
+        actual = lines[line_number] if line_number < len(lines) else None
+        if actual is None:
+            return (
+                f"file ends before line {line_number + 1}, expected {_short(expected)}"
+            )
+        if _strip_eol(actual) != _strip_eol(expected):
+            return (
+                f"line {line_number + 1} is {_short(actual)}, "
+                f"expected {_short(expected)}"
+            )
+    return "context does not match"
+
+
+def apply_hunks(content: str, hunks: list[Hunk]) -> tuple[str, list[str]]:
+    """Apply the hunks in order, returning the new content and the failures"""
+    newline = "\r\n" if "\r\n" in content else "\n"
+    lines = content.splitlines(keepends=True)
+    if lines and not lines[-1].endswith("\n"):
+        lines[-1] += newline
+        had_final_newline = False
+    else:
+        had_final_newline = True
+
+    failures = []
+    shift = 0
+    for hunk in hunks:
+        if hunk.old_start is None:
+            start = expected = 0
+        else:
+            # A hunk removing no lines (-N,0) inserts after line N
+            start = hunk.old_start if not hunk.old else max(hunk.old_start - 1, 0)
+            expected = start + shift
+        if not hunk.old and hunk.old_start is None and lines:
+            failures.append(
+                f"{hunk.header}: empty SEARCH text, which is only allowed for new files"
+            )
+            continue
+        if not hunk.old:
+            positions = [min(expected, len(lines))]
+        else:
+            positions = _find(lines, hunk.old, expected)
+
+        if not positions:
+            reason = (
+                _mismatch(lines, hunk.old, expected)
+                if hunk.old_start is not None
+                else f"SEARCH text not found (first line {_short(hunk.old[0])})"
+            )
+            failures.append(f"{hunk.header}: {reason}")
+            continue
+        if hunk.old_start is None and len(positions) > 1:
+            failures.append(
+                f"{hunk.header}: SEARCH text matches {len(positions)} places, "
+                "add surrounding lines to make it unique"
+            )
+            continue
+
+        position = positions[0]
+        lines[position : position + len(hunk.old)] = [
+            line + newline for line in hunk.new
+        ]
+        if hunk.old_start is not None:
+            shift = position + len(hunk.new) - (start + len(hunk.old))
+
+    new_content = "".join(lines)
+    if not had_final_newline and new_content.endswith(newline):
+        new_content = new_content[: -len(newline)]
+    return new_content, failures
+
+
+class ApplyPatchTool(BaseTool):
+    name: str = "apply_patch"
+    description: str = (
+        "Apply changes to one or more files in one atomic call, instead of rewriting whole files. "
+        "Input: a unified diff ('--- a/path', '+++ b/path', '@@ -l,n +l,n @@' hunks; "
+        "use /dev/null to create or delete a file), or SEARCH/REPLACE blocks, each preceded "
+        "by a line with the file path:\n"
+        "path/to/file.py\n<<<<<<< SEARCH\nexact existing lines\n=======\nnew lines\n>>>>>>> REPLACE\n"
+        "A SEARCH text must match exactly one place; an empty SEARCH creates a new file. "
+        "Every hunk is validated against the current content first: if any hunk does not "
+        "apply, no file is changed and the failing hunks are reported."
+    )
+    root_dir: str | None = None
+
+    def _run(self, patch: str) -> str:
+        root_dir = os.path.realpath(self.root_dir or get_settings().input_dir_path)
+        try:
+            if "<<<<<<< SEARCH" in patch:
+                file_patches = parse_search_replace(patch)
+            else:
+                file_patches = parse_unified_diff(patch)
+        except PatchError as e:
+            return f"Error: invalid patch: {e}"
+
+        originals: dict[str, str | None] = {}
+        results: dict[str, str | None] = {}
+        failures = []
+        hunk_count = 0
+        for file_patch in file_patches:
+            file_path = os.path.realpath(os.path.join(root_dir, file_patch.path))
+            if os.path.commonpath([root_dir, file_path]) != root_dir:
+                failures.append(f"{file_patch.path}: outside the codebase")
+                continue
+            hunk_count += len(file_patch.hunks)
+
+            if file_path not in originals:
+                try:
+                    with open(file_path, "r", encoding="utf-8", newline="") as f:
+                        originals[file_path] = f.read()
+                except FileNotFoundError:
+                    originals[file_path] = None
+                except (OSError, UnicodeDecodeError) as e:
+                    failures.append(f"{file_patch.path}: cannot read ({e})")
+                    continue
+            content = results.get(file_path, originals[file_path])
+
+            if file_patch.delete:
+                if content is None:
+                    failures.append(f"{file_patch.path}: cannot delete, file not found")
+                results[file_path] = None
+                continue
+            if content is None and any(hunk.old for hunk in file_patch.hunks):
+                failures.append(f"{file_patch.path}: file not found")
+                continue
+
+            new_content, hunk_failures = apply_hunks(content or "", file_patch.hunks)
+            failures.extend(f"{file_patch.path} {failure}" for failure in hunk_failures)
+            results[file_path] = new_content
+
+        if failures:
+            return (
+                f"Patch not applied, no files were changed. "
+                f"{len(failures)} problem(s) in {hunk_count} hunk(s):\n"
+                + "\n".join(f"- {failure}" for failure in failures)
+            )
+
+        try:
+            self._write(results, originals)
+        except OSError as e:
+            return f"Error writing files, all changes were rolled back: {e}"
+
+        summary = []
+        for file_path, content in results.items():
+            relative_path = os.path.relpath(file_path, root_dir)
+            if content is None:
+                summary.append(f"{relative_path} (deleted)")
+            else:
+                old_lines = (originals[file_path] or "").splitlines()
+                new_lines = content.splitlines()
+                state = "created" if originals[file_path] is None else "updated"
+                summary.append(
+                    f"{relative_path} ({state}, {len(old_lines)} -> {len(new_lines)} lines)"
+                )
+        return f"Patch applied ({hunk_count} hunk(s)): " + ", ".join(summary)
+
+    def _write(self, results: dict[str, str | None], originals: dict[str, str | None]):
+        """Write all files, restoring the original contents if any write fails"""
+        written = []
+        try:
+            for file_path, content in results.items():
+                written.append(file_path)
+                if content is None:
+                    os.remove(file_path)
+                    continue
+                os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                temp_path = f"{file_path}.patch-tmp"
+                with open(temp_path, "w", encoding="utf-8", newline="") as f:
+                    f.write(content)
+                os.replace(temp_path, file_path)
+        except OSError:
+            for file_path in written:
+                temp_path = f"{file_path}.patch-tmp"
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                original = originals[file_path]
+                if original is None:
+                    if os.path.exists(file_path):
+                        os.remove(file_path)
+                else:
+                    with open(file_path, "w", encoding="utf-8", newline="") as f:
+                        f.write(original)
+            raise
+
+    async def _arun(self, patch: str) -> str:
+        raise NotImplementedError(
+            "Asynchronous execution is not supported for this tool."
+        )
@@ -1,19 +1,19 @@
 from langchain.tools import BaseTool
 
 from agents.tools.terminal_tool import TerminalTool
-from dotenv import load_dotenv
-import os
-
-load_dotenv()
+from utils.settings import get_settings
 
 
 class CheckErrorsTool(BaseTool):
     name: str = "check_errors_tool"
     description: str = "Uses Pyright to check the codebase for errors. "
+    root_dir: str | None = None
 
     def _run(self) -> str:
-        python_path = os.getenv("INPUT_DIR_PYTHON_PATH")
-        return TerminalTool()._run(f"pyright --level error --pythonpath {python_path}")
+        python_path = get_settings().input_dir_python_path
+        return TerminalTool(root_dir=self.root_dir)._run(
+            f"pyright --level error --pythonpath {python_path}"
+        )
 
     async def _arun(self, folder_path: list[str]) -> str:
         raise NotImplementedError(
@@ -0,0 +1,225 @@
+from dataclasses import dataclass
+import functools
+import importlib.util
+import json
+import threading
+import time
+
+from agents.tools.search_codebase_tool import (
+    code_to_embedding,
+    connection_pool,
+    index_table_name,
+)
+from utils.settings import get_settings
+import os
+
+INDEXING_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "..", "..", "indexing")
+)
+
+
+@dataclass
+class ChunkPosition:
+    offset: int
+    line: int
+    column: int
+
+
+@dataclass
+class Chunk:
+    text: str
+    start: ChunkPosition
+    end: ChunkPosition
+
+
+@functools.cache
+def file_selection():
+    """
+    indexing/file_selection.py, loaded from the indexing project so that edits
+    are re-indexed for exactly the files its flow indexes
+    """
+    spec = importlib.util.spec_from_file_location(
+        "file_selection", os.path.join(INDEXING_DIR, "file_selection.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@functools.cache
+def code_to_chunks():
+    """
+    Chunking flow with the same language detection and split parameters as
+    the indexing flow in indexing/main.py, so re-indexed rows match its rows.
+    """
+    import cocoindex
+
+    @cocoindex.transform_flow()
+    def code_to_chunks(
+        filename: cocoindex.DataSlice[str], content: cocoindex.DataSlice[str]
+    ) -> cocoindex.DataSlice[dict[cocoindex.Range, Chunk]]:
+        language = filename.transform(cocoindex.functions.DetectProgrammingLanguage())
+        return content.transform(
+            cocoindex.functions.SplitRecursively(),
+            language=language,
+            chunk_size=1000,
+            min_chunk_size=300,
+            chunk_overlap=300,
+        )
+
+    return code_to_chunks
+
+
+def snapshot_files(root_dir: str) -> dict[str, tuple[int, int]]:
+    """
+    Modification time and size of every indexed file, by path relative to
+    root_dir. Excluded directories are not walked.
+    """
+    snapshot = {}
+    for root, dirs, names in os.walk(root_dir):
+        dirs[:] = [d for d in dirs if not file_selection().is_excluded_dir(d)]
+        for name in names:
+            path = os.path.join(root, name)
+            relative_path = os.path.relpath(path, root_dir).replace(os.sep, "/")
+            if not is_indexed(relative_path):
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            snapshot[relative_path] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+def changed_files(before: dict, after: dict) -> list[str]:
+    """Paths added, modified or deleted between two snapshots"""
+    return sorted(
+        path
+        for path in before.keys() | after.keys()
+        if before.get(path) != after.get(path)
+    )
+
+
+def is_indexed(path: str) -> bool:
+    """Whether the indexing flow indexes the file (INDEX_LANGUAGES)"""
+    return file_selection().is_indexed(path, get_settings().index_languages)
+
+
+class ReindexStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: list[float] = []
+        self.paths = 0
+        self.chunks = 0
+        self.errors = 0
+
+    def record(self, seconds: float, paths: int, chunks: int, error: bool):
+        with self._lock:
+            self.latencies.append(seconds)
+            self.paths += paths
+            self.chunks += chunks
+            self.errors += int(error)
+
+    def summary(self) -> dict:
+        with self._lock:
+            latencies = sorted(self.latencies)
+            return {
+                "calls": len(latencies),
+                "paths": self.paths,
+                "chunks": self.chunks,
+                "errors": self.errors,
+                "p50_ms": latencies[len(latencies) // 2] * 1000 if latencies else 0.0,
+                "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+                "total_seconds": sum(latencies),
+            }
+
+
+_stats = ReindexStats()
+
+
+def reindex_stats() -> dict:
+    return _stats.summary()
+
+
+def reindex_paths(
+    paths: list[str], root_dir: str | None = None, project_id: str | None = None
+) -> dict:
+    """
+    Re-chunk and re-embed the given files and replace their rows in the index.
+
+    Paths are relative to root_dir (defaults to INPUT_DIR_PATH), or absolute
+    within it. Deleted files lose their rows; files the indexing flow does not
+    index are skipped. All rows are replaced in one transaction, which bumps
+    the index version (see indexing/index_version.py). A later cocoindex update
+    produces the same rows, as the chunking is the same.
+
+    Returns:
+        Counts of re-indexed paths, deleted paths and chunks, the call's
+        latency and the error, if any
+    """
+    settings = get_settings()
+    root_dir = root_dir or settings.input_dir_path
+    table_name = index_table_name(project_id or settings.project_id)
+    started_at = time.perf_counter()
+    result = {"reindexed": 0, "deleted": 0, "chunks": 0, "error": None}
+
+    filenames = []
+    for path in paths:
+        if os.path.isabs(path):
+            path = os.path.relpath(path, root_dir)
+        path = path.replace(os.sep, "/")
+        if not path.startswith("../") and is_indexed(path):
+            filenames.append(path)
+
+    try:
+        from pgvector.psycopg import register_vector
+
+        rows = []
+        for filename in filenames:
+            file_path = os.path.join(root_dir, filename)
+            if not os.path.isfile(file_path):
+                result["deleted"] += 1
+                continue
+            with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+                content = f.read()
+            for (start, end), chunk in code_to_chunks().eval(filename, content).items():
+                rows.append(
+                    (
+                        filename,
+                        f"[{start},{end})",
+                        chunk.text,
+                        code_to_embedding().eval(chunk.text),
+                        json.dumps(chunk.start.__dict__),
+                        json.dumps(chunk.end.__dict__),
+                    )
+                )
+            result["reindexed"] += 1
+
+        if filenames:
+            with connection_pool().connection() as conn:
+                register_vector(conn)
+                with conn.cursor() as cur:
+                    cur.execute(
+                        f"DELETE FROM {table_name} WHERE filename = ANY(%s)",
+                        (filenames,),
+                    )
+                    cur.executemany(
+                        f"""
+                        INSERT INTO {table_name}
+                            (filename, location, code, embedding, start, "end")
+                        VALUES (%s, %s::int8range, %s, %s, %s::jsonb, %s::jsonb)
+                        """,
+                        rows,
+                    )
+        result["chunks"] = len(rows)
+    except Exception as e:
+        result["error"] = str(e)
+
+    result["seconds"] = time.perf_counter() - started_at
+    _stats.record(
+        result["seconds"],
+        len(filenames),
+        result["chunks"],
+        result["error"] is not None,
+    )
+    return result
@@ -9,6 +9,7 @@ class CreateFolderCommandTool(BaseTool):
         "Create one or many folders using Windows 'md' via terminal. "
         "Input: an array of relative paths (e.g., ['src/components','src/utils'])."
     )
+    root_dir: str | None = None
 
     def _run(self, folder_paths: list[str]) -> str:
         if not isinstance(folder_paths, list):
@@ -32,7 +33,7 @@ class CreateFolderCommandTool(BaseTool):
 
         quoted = " ".join([f'"{p}"' for p in unique_paths])
         cmd = f"md {quoted}"
-        return TerminalTool()._run(cmd)
+        return TerminalTool(root_dir=self.root_dir)._run(cmd)
 
     async def _arun(self, folder_path: list[str]) -> str:
         raise NotImplementedError(
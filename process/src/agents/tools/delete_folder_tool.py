@@ -9,13 +9,14 @@ class DeleteFolderCommandTool(BaseTool):
         "Delete a single folder using Windows rmdir via terminal. "
         "Input: a single relative path (e.g., 'src/components')."
     )
+    root_dir: str | None = None
 
     def _run(self, folder_path: str) -> str:
         folder = (folder_path or "").strip().strip('"').strip("'")
         if not folder:
             return "No folder name provided."
         cmd = f'rmdir /S /Q "{folder}"'
-        return TerminalTool()._run(cmd)
+        return TerminalTool(root_dir=self.root_dir)._run(cmd)
 
     async def _arun(self, folder_path: str) -> str:
         raise NotImplementedError(
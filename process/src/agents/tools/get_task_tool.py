@@ -0,0 +1,26 @@
+import json
+from langchain.tools import BaseTool
+
+from agents.planning.plan_store import PlanStore
+
+
+class GetTaskTool(BaseTool):
+    name: str = "get_task"
+    description: str = (
+        "Get a single task from the plan by its id. "
+        "Input: the task id. Returns the task as JSON."
+    )
+
+    def _run(self, task_id: str) -> str:
+        try:
+            task = PlanStore.open_default().get_task(task_id)
+            if task is None:
+                return f"Task {task_id} does not exist."
+            return json.dumps(task, indent=2)
+        except Exception as e:
+            return f"Error reading plan: {str(e)}"
+
+    async def _arun(self, task_id: str) -> str:
+        raise NotImplementedError(
+            "Asynchronous execution is not supported for this tool."
+        )
@@ -1,8 +1,7 @@
 import os
 from langchain.tools import BaseTool
-from dotenv import load_dotenv
-
-load_dotenv()
+from utils.settings import get_settings
+from utils.tool_output import spill_output
 
 
 class ListCodebaseTool(BaseTool):
@@ -12,10 +11,11 @@ class ListCodebaseTool(BaseTool):
         "Shows the complete directory tree structure for the codebase. "
         "Useful for getting the complete directory structure of the codebase. "
     )
+    root_dir: str | None = None
 
     def _run(self) -> str:
         try:
-            dir_path = os.getenv("DATA_DIR_PATH")
+            dir_path = self.root_dir or get_settings().data_dir_path
             if not os.path.exists(dir_path):
                 return f"Error: Directory '{dir_path}' does not exist."
 
@@ -28,7 +28,7 @@ class ListCodebaseTool(BaseTool):
             output += "=" * 60 + "\n"
             output += structure
 
-            return output
+            return spill_output(self.name, output)
 
         except PermissionError:
             return f"Error: Permission denied when accessing directory '{dir_path}'."
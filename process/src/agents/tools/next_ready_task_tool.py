@@ -0,0 +1,32 @@
+import json
+import os
+from langchain.tools import BaseTool
+
+from agents.planning.plan_store import PlanStore
+
+
+class NextReadyTaskTool(BaseTool):
+    name: str = "next_ready_task"
+    description: str = (
+        "Pick the next task from the plan whose dependencies are all done "
+        "and atomically mark it as 'in progress'. "
+        "Returns the task as JSON, or a message when no task is ready."
+    )
+
+    def _run(self) -> str:
+        try:
+            store = PlanStore.open_default()
+            if not os.path.exists(store.plan_path):
+                return "No plan.json file found."
+
+            task = store.next_ready_task()
+            if task is None:
+                return "No ready tasks: all tasks are completed or blocked."
+            return json.dumps(task, indent=2)
+        except Exception as e:
+            return f"Error reading plan: {str(e)}"
+
+    async def _arun(self) -> str:
+        raise NotImplementedError(
+            "Asynchronous execution is not supported for this tool."
+        )
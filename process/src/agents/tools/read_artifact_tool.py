@@ -0,0 +1,78 @@
+from langchain.tools import BaseTool
+
+from utils.settings import get_settings
+from utils.tool_output import artifact_path
+
+
+class ReadArtifactTool(BaseTool):
+    name: str = "read_artifact"
+    description: str = (
+        "Read part of a large tool output that was stored as an artifact. "
+        "Input: the artifact handle from the tool output, and either a line range "
+        "(start_line, end_line; 1-based, inclusive) or a byte range (start_byte, end_byte; "
+        "0-based, end exclusive). Without a range, the beginning of the artifact is returned."
+    )
+
+    def _run(
+        self,
+        handle: str,
+        start_line: int | None = None,
+        end_line: int | None = None,
+        start_byte: int | None = None,
+        end_byte: int | None = None,
+    ) -> str:
+        path = artifact_path(handle)
+        if path is None:
+            return f"Error: no artifact named '{handle}'."
+
+        max_chars = get_settings().tool_output_max_chars or None
+        if start_byte is not None or end_byte is not None:
+            start = max(start_byte or 0, 0)
+            with open(path, "rb") as f:
+                f.seek(start)
+                size = None if end_byte is None else max(end_byte - start, 0)
+                if max_chars is not None:
+                    size = max_chars if size is None else min(size, max_chars)
+                data = f.read(-1 if size is None else size)
+            text = data.decode("utf-8", errors="replace")
+            end = start + len(data)
+            return f"[{handle} bytes {start}-{end}]\n{text}"
+
+        first = max(start_line or 1, 1)
+        lines = []
+        length = 0
+        last = first - 1
+        line_start = 0
+        with open(path, "rb") as f:
+            for number, data in enumerate(f, 1):
+                if number < first:
+                    line_start += len(data)
+                    continue
+                if end_line is not None and number > end_line:
+                    break
+                line = data.decode("utf-8", errors="replace")
+                if max_chars is not None and length + len(line) > max_chars:
+                    if lines:
+                        lines.append(
+                            f"... [truncated, continue with start_line={number}]\n"
+                        )
+                    else:
+                        # A single line longer than the budget, e.g. minified JSON
+                        kept = line[:max_chars]
+                        next_byte = line_start + len(kept.encode("utf-8"))
+                        lines.append(
+                            f"{kept}\n... [line {number} truncated at {max_chars} "
+                            f"characters, continue with start_byte={next_byte}]\n"
+                        )
+                        last = number
+                    break
+                lines.append(line)
+                length += len(line)
+                last = number
+                line_start += len(data)
+        return f"[{handle} lines {first}-{last}]\n" + "".join(lines)
+
+    async def _arun(self, handle: str, **kwargs) -> str:
+        raise NotImplementedError(
+            "Asynchronous execution is not supported for this tool."
+        )
@@ -1,8 +1,7 @@
 import os
 from langchain.tools import BaseTool
-from dotenv import load_dotenv
-
-load_dotenv()
+from utils.settings import get_settings
+from utils.tool_output import spill_output
 
 
 class ReadCodebaseTool(BaseTool):
@@ -12,18 +11,22 @@ class ReadCodebaseTool(BaseTool):
         "Useful for analyzing entire codebases. "
         "Useful for getting the complete code content of the codebase. "
     )
+    root_dir: str | None = None
+    # Whether oversized output is stored as an artifact (see spill_output)
+    spill: bool = True
 
     def _run(self) -> str:
         """Read all codebase files recursively"""
         try:
-            dir_path = os.getenv("DATA_DIR_PATH")
+            dir_path = self.root_dir or get_settings().data_dir_path
             if not os.path.exists(dir_path) or not os.path.isdir(dir_path):
                 return f"Error: {dir_path}"
 
             output = []
 
             for root, dirs, files in os.walk(dir_path):
-                for file in files:
+                dirs.sort()
+                for file in sorted(files):
 
                     file_path = os.path.join(root, file)
 
@@ -34,7 +37,8 @@ class ReadCodebaseTool(BaseTool):
                     except:
                         pass
 
-            return "\n".join(output)
+            output = "\n".join(output)
+            return spill_output(self.name, output) if self.spill else output
 
         except Exception as e:
             return f"Error: {str(e)}"
@@ -0,0 +1,350 @@
+from concurrent.futures import ThreadPoolExecutor
+import ast
+import json
+import subprocess
+import tempfile
+import time
+import xml.etree.ElementTree as ElementTree
+
+from langchain.tools import BaseTool
+
+from utils.settings import get_settings
+import os
+
+MAX_MESSAGE_CHARS = 600
+# Changed files that cannot affect tests
+DOC_EXTENSIONS = (".md", ".rst")
+
+
+def is_test_file(path: str) -> bool:
+    name = os.path.basename(path)
+    return name.endswith(".py") and (
+        name.startswith("test_") or name.endswith("_test.py")
+    )
+
+
+def python_files(root_dir: str) -> list[str]:
+    """Python files relative to root_dir, skipping hidden directories and venvs"""
+    files = []
+    for root, dirs, names in os.walk(root_dir):
+        dirs[:] = sorted(
+            d
+            for d in dirs
+            if not d.startswith(".") and d not in ("venv", "__pycache__")
+        )
+        for name in sorted(names):
+            if name.endswith(".py"):
+                path = os.path.relpath(os.path.join(root, name), root_dir)
+                files.append(path.replace(os.sep, "/"))
+    return files
+
+
+def module_names(path: str) -> list[str]:
+    """
+    Dotted names a file may be imported as: its full dotted path and every
+    suffix of it, as the package root (e.g. src/) is not known.
+    """
+    parts = path.removesuffix(".py").split("/")
+    if parts[-1] == "__init__":
+        parts = parts[:-1]
+    return [".".join(parts[i:]) for i in range(len(parts)) if parts[i:]]
+
+
+def imported_names(path: str, source: str) -> set[str]:
+    """Dotted names imported by a module, with relative imports resolved"""
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return set()
+
+    package = path.removesuffix(".py").split("/")[:-1]
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                base = package[: len(package) - node.level + 1]
+                module = ".".join(base + ([node.module] if node.module else []))
+            else:
+                module = node.module or ""
+            if module:
+                names.add(module)
+            names.update(
+                f"{module}.{alias.name}" if module else alias.name
+                for alias in node.names
+            )
+    return names
+
+
+def import_graph(root_dir: str) -> dict[str, set[str]]:
+    """Files each Python file imports, within the repository"""
+    files = python_files(root_dir)
+    by_name: dict[str, list[str]] = {}
+    for path in files:
+        for name in module_names(path):
+            by_name.setdefault(name, []).append(path)
+
+    graph = {}
+    for path in files:
+        try:
+            with open(os.path.join(root_dir, path), "r", encoding="utf-8") as f:
+                source = f.read()
+        except (OSError, UnicodeDecodeError):
+            source = ""
+        graph[path] = {
+            dependency
+            for name in imported_names(path, source)
+            for dependency in by_name.get(name, [])
+            if dependency != path
+        }
+    return graph
+
+
+def affected_files(graph: dict[str, set[str]], changed: list[str]) -> set[str]:
+    """Changed files and the files that import them, directly or not"""
+    dependents: dict[str, set[str]] = {}
+    for path, dependencies in graph.items():
+        for dependency in dependencies:
+            dependents.setdefault(dependency, set()).add(path)
+
+    affected = set(changed)
+    queue = list(changed)
+    while queue:
+        for dependent in dependents.get(queue.pop(), ()):
+            if dependent not in affected:
+                affected.add(dependent)
+                queue.append(dependent)
+    return affected
+
+
+def affected_tests(graph: dict[str, set[str]], changed: list[str]) -> list[str]:
+    """Test files that are changed or import a changed file, directly or not"""
+    affected = affected_files(graph, changed)
+    return sorted(path for path in affected if is_test_file(path) and path in graph)
+
+
+def tests_under(graph: dict[str, set[str]], directory: str) -> list[str]:
+    prefix = f"{directory}/" if directory else ""
+    return sorted(
+        path for path in graph if is_test_file(path) and path.startswith(prefix)
+    )
+
+
+def conservative_tests(
+    graph: dict[str, set[str]], changed: list[str]
+) -> tuple[list[str], list[str]]:
+    """
+    Tests for the changes the import graph cannot follow, and those changes.
+
+    pytest loads conftest.py (and what it imports) without the tests importing
+    it, so a change there selects every test under the conftest's directory.
+    A changed data or config file, or a deleted module, selects every test
+    under the nearest directory that has tests, up to the whole suite.
+    """
+    tests = set()
+    reasons = []
+    for path in sorted(affected_files(graph, changed)):
+        if os.path.basename(path) == "conftest.py" and path in graph:
+            tests.update(tests_under(graph, os.path.dirname(path)))
+            reasons.append(path)
+    for path in changed:
+        if path in graph or path.endswith(DOC_EXTENSIONS):
+            continue
+        directory = os.path.dirname(path)
+        while directory and not tests_under(graph, directory):
+            directory = os.path.dirname(directory)
+        tests.update(tests_under(graph, directory))
+        reasons.append(path)
+    return sorted(tests), reasons
+
+
+def git_changed_files(root_dir: str) -> list[str]:
+    """Files changed in the working tree since HEAD, including untracked ones"""
+    result = subprocess.run(
+        ["git", "status", "--porcelain", "--untracked-files=all", "."],
+        cwd=root_dir,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    prefix = subprocess.run(
+        ["git", "rev-parse", "--show-prefix"],
+        cwd=root_dir,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip()
+
+    files = []
+    for line in result.stdout.splitlines():
+        path = line[3:].split(" -> ")[-1].strip('"')
+        files.append(path.removeprefix(prefix))
+    return files
+
+
+def run_test_file(root_dir: str, path: str, timeout: float, python_path: str) -> dict:
+    """Run one test file with pytest and collect its per-test results"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        report_path = os.path.join(temp_dir, "report.xml")
+        started_at = time.perf_counter()
+        try:
+            completed = subprocess.run(
+                [
+                    python_path,
+                    "-m",
+                    "pytest",
+                    "-q",
+                    "-p",
+                    "no:cacheprovider",
+                    f"--junitxml={report_path}",
+                    path,
+                ],
+                cwd=root_dir,
+                capture_output=True,
+                text=True,
+                timeout=timeout,
+            )
+        except subprocess.TimeoutExpired:
+            return {
+                "file": path,
+                "outcome": "timeout",
+                "seconds": time.perf_counter() - started_at,
+                "tests": [],
+            }
+        seconds = time.perf_counter() - started_at
+
+        tests = []
+        if os.path.exists(report_path):
+            for case in ElementTree.parse(report_path).iter("testcase"):
+                problem = next(
+                    (
+                        child
+                        for child in case
+                        if child.tag in ("failure", "error", "skipped")
+                    ),
+                    None,
+                )
+                test = {
+                    "name": f"{case.get('classname')}::{case.get('name')}",
+                    "outcome": problem.tag if problem is not None else "passed",
+                    "seconds": float(case.get("time") or 0),
+                }
+                if problem is not None and problem.tag != "skipped":
+                    message = problem.get("message") or problem.text or ""
+                    test["message"] = message[:MAX_MESSAGE_CHARS]
+                tests.append(test)
+
+    if completed.returncode in (0, 5) and not any(
+        test["outcome"] in ("failure", "error") for test in tests
+    ):
+        outcome = "passed"
+    elif tests:
+        outcome = "failed"
+    else:
+        outcome = "error"
+    result = {"file": path, "outcome": outcome, "seconds": seconds, "tests": tests}
+    if outcome == "error":
+        result["message"] = (completed.stdout + completed.stderr)[-MAX_MESSAGE_CHARS:]
+    return result
+
+
+class RunTestsTool(BaseTool):
+    name: str = "run_tests"
+    description: str = (
+        "Run the tests affected by the files changed in the current task. "
+        "Uses the repository's import graph to select the test files that are changed "
+        "or import a changed module (directly or not), and runs them with pytest in "
+        "parallel worker processes. Changes the import graph cannot follow (conftest.py, "
+        "data or config files) select every test under their directory, and the output "
+        "marks such a selection as conservative. Input: optional list of changed file paths relative "
+        "to the codebase (default: files changed since the last git commit). "
+        "Returns JSON with pass/fail counts, per-file durations and failure messages."
+    )
+    root_dir: str | None = None
+
+    def _run(self, changed_files: list[str] | None = None) -> str:
+        settings = get_settings()
+        root_dir = self.root_dir or settings.input_dir_path
+        started_at = time.perf_counter()
+        try:
+            changed = changed_files or git_changed_files(root_dir)
+        except (OSError, subprocess.CalledProcessError) as e:
+            return f"Error: cannot determine the changed files ({e}), pass them explicitly."
+
+        changed = [path.replace(os.sep, "/").removeprefix("./") for path in changed]
+        graph = import_graph(root_dir)
+        conservative, reasons = conservative_tests(graph, changed)
+        selected = sorted(set(affected_tests(graph, changed)) | set(conservative))
+        selection = (
+            {
+                "selection": "conservative",
+                "selection_reason": "changed files outside the import graph "
+                "(conftest.py, data, config or deleted files) select every test "
+                f"under their directory: {', '.join(reasons)}",
+            }
+            if reasons
+            else {"selection": "import graph"}
+        )
+        if not selected:
+            return json.dumps(
+                {
+                    "changed_files": changed,
+                    "selected_tests": [],
+                    **selection,
+                    "summary": "no tests affected",
+                }
+            )
+
+        with ThreadPoolExecutor(max_workers=settings.test_workers) as executor:
+            results = list(
+                executor.map(
+                    lambda path: run_test_file(
+                        root_dir,
+                        path,
+                        settings.test_timeout_seconds,
+                        settings.input_dir_python_path or "python",
+                    ),
+                    selected,
+                )
+            )
+
+        tests = [test for result in results for test in result["tests"]]
+        counts = {
+            outcome: sum(test["outcome"] == outcome for test in tests)
+            for outcome in ("passed", "failure", "error", "skipped")
+        }
+        return json.dumps(
+            {
+                "changed_files": changed,
+                "selected_tests": selected,
+                **selection,
+                "passed": all(result["outcome"] == "passed" for result in results),
+                "counts": counts,
+                "seconds": round(time.perf_counter() - started_at, 2),
+                "files": [
+                    {
+                        key: round(value, 2) if key == "seconds" else value
+                        for key, value in result.items()
+                        if key != "tests"
+                    }
+                    for result in results
+                ],
+                "failures": [
+                    {
+                        "test": test["name"],
+                        "outcome": test["outcome"],
+                        "seconds": round(test["seconds"], 2),
+                        "message": test.get("message", ""),
+                    }
+                    for test in tests
+                    if test["outcome"] in ("failure", "error")
+                ],
+            },
+            indent=1,
+        )
+
+    async def _arun(self, changed_files: list[str] | None = None) -> str:
+        raise NotImplementedError(
+            "Asynchronous execution is not supported for this tool."
+        )
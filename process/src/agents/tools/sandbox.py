@@ -0,0 +1,279 @@
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+import json
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+from utils.settings import get_settings
+import os
+
+READ_CHUNK_BYTES = 64 * 1024
+SAMPLE_INTERVAL_SECONDS = 0.1
+# Process groups are sampled through /proc where available, on top of the
+# per-process rlimits that stay as a hard backstop between two samples
+HAS_PROC = os.path.isdir("/proc/self")
+
+# Applies the rlimits in a fresh interpreter, then replaces it with the shell:
+# unlike preexec_fn this is safe when the caller has other threads running
+LIMIT_AND_EXEC = """
+import json, os, resource, sys
+for name, limit in json.loads(sys.argv[1]).items():
+    resource.setrlimit(getattr(resource, name), tuple(limit))
+os.execv("/bin/sh", ["/bin/sh", "-c", sys.argv[2]])
+"""
+
+
+@dataclass
+class SandboxLimits:
+    timeout_seconds: float
+    cpu_seconds: int | None
+    memory_bytes: int | None
+    max_processes: int | None
+    max_output_bytes: int
+
+    @classmethod
+    def from_settings(cls) -> "SandboxLimits":
+        settings = get_settings()
+        return cls(
+            timeout_seconds=settings.terminal_timeout_seconds,
+            cpu_seconds=settings.terminal_cpu_seconds or None,
+            memory_bytes=(settings.terminal_memory_mb or 0) * 1024 * 1024 or None,
+            max_processes=settings.terminal_max_processes or None,
+            max_output_bytes=settings.terminal_max_output_bytes,
+        )
+
+
+@dataclass
+class SandboxResult:
+    stdout: str
+    stderr: str
+    returncode: int
+    # Why the process group was killed: timeout, output, cpu, memory or process limit
+    killed: str | None
+    wall_seconds: float
+    user_seconds: float
+    system_seconds: float
+    max_rss_mb: float
+    max_processes: int | None
+    # How the memory and process limits were enforced
+    enforcement: str
+
+    def usage(self) -> str:
+        usage = (
+            f"Resource usage: wall {self.wall_seconds:.1f}s, "
+            f"cpu {self.user_seconds:.1f}s user + {self.system_seconds:.1f}s system, "
+            f"max RSS {self.max_rss_mb:.0f} MB"
+            + (
+                f" ({self.max_processes} processes at most)"
+                if self.max_processes
+                else ""
+            )
+            + f", exit code {self.returncode}, limits: {self.enforcement}"
+        )
+        return usage + (f", killed ({self.killed})" if self.killed else "")
+
+
+def rlimits(limits: SandboxLimits) -> dict[str, tuple[int, int]]:
+    """
+    Per-process resource limits of the command, by resource name.
+
+    With /proc, memory and process count are enforced for the whole group by
+    sampling, and RLIMIT_DATA / RLIMIT_NPROC only stop a single process's
+    allocation or a fork burst faster than the sampler. RLIMIT_NPROC counts
+    every process of the user, so it is set relative to the current count.
+    """
+    import resource
+
+    result = {"RLIMIT_CORE": (0, 0)}
+    if limits.cpu_seconds:
+        # SIGXCPU at the soft limit, SIGKILL one second later
+        result["RLIMIT_CPU"] = (limits.cpu_seconds, limits.cpu_seconds + 1)
+    if limits.memory_bytes:
+        name = "RLIMIT_DATA" if HAS_PROC else "RLIMIT_AS"
+        result[name] = (limits.memory_bytes, limits.memory_bytes)
+    if limits.max_processes:
+        nproc = limits.max_processes
+        if HAS_PROC:
+            nproc += user_process_count()
+        _, hard = resource.getrlimit(resource.RLIMIT_NPROC)
+        if hard != resource.RLIM_INFINITY:
+            nproc = min(nproc, hard)
+        result["RLIMIT_NPROC"] = (nproc, nproc)
+    return result
+
+
+def user_process_count() -> int:
+    uid = os.getuid()
+    count = 0
+    for entry in os.listdir("/proc"):
+        try:
+            if entry.isdigit() and os.stat(f"/proc/{entry}").st_uid == uid:
+                count += 1
+        except OSError:
+            continue
+    return count
+
+
+def sample_group(pgid: int) -> tuple[int, int]:
+    """Number of processes and total RSS in bytes of a process group, from /proc"""
+    processes = rss_pages = 0
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "rb") as f:
+                # Fields after the command name, starting with the state (field 3)
+                fields = f.read().rsplit(b")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[2]) == pgid:
+            processes += 1
+            rss_pages += int(fields[21])
+    return processes, rss_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def run_sandboxed(command: str, cwd: str, limits: SandboxLimits) -> SandboxResult:
+    """
+    Run a shell command in its own process group under resource limits.
+
+    CPU time is capped per process with RLIMIT_CPU. On Linux, the group's
+    total RSS and process count are sampled from /proc like a cgroup's, and
+    the whole group is killed when either exceeds its limit; RLIMIT_DATA and
+    RLIMIT_NPROC remain as hard per-process backstops. Elsewhere they fall
+    back to RLIMIT_AS and RLIMIT_NPROC. The group is also killed on timeout,
+    or once stdout and stderr together exceed max_output_bytes. Processes
+    left behind in the group are killed when the command exits. POSIX only.
+    """
+    started_at = time.perf_counter()
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-I",
+            "-S",
+            "-c",
+            LIMIT_AND_EXEC,
+            json.dumps(rlimits(limits)),
+            command,
+        ],
+        cwd=cwd,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        start_new_session=True,
+    )
+
+    killed = []
+    lock = threading.Lock()
+    output_bytes = [0]
+
+    def kill(reason: str):
+        with lock:
+            if not killed:
+                killed.append(reason)
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    def read(stream, chunks: list[bytes]):
+        for chunk in iter(lambda: stream.read1(READ_CHUNK_BYTES), b""):
+            with lock:
+                kept = max(limits.max_output_bytes - output_bytes[0], 0)
+                output_bytes[0] += len(chunk)
+                exceeded = output_bytes[0] > limits.max_output_bytes
+            chunks.append(chunk[:kept])
+            if exceeded:
+                kill("output limit")
+                break
+        stream.close()
+
+    stdout_chunks: list[bytes] = []
+    stderr_chunks: list[bytes] = []
+    readers = [
+        threading.Thread(target=read, args=(process.stdout, stdout_chunks)),
+        threading.Thread(target=read, args=(process.stderr, stderr_chunks)),
+    ]
+    for reader in readers:
+        reader.start()
+    timer = threading.Timer(limits.timeout_seconds, kill, ("timeout",))
+    timer.start()
+
+    finished = threading.Event()
+    peak = {"processes": 0, "rss": 0}
+
+    def monitor():
+        while not finished.wait(SAMPLE_INTERVAL_SECONDS):
+            processes, rss = sample_group(process.pid)
+            peak["processes"] = max(peak["processes"], processes)
+            peak["rss"] = max(peak["rss"], rss)
+            if limits.memory_bytes and rss > limits.memory_bytes:
+                kill("memory limit")
+            elif limits.max_processes and processes > limits.max_processes:
+                kill("process limit")
+
+    if HAS_PROC:
+        monitor_thread = threading.Thread(target=monitor, daemon=True)
+        monitor_thread.start()
+
+    _, status, rusage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    timer.cancel()
+    finished.set()
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+    for reader in readers:
+        reader.join(timeout=5)
+
+    # SIGXCPU is only sent at the RLIMIT_CPU soft limit; the shell reports a
+    # child killed by a signal as 128 + the signal number
+    if (
+        not killed
+        and limits.cpu_seconds
+        and signal.SIGXCPU in (-process.returncode, process.returncode - 128)
+    ):
+        killed.append("cpu limit")
+
+    if HAS_PROC:
+        max_rss = peak["rss"] / (1024 * 1024)
+    else:
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS; it includes
+        # the memory of this process the shell was forked from
+        max_rss = rusage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return SandboxResult(
+        stdout=b"".join(stdout_chunks).decode("utf-8", errors="replace"),
+        stderr=b"".join(stderr_chunks).decode("utf-8", errors="replace"),
+        returncode=process.returncode,
+        killed=killed[0] if killed else None,
+        wall_seconds=time.perf_counter() - started_at,
+        user_seconds=rusage.ru_utime,
+        system_seconds=rusage.ru_stime,
+        max_rss_mb=max_rss,
+        max_processes=peak["processes"] or None,
+        enforcement=(
+            "rlimits, group memory and processes sampled from /proc"
+            if HAS_PROC
+            else "rlimits"
+        ),
+    )
+
+
+def record_usage(command: str, result: SandboxResult):
+    """Append the command's resource usage to output/terminal_usage.jsonl"""
+    usage_path = os.path.join(get_settings().output_dir, "terminal_usage.jsonl")
+    os.makedirs(os.path.dirname(usage_path), exist_ok=True)
+    record = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "command": command,
+        **{
+            key: value
+            for key, value in asdict(result).items()
+            if key not in ("stdout", "stderr")
+        },
+    }
+    with open(usage_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
@@ -1,30 +1,141 @@
-import os
 from langchain.tools import BaseTool
-import cocoindex
 import functools
-from numpy.typing import NDArray
-import numpy as np
-from psycopg_pool import ConnectionPool
-from pgvector.psycopg import register_vector
-from dotenv import load_dotenv
-
-load_dotenv()
-
-
-@cocoindex.transform_flow()
-def code_to_embedding(
-    text: cocoindex.DataSlice[str],
-) -> cocoindex.DataSlice[NDArray[np.float32]]:
-    return text.transform(
-        cocoindex.functions.SentenceTransformerEmbed(
-            model="sentence-transformers/all-MiniLM-L6-v2"
+import re
+
+from utils.search_cache import get_search_cache, normalize_query
+from utils.settings import get_settings
+from utils.tool_output import spill_output
+
+EMBEDDING_DIMENSIONS = 384
+
+# Distance used by the ANN stage for each compressed VECTOR_STORAGE mode; it
+# matches the expression indexed by indexing/ann_index.py
+ANN_DISTANCES = {
+    "halfvec": (
+        f"embedding::halfvec({EMBEDDING_DIMENSIONS}) "
+        f"<=> %(query)s::halfvec({EMBEDDING_DIMENSIONS})"
+    ),
+    "binary": (
+        f"binary_quantize(embedding)::bit({EMBEDDING_DIMENSIONS}) "
+        "<~> binary_quantize(%(query)s::vector)"
+    ),
+}
+
+
+@functools.cache
+def code_to_embedding():
+    """
+    Embedding flow for search queries.
+
+    cocoindex, numpy and the embedding model are imported on first use, so
+    importing this module stays cheap for agents that never search.
+    """
+    import cocoindex
+    from numpy.typing import NDArray
+    import numpy as np
+
+    @cocoindex.transform_flow()
+    def code_to_embedding(
+        text: cocoindex.DataSlice[str],
+    ) -> cocoindex.DataSlice[NDArray[np.float32]]:
+        return text.transform(
+            cocoindex.functions.SentenceTransformerEmbed(
+                model="sentence-transformers/all-MiniLM-L6-v2"
+            )
         )
-    )
+
+    return code_to_embedding
 
 
 @functools.cache
-def connection_pool() -> ConnectionPool:
-    return ConnectionPool(os.getenv("COCOINDEX_DATABASE_URL"))
+def connection_pool():
+    from psycopg_pool import ConnectionPool
+
+    return ConnectionPool(get_settings().cocoindex_database_url)
+
+
+def index_table_name(project_id: str | None) -> str:
+    """
+    Table holding the embeddings of a project, as created by indexing/main.py:
+    each PROJECT_ID is indexed by its own flow into its own table.
+    """
+    project = re.sub(r"[^a-z0-9_]+", "_", (project_id or "").strip().lower())
+    flow_name = f"CodeEmbedding_{project}" if project else "CodeEmbedding"
+    return f"{flow_name}__code_embeddings".lower()
+
+
+def index_version(cursor, table_name: str) -> tuple[int, int] | None:
+    """
+    Version of the index table, maintained by the trigger installed with
+    indexing/index_version.py, or None when the trigger is not installed.
+
+    The table's oid is part of the version, as a reset recreates the table.
+    """
+    row = cursor.execute(
+        """
+        SELECT tgrelid FROM pg_trigger
+        WHERE tgrelid = to_regclass(%s) AND tgname = 'bump_code_index_version'
+        """,
+        (table_name,),
+    ).fetchone()
+    if row is None:
+        return None
+    version = cursor.execute(
+        "SELECT version FROM code_index_versions WHERE table_name = %s",
+        (table_name,),
+    ).fetchone()
+    return row[0], version[0] if version else 0
+
+
+def search_index(
+    cursor,
+    table_name: str,
+    query_vector,
+    k: int,
+    vector_storage: str = "vector",
+    rerank_candidates: int = 50,
+) -> list[tuple]:
+    """
+    Top k rows of (filename, code, distance, start, end) for a query vector.
+
+    With a compressed storage mode the ANN index only finds rerank_candidates
+    candidates, which are then re-ranked by their full-precision distance.
+    """
+    if vector_storage == "vector":
+        return cursor.execute(
+            f"""
+            SELECT filename, code, embedding <=> %(query)s AS distance, start, "end"
+            FROM {table_name}
+            ORDER BY distance
+            LIMIT %(k)s
+            """,
+            {"query": query_vector, "k": k},
+        ).fetchall()
+
+    if vector_storage not in ANN_DISTANCES:
+        raise ValueError(
+            f"Unknown vector storage '{vector_storage}', expected one of: "
+            f"vector, {', '.join(ANN_DISTANCES)}"
+        )
+    candidates = max(rerank_candidates, k)
+    # HNSW returns at most ef_search rows, so it must cover all candidates
+    cursor.execute(
+        "SELECT set_config('hnsw.ef_search', %s, true)", (str(max(candidates, 40)),)
+    )
+    return cursor.execute(
+        f"""
+        SELECT filename, code, embedding <=> %(query)s AS distance, start, "end"
+        FROM (
+            SELECT filename, code, embedding, start, "end"
+            FROM {table_name}
+            ORDER BY {ANN_DISTANCES[vector_storage]}
+            LIMIT %(candidates)s
+        ) AS candidates
+        ORDER BY distance
+        LIMIT %(k)s
+        """,
+        {"query": query_vector, "k": k, "candidates": candidates},
+    ).fetchall()
 
 
 class SearchCodebaseTool(BaseTool):
@@ -36,6 +147,8 @@ class SearchCodebaseTool(BaseTool):
         "Useful for finding specific functionality, classes, functions, or patterns in the codebase. "
         "Usage: query='your search query' k=5 (optional, default is 5)"
     )
+    # Project whose index is searched, defaults to PROJECT_ID
+    project_id: str | None = None
 
     def _run(self, query: str, k: int = 5) -> str:
         """
@@ -49,24 +162,42 @@ class SearchCodebaseTool(BaseTool):
             String containing search results with code snippets and file locations
         """
         try:
-            query_vector = code_to_embedding.eval(query)
-            table_name = "CodeEmbedding__code_embeddings"
+            from pgvector.psycopg import register_vector
+
+            settings = get_settings()
+            table_name = index_table_name(self.project_id or settings.project_id)
             top_k = k
+            cache = get_search_cache()
 
             with connection_pool().connection() as conn:
                 register_vector(conn)
                 with conn.cursor() as cur:
-                    cur.execute(
-                        f"""
-                        SELECT filename, code, embedding <=> %s AS distance, start, "end"
-                        FROM {table_name} 
-                        ORDER BY distance 
-                        LIMIT %s
-                        """,
-                        (query_vector, top_k),
+                    # Read before searching, so results are never cached under
+                    # a version older than the rows they were read from
+                    version = index_version(cur, table_name) if cache else None
+                    cache_key = (
+                        normalize_query(query),
+                        top_k,
+                        table_name,
+                        settings.vector_storage,
+                        settings.search_rerank_candidates,
+                        version,
                     )
-
-                    results = cur.fetchall()
+                    results = cache.get(cache_key) if version is not None else None
+                    if results is None:
+                        query_vector = code_to_embedding().eval(query)
+                        results = search_index(
+                            cur,
+                            table_name,
+                            query_vector,
+                            top_k,
+                            settings.vector_storage,
+                            settings.search_rerank_candidates,
+                        )
+                        if version is not None:
+                            cache.put(cache_key, results)
+                        elif cache:
+                            cache.record_uncached()
 
                     if not results:
                         return f"No results found for query: '{query}'"
@@ -88,7 +219,7 @@ class SearchCodebaseTool(BaseTool):
                         output += f"Code:\n```\n{code}\n```\n"
                         output += "-" * 30 + "\n\n"
 
-                    return output.strip()
+                    return spill_output(self.name, output.strip())
 
         except Exception as e:
             return f"Error searching codebase: {str(e)}"
@@ -0,0 +1,23 @@
+from langchain.tools import BaseTool
+
+from agents.planning.plan_store import PlanStore, STATUSES
+
+
+class SetTaskStatusTool(BaseTool):
+    name: str = "set_task_status"
+    description: str = (
+        "Update the status of a single task in the plan. "
+        f"Input: the task id and the new status ({', '.join(STATUSES)})."
+    )
+
+    def _run(self, task_id: str, status: str) -> str:
+        try:
+            PlanStore.open_default().set_status(task_id, status)
+            return f"Task {task_id} status set to '{status}'."
+        except Exception as e:
+            return f"Error updating task {task_id}: {str(e)}"
+
+    async def _arun(self, task_id: str, status: str) -> str:
+        raise NotImplementedError(
+            "Asynchronous execution is not supported for this tool."
+        )
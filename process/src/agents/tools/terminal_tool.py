@@ -1,9 +1,9 @@
+import os
 import subprocess
 from langchain.tools import BaseTool
-from dotenv import load_dotenv
-import os
-
-load_dotenv()
+from agents.tools.sandbox import SandboxLimits, record_usage, run_sandboxed
+from utils.settings import get_settings
+from utils.tool_output import spill_output
 
 
 class TerminalTool(BaseTool):
@@ -12,30 +12,40 @@ class TerminalTool(BaseTool):
         "Execute a terminal command. "
         "Input must be a single string containing the shell command to execute."
     )
+    root_dir: str | None = None
 
     def _run(self, command: str) -> str:
         """
         Synchronous execution of a terminal command.
         """
         try:
-            result = subprocess.run(
-                command,
-                shell=True,
-                capture_output=True,
-                text=True,
-                cwd=os.getenv("INPUT_DIR_PATH"),
-                timeout=60,
-            )
+            settings = get_settings()
+            cwd = self.root_dir or settings.input_dir_path
+            usage = None
+            if settings.terminal_sandbox and os.name == "posix":
+                result = run_sandboxed(command, cwd, SandboxLimits.from_settings())
+                record_usage(command, result)
+                usage = result.usage()
+            else:
+                result = subprocess.run(
+                    command,
+                    shell=True,
+                    capture_output=True,
+                    text=True,
+                    cwd=cwd,
+                    timeout=settings.terminal_timeout_seconds,
+                )
             output = ""
             if result.stdout:
                 output += f"STDOUT:\n{result.stdout}\n"
             if result.stderr:
                 output += f"STDERR:\n{result.stderr}\n"
-            return (
-                output.strip()
+            output = (
+                spill_output(self.name, output.strip())
                 if output
                 else "Command executed successfully, but there was no output."
             )
+            return f"{output}\n{usage}" if usage else output
         except Exception as e:
             return f"Error executing command: {str(e)}"
 
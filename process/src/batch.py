@@ -0,0 +1,240 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import argparse
+import contextlib
+import json
+import time
+import traceback
+
+from utils.settings import load_settings
+import os
+
+# Rate and concurrency limits of the LLM client; their process-wide (or
+# manifest "defaults") values are totals, divided between the workers
+LLM_LIMITS = (
+    "llm_requests_per_second",
+    "llm_burst",
+    "llm_initial_concurrency",
+    "llm_max_concurrency",
+    "llm_max_connections",
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Run the workflow for several repositories in parallel."
+    )
+    parser.add_argument(
+        "manifest",
+        help="JSON file with a list of repositories, or an object with "
+        "'repositories' and optional 'defaults'. Each repository has an "
+        "input_dir_path, an optional name and any other setting to override "
+        "(e.g. input_dir_python_path, project_id). LLM rate and concurrency "
+        "limits are totals for the batch and can only be set in 'defaults'.",
+    )
+    parser.add_argument(
+        "--output-dir",
+        metavar="PATH",
+        help="Directory with one data directory per repository and the batch "
+        "summary (default: DATA_DIR_PATH/batch).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=2,
+        help="Number of repositories processed at the same time.",
+    )
+    return parser.parse_args()
+
+
+def load_manifest(path: str, output_dir: str) -> tuple[dict[str, dict], dict]:
+    """
+    Settings overrides of each repository, by repository name, and the
+    manifest's LLM limits for the whole batch
+
+    Raises:
+        ValueError: On an invalid repository entry or setting
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if isinstance(manifest, list):
+        manifest = {"repositories": manifest}
+    defaults = {
+        key.lower(): value for key, value in manifest.get("defaults", {}).items()
+    }
+    llm_limits = {key: defaults.pop(key) for key in LLM_LIMITS if key in defaults}
+    load_settings().with_overrides(llm_limits)
+
+    runs = {}
+    for entry in manifest["repositories"]:
+        entry = {key.lower(): value for key, value in entry.items()}
+        per_repository_limits = sorted(set(entry) & set(LLM_LIMITS))
+        if per_repository_limits:
+            raise ValueError(
+                f"{', '.join(per_repository_limits)} can only be set in the "
+                f"manifest defaults, as totals for the batch: {entry}"
+            )
+        overrides = {
+            # Paths shared through the environment would mix the repositories
+            "checkpoint_db_path": None,
+            "telemetry_dir_path": None,
+            **defaults,
+            **entry,
+        }
+        if not overrides.get("input_dir_path"):
+            raise ValueError(f"Repository without input_dir_path: {entry}")
+        name = overrides.pop("name", None) or os.path.basename(
+            os.path.normpath(overrides["input_dir_path"])
+        )
+        if name in runs:
+            raise ValueError(f"Duplicate repository name: {name}")
+        overrides.setdefault("data_dir_path", os.path.join(output_dir, name))
+        # Fails early on unknown settings or values
+        load_settings().with_overrides(overrides)
+        runs[name] = overrides
+    return runs, llm_limits
+
+
+def partition_llm_limits(workers: int, llm_limits: dict | None = None) -> dict:
+    """
+    Each worker's share of the LLM rate and concurrency limits, so that all
+    runs together stay within the limits of the process settings, or the
+    manifest's llm_limits totals
+    """
+    settings = load_settings().with_overrides(llm_limits or {})
+    share = {
+        "llm_requests_per_second": settings.llm_requests_per_second / workers,
+        "llm_burst": max(settings.llm_burst / workers, 1.0),
+        "llm_max_concurrency": max(settings.llm_max_concurrency // workers, 1),
+        "llm_max_connections": max(settings.llm_max_connections // workers, 1),
+    }
+    share["llm_initial_concurrency"] = min(
+        max(settings.llm_initial_concurrency // workers, 1),
+        share["llm_max_concurrency"],
+    )
+    return share
+
+
+def run_repository(name: str, overrides: dict) -> dict:
+    """Run the workflow for one repository, logging to its output directory"""
+    from main import run_pipeline
+
+    log_path = os.path.join(overrides["data_dir_path"], "output", "batch.log")
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    started_at = time.perf_counter()
+    with open(log_path, "a", encoding="utf-8") as log, contextlib.redirect_stdout(
+        log
+    ), contextlib.redirect_stderr(log):
+        try:
+            summary = run_pipeline(overrides, quiet=True)
+        except Exception as e:
+            traceback.print_exc()
+            summary = {"status": "failed", "error": f"{type(e).__name__}: {e}"}
+    return {
+        "name": name,
+        **summary,
+        "seconds": time.perf_counter() - started_at,
+        "log": log_path,
+    }
+
+
+def run_batch(
+    runs: dict[str, dict], workers: int, llm_limits: dict | None = None
+) -> dict:
+    """
+    Run the repositories on a pool of worker processes.
+
+    Each repository runs in a fresh process, so process-wide caches and
+    clients are never shared between two repositories; the LLM limits of the
+    process settings (or llm_limits) are divided between the workers, and the
+    share is applied after each repository's overrides.
+    """
+    workers = max(min(workers, len(runs)), 1)
+    limits = partition_llm_limits(workers, llm_limits)
+    started_at = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=1) as executor:
+        futures = {
+            executor.submit(run_repository, name, {**overrides, **limits}): name
+            for name, overrides in runs.items()
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # The worker process died, e.g. killed by the OS
+                result = {"name": name, "status": "failed", "error": repr(e)}
+            results.append(result)
+            print(f"{name}: {result['status']} ({len(results)}/{len(runs)})")
+
+    results.sort(key=lambda result: list(runs).index(result["name"]))
+    totals = {
+        key: sum(result.get(key, 0) for result in results)
+        for key in (
+            "model_calls",
+            "model_errors",
+            "input_tokens",
+            "output_tokens",
+            "cost",
+        )
+    }
+    return {
+        "workers": workers,
+        "llm_limits_per_worker": limits,
+        "seconds": time.perf_counter() - started_at,
+        "repositories": results,
+        "totals": {
+            "completed": sum(result["status"] == "completed" for result in results),
+            "failed": sum(result["status"] == "failed" for result in results),
+            **totals,
+        },
+    }
+
+
+def print_summary(summary: dict):
+    width = max(len(result["name"]) for result in summary["repositories"])
+    print(
+        f"{'repository':<{width}}  {'status':<10}  {'seconds':>8}  "
+        f"{'calls':>6}  {'tokens in':>10}  {'tokens out':>10}"
+    )
+    for result in summary["repositories"]:
+        print(
+            f"{result['name']:<{width}}  {result['status']:<10}  "
+            f"{result.get('seconds', 0):>8.1f}  {result.get('model_calls', 0):>6}  "
+            f"{result.get('input_tokens', 0):>10}  {result.get('output_tokens', 0):>10}"
+            + (f"  {result['error']}" if result.get("error") else "")
+        )
+    totals = summary["totals"]
+    print(
+        f"{totals['completed']} completed, {totals['failed']} failed in "
+        f"{summary['seconds']:.1f}s with {summary['workers']} workers; "
+        f"{totals['model_calls']} model calls, {totals['input_tokens']} input / "
+        f"{totals['output_tokens']} output tokens, cost {totals['cost']:.4f}"
+    )
+
+
+def main():
+    args = parse_args()
+    output_dir = args.output_dir
+    if output_dir is None:
+        if not load_settings().data_dir_path:
+            raise SystemExit("Set --output-dir or DATA_DIR_PATH")
+        output_dir = os.path.join(load_settings().data_dir_path, "batch")
+
+    output_dir = os.path.abspath(output_dir)
+    runs, llm_limits = load_manifest(args.manifest, output_dir)
+    if not runs:
+        raise SystemExit("The manifest has no repositories")
+
+    summary = run_batch(runs, args.workers, llm_limits)
+    os.makedirs(output_dir, exist_ok=True)
+    summary_path = os.path.join(output_dir, "batch_summary.json")
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=1)
+
+    print_summary(summary)
+    print(f"Batch summary written to {summary_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import os
+import random
+
+FIXTURE_SIZES = {"small": 50, "medium": 2_000, "large": 50_000}
+
+FILES_PER_PACKAGE = 100
+
+MODULE_TEMPLATE = '''"""Synthetic module {index} of the {size} benchmark fixture."""
+from dataclasses import dataclass
+
+from {import_path} import helper_{import_index}
+
+
+@dataclass
+class Record{index}:
+    identifier: int
+    name: str
+    amount: float
+
+    def total(self) -> float:
+        return self.amount * {factor}
+
+
+def helper_{index}(records: list[Record{index}]) -> float:
+    """Sum the totals of the records that pass validation."""
+    return sum(record.total() for record in records if validate_{index}(record))
+
+
+def validate_{index}(record: Record{index}) -> bool:
+    if record.identifier < 0:
+        return False
+    return bool(record.name) and record.amount >= {threshold}
+'''
+
+
+def fixture_path(base_dir: str, size: str) -> str:
+    return os.path.join(base_dir, f"fixture_{size}")
+
+
+def create_fixture_repo(base_dir: str, size: str) -> str:
+    """
+    Generate a synthetic Python repository with FIXTURE_SIZES[size] modules.
+
+    The content only depends on the size, so every run (and every commit)
+    benchmarks the same files. An existing fixture is reused.
+    """
+    root_dir = fixture_path(base_dir, size)
+    file_count = FIXTURE_SIZES[size]
+    marker = os.path.join(root_dir, ".complete")
+    if os.path.exists(marker):
+        return root_dir
+
+    rng = random.Random(f"{size}:{file_count}")
+    for index in range(file_count):
+        package = f"package_{index // FILES_PER_PACKAGE:03d}"
+        os.makedirs(os.path.join(root_dir, package), exist_ok=True)
+        init_path = os.path.join(root_dir, package, "__init__.py")
+        if not os.path.exists(init_path):
+            open(init_path, "w", encoding="utf-8").close()
+
+        import_index = rng.randrange(index) if index else 0
+        content = MODULE_TEMPLATE.format(
+            index=index,
+            size=size,
+            import_path=f"package_{import_index // FILES_PER_PACKAGE:03d}.module_{import_index:05d}",
+            import_index=import_index,
+            factor=rng.randint(1, 9),
+            threshold=rng.randint(0, 100),
+        )
+        module_path = os.path.join(root_dir, package, f"module_{index:05d}.py")
+        with open(module_path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+    with open(os.path.join(root_dir, "requirements.txt"), "w", encoding="utf-8") as f:
+        f.write("requests==2.32.3\n")
+    open(marker, "w", encoding="utf-8").close()
+    return root_dir
@@ -0,0 +1,307 @@
+"""
+Offline benchmark suite for the pipeline's own overhead.
+
+Runs against synthetic fixture repositories with a scripted chat model, so no
+API key is needed and model latency is excluded. Run from process/src:
+
+    python -m benchmarks.run --sizes small medium large
+    python -m benchmarks.run --compare previous.json
+    python -m benchmarks.startup
+    python -m benchmarks.vector_storage
+
+Indexing and search are only benchmarked when COCOINDEX_DATABASE_URL is set.
+Results are written as JSON keyed by commit, so runs can be compared.
+"""
+
+from datetime import datetime, timezone
+import argparse
+import json
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable
+
+from benchmarks.fixtures import FIXTURE_SIZES, create_fixture_repo
+from benchmarks.scripted_model import ScriptedChatModel
+from benchmarks.startup import benchmark_startup
+from utils.create_model import set_model_factory
+from utils.settings import get_settings, load_settings
+from utils.telemetry import TelemetryCallbackHandler
+import os
+
+INDEXING_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "..", "indexing")
+)
+
+SEARCH_QUERIES = [
+    "sum the totals of valid records",
+    "dataclass with identifier name and amount",
+    "validate that a record has a positive identifier",
+    "helper function importing another module",
+]
+
+COMPARED_KEYS = ("startup", "results")
+
+# Each scripted agent lists the codebase once, then answers
+SCRIPT = [("list_codebase", {})]
+
+
+def scripted_model_factory(model_name: str, agent_name: str | None):
+    return ScriptedChatModel(
+        script=SCRIPT,
+        agent_name=agent_name,
+        metadata={"agent_name": agent_name},
+    )
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def measure(fn: Callable[[], object], repeat: int) -> dict:
+    """Median and best wall time over `repeat` runs, plus peak Python memory of one run"""
+    timings = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started_at)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "median_seconds": statistics.median(timings),
+        "min_seconds": min(timings),
+        "peak_memory_bytes": peak,
+    }
+
+
+def benchmark_codebase_tools(root_dir: str, repeat: int) -> dict:
+    from agents.tools.list_codebase_tool import ListCodebaseTool
+    from agents.tools.read_codebase_tool import ReadCodebaseTool
+
+    return {
+        "list_codebase": measure(ListCodebaseTool(root_dir=root_dir)._run, repeat),
+        "read_codebase": measure(ReadCodebaseTool(root_dir=root_dir)._run, repeat),
+    }
+
+
+def benchmark_indexing(root_dir: str, file_count: int, **indexing_env: str) -> dict:
+    env = {**os.environ, "INPUT_DIR_PATH": root_dir, **indexing_env}
+    started_at = time.perf_counter()
+    subprocess.run(
+        ["cocoindex", "update", "--reset", "--force", "--quiet", "main.py"],
+        cwd=INDEXING_DIR,
+        env=env,
+        check=True,
+    )
+    seconds = time.perf_counter() - started_at
+
+    from agents.tools.search_codebase_tool import connection_pool, index_table_name
+
+    table_name = index_table_name(get_settings().project_id)
+    with connection_pool().connection() as conn:
+        chunks = conn.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+
+    return {
+        "seconds": seconds,
+        "files": file_count,
+        "chunks": chunks,
+        "files_per_second": file_count / seconds,
+        "chunks_per_second": chunks / seconds,
+    }
+
+
+def benchmark_search(repeat: int) -> dict:
+    from agents.tools.search_codebase_tool import SearchCodebaseTool
+
+    tool = SearchCodebaseTool()
+    # Loads the embedding model and opens the connection pool
+    tool._run(SEARCH_QUERIES[0])
+
+    latencies = []
+    errors = 0
+    for _ in range(repeat):
+        for query in SEARCH_QUERIES:
+            started_at = time.perf_counter()
+            result = tool._run(query)
+            latencies.append((time.perf_counter() - started_at) * 1000)
+            errors += int(result.startswith("Error"))
+
+    return {
+        "queries": len(latencies),
+        "errors": errors,
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+    }
+
+
+def run_graph(graph, graph_input: dict, telemetry_dir: str) -> dict:
+    os.makedirs(telemetry_dir, exist_ok=True)
+    telemetry = TelemetryCallbackHandler(telemetry_dir)
+
+    started_at = time.perf_counter()
+    graph.invoke(graph_input, {"callbacks": [telemetry]})
+    seconds = time.perf_counter() - started_at
+
+    model_seconds = sum(t["seconds"] for t in telemetry.agent_totals.values())
+    return {
+        "seconds": seconds,
+        "overhead_seconds": seconds - model_seconds,
+        "model_calls": int(sum(t["calls"] for t in telemetry.agent_totals.values())),
+        "tool_calls": int(sum(t["calls"] for t in telemetry.tool_totals.values())),
+    }
+
+
+def use_fixture(root_dir: str, data_dir: str):
+    os.environ["INPUT_DIR_PATH"] = root_dir
+    os.environ["DATA_DIR_PATH"] = data_dir
+    load_settings.cache_clear()
+
+
+def benchmark_discovery(root_dir: str, data_dir: str) -> dict:
+    use_fixture(root_dir, data_dir)
+    from agents.discovery.workflow import create_discovery_workflow
+
+    return run_graph(
+        create_discovery_workflow(),
+        {"messages": [{"role": "user", "content": "Analyze the codebase"}]},
+        os.path.join(data_dir, "telemetry", "discovery"),
+    )
+
+
+def benchmark_development(root_dir: str, data_dir: str) -> dict:
+    use_fixture(root_dir, data_dir)
+    from agents.development.workflow import create_development_workflow
+
+    return run_graph(
+        create_development_workflow(root_dir=root_dir),
+        {"messages": [{"role": "user", "content": "Implement the task"}]},
+        os.path.join(data_dir, "telemetry", "development"),
+    )
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline_path: str, results: dict):
+    """Print the relative change of every timing against a previous results file"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    def timings(node: dict, prefix: str = ""):
+        for key, value in node.items():
+            if isinstance(value, dict):
+                yield from timings(value, f"{prefix}{key}.")
+            elif key.endswith(("seconds", "_ms")) and isinstance(value, (int, float)):
+                yield f"{prefix}{key}", value
+
+    previous = dict(timings({key: baseline.get(key, {}) for key in COMPARED_KEYS}))
+    print(f"Compared with {baseline.get('commit')} ({baseline_path}):")
+    for name, value in timings({key: results[key] for key in COMPARED_KEYS}):
+        if previous.get(name):
+            change = (value - previous[name]) / previous[name]
+            print(f"  {name}: {previous[name]:.4f} -> {value:.4f} ({change:+.1%})")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline offline.")
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        choices=list(FIXTURE_SIZES),
+        default=list(FIXTURE_SIZES),
+        help="Fixture repositories to benchmark.",
+    )
+    parser.add_argument(
+        "--work-dir",
+        default=os.path.join(tempfile.gettempdir(), "process_benchmarks"),
+        help="Where fixtures and run outputs are kept between runs.",
+    )
+    parser.add_argument(
+        "--output", help="Results file (default: <work-dir>/results/<commit>.json)."
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--compare", metavar="RESULTS", help="Previous results file to compare with."
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    set_model_factory(scripted_model_factory)
+    index_enabled = bool(get_settings().cocoindex_database_url)
+
+    # The startup subprocess builds the workflow, which needs a data directory
+    startup_dir = os.path.join(args.work_dir, "startup")
+    os.makedirs(startup_dir, exist_ok=True)
+    startup_env = {
+        **os.environ,
+        "DATA_DIR_PATH": startup_dir,
+        "INPUT_DIR_PATH": startup_dir,
+    }
+
+    commit = git_commit()
+    results = {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "startup": benchmark_startup(startup_env),
+        "results": {},
+    }
+
+    for size in args.sizes:
+        print(f"Benchmarking {size} fixture ({FIXTURE_SIZES[size]} files)")
+        root_dir = create_fixture_repo(args.work_dir, size)
+        data_dir = os.path.join(args.work_dir, f"data_{size}")
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+        size_results = {
+            "files": FIXTURE_SIZES[size],
+            "codebase_tools": benchmark_codebase_tools(root_dir, args.repeat),
+            "discovery": benchmark_discovery(root_dir, data_dir),
+            "development": benchmark_development(root_dir, data_dir),
+        }
+        if index_enabled:
+            size_results["indexing"] = benchmark_indexing(root_dir, FIXTURE_SIZES[size])
+            size_results["search"] = benchmark_search(args.repeat)
+        results["results"][size] = size_results
+
+    output = args.output or os.path.join(
+        args.work_dir, "results", f"{commit or 'unknown'}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+    if not index_enabled:
+        print("COCOINDEX_DATABASE_URL is not set, indexing and search were skipped")
+
+    if args.compare:
+        compare(args.compare, results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+from typing import Any, Sequence
+from uuid import UUID, uuid5
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+TOOL_CALL_NAMESPACE = UUID("6f1c2b1e-3f0a-4c43-9d55-7b0f3f1a2c11")
+
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    Deterministic chat model for offline benchmarks.
+
+    Turn n of a conversation (n = number of AI messages already in it) calls the
+    n-th tool of `script` if that tool is bound to the model; once the script is
+    exhausted the model answers with `final_answer`. Token usage is derived from
+    the prompt length, so the same conversation always reports the same usage.
+    """
+
+    script: list[tuple[str, dict]] = []
+    final_answer: str = "done"
+    agent_name: str | None = None
+    bound_tool_names: list[str] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any) -> "ScriptedChatModel":
+        names = [
+            tool["name"] if isinstance(tool, dict) else getattr(tool, "name", None)
+            for tool in tools
+        ]
+        return self.model_copy(update={"bound_tool_names": names})
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        turn = sum(isinstance(message, AIMessage) for message in messages)
+        prompt_chars = sum(len(str(message.content)) for message in messages)
+        usage = {
+            "input_tokens": prompt_chars // 4,
+            "output_tokens": 16,
+            "total_tokens": prompt_chars // 4 + 16,
+        }
+
+        if turn < len(self.script) and self.script[turn][0] in self.bound_tool_names:
+            name, args = self.script[turn]
+            tool_call_id = str(uuid5(TOOL_CALL_NAMESPACE, f"{self.agent_name}:{turn}"))
+            message = AIMessage(
+                content="",
+                tool_calls=[{"name": name, "args": args, "id": tool_call_id}],
+                usage_metadata=usage,
+            )
+        else:
+            message = AIMessage(content=self.final_answer, usage_metadata=usage)
+
+        return ChatResult(generations=[ChatGeneration(message=message)])
@@ -0,0 +1,102 @@
+"""
+Startup benchmark based on `python -X importtime`.
+
+Measures how long importing main and building the workflow take in a fresh
+interpreter, and which modules dominate the import time. Run from process/src:
+
+    python -m benchmarks.startup --budget-ms 1500
+
+Exits with status 1 when the import of main exceeds the budget.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+STARTUP_SCRIPT = """
+import json, time
+started_at = time.perf_counter()
+import main
+imported_at = time.perf_counter()
+main.create_workflow()
+built_at = time.perf_counter()
+print(json.dumps({"import_seconds": imported_at - started_at, "build_seconds": built_at - imported_at}))
+"""
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """(module, self_us, cumulative_us) for every line of -X importtime output"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+def benchmark_startup(env: dict[str, str], top: int = 15) -> dict:
+    """
+    Startup timings of a fresh interpreter run with `env`, which must set
+    DATA_DIR_PATH and INPUT_DIR_PATH for the workflow to be built
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP_SCRIPT],
+        cwd=SRC_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    modules = parse_importtime(result.stderr)
+    main_us = next((cumulative for name, _, cumulative in modules if name == "main"), 0)
+    slowest = sorted(modules, key=lambda module: module[1], reverse=True)[:top]
+
+    return {
+        **timings,
+        "main_import_ms": main_us / 1000,
+        "modules_imported": len(modules),
+        "slowest_modules": [
+            {"module": name, "self_ms": self_us / 1000} for name, self_us, _ in slowest
+        ],
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark process startup time.")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        help="Fail when importing main takes longer than this.",
+    )
+    parser.add_argument("--top", type=int, default=15)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as work_dir:
+        env = {**os.environ, "DATA_DIR_PATH": work_dir, "INPUT_DIR_PATH": work_dir}
+        results = benchmark_startup(env, args.top)
+
+    print(f"import main: {results['main_import_ms']:.0f} ms (-X importtime)")
+    print(f"import main: {results['import_seconds'] * 1000:.0f} ms (wall)")
+    print(f"create_workflow: {results['build_seconds'] * 1000:.0f} ms")
+    print(f"{results['modules_imported']} modules imported; slowest:")
+    for module in results["slowest_modules"]:
+        print(f"  {module['self_ms']:8.1f} ms  {module['module']}")
+
+    if args.budget_ms is not None and results["main_import_ms"] > args.budget_ms:
+        print(f"Import time exceeds the budget of {args.budget_ms:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+"""
+Benchmark of the VECTOR_STORAGE modes of the embedding index.
+
+Indexes a fixture repository once, computes the exact top k of every query
+with a sequential scan, then for each mode builds its ANN index (through
+indexing/ann_index.py) and reports index size, build time, query latency
+and recall@k of search_index against the exact results. Queries are the
+search benchmark queries plus a sample of stored chunk embeddings. Requires
+COCOINDEX_DATABASE_URL; run from process/src:
+
+    python -m benchmarks.vector_storage --size medium --k 5
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.fixtures import FIXTURE_SIZES, create_fixture_repo
+from benchmarks.run import (
+    INDEXING_DIR,
+    SEARCH_QUERIES,
+    benchmark_indexing,
+    percentile,
+)
+from utils.settings import get_settings
+
+VECTOR_STORAGES = ["vector", "halfvec", "binary"]
+
+
+def result_keys(rows: list[tuple]) -> set[tuple]:
+    return {(filename, start, end) for filename, _, _, start, end in rows}
+
+
+def query_vectors(conn, table_name: str, sample_queries: int) -> list:
+    from agents.tools.search_codebase_tool import code_to_embedding
+
+    vectors = [code_to_embedding().eval(query) for query in SEARCH_QUERIES]
+    vectors.extend(
+        row[0]
+        for row in conn.execute(
+            f"SELECT embedding FROM {table_name} "
+            "ORDER BY md5(filename || location::text) LIMIT %s",
+            (sample_queries,),
+        ).fetchall()
+    )
+    return vectors
+
+
+def exact_results(conn, table_name: str, vectors: list, k: int) -> list[set]:
+    from agents.tools.search_codebase_tool import search_index
+
+    exact = []
+    with conn.transaction():
+        conn.execute("SET LOCAL enable_indexscan = off")
+        for vector in vectors:
+            exact.append(result_keys(search_index(conn, table_name, vector, k)))
+    return exact
+
+
+def build_ann_index(mode: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "ann_index.py", "--mode", mode, "--drop-others"],
+        cwd=INDEXING_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def benchmark_mode(
+    conn,
+    table_name: str,
+    mode: str,
+    vectors: list,
+    exact: list[set],
+    k: int,
+    rerank_candidates: int,
+    repeat: int,
+) -> dict:
+    from agents.tools.search_codebase_tool import search_index
+
+    index = build_ann_index(mode)
+
+    latencies = []
+    recalls = []
+    for _ in range(repeat):
+        for vector, expected in zip(vectors, exact):
+            with conn.transaction():
+                started_at = time.perf_counter()
+                rows = search_index(
+                    conn, table_name, vector, k, mode, rerank_candidates
+                )
+                latencies.append((time.perf_counter() - started_at) * 1000)
+            if expected:
+                recalls.append(len(result_keys(rows) & expected) / len(expected))
+
+    return {
+        "index_bytes": index["bytes"],
+        "build_seconds": index["seconds"],
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+        f"recall_at_{k}": sum(recalls) / len(recalls) if recalls else None,
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the vector storage modes of the embedding index."
+    )
+    parser.add_argument("--size", choices=list(FIXTURE_SIZES), default="medium")
+    parser.add_argument(
+        "--work-dir",
+        default=os.path.join(tempfile.gettempdir(), "process_benchmarks"),
+    )
+    parser.add_argument("--modes", nargs="+", choices=VECTOR_STORAGES)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--rerank-candidates", type=int)
+    parser.add_argument("--sample-queries", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    settings = get_settings()
+    if not settings.cocoindex_database_url:
+        print("COCOINDEX_DATABASE_URL is not set")
+        return 1
+
+    from pgvector.psycopg import register_vector
+    import psycopg
+
+    from agents.tools.search_codebase_tool import index_table_name
+
+    root_dir = create_fixture_repo(args.work_dir, args.size)
+    print(f"Indexing {args.size} fixture ({FIXTURE_SIZES[args.size]} files)")
+    # Any compressed mode, so cocoindex does not build its own vector index
+    indexing = benchmark_indexing(
+        root_dir, FIXTURE_SIZES[args.size], VECTOR_STORAGE="halfvec"
+    )
+
+    table_name = index_table_name(settings.project_id)
+    rerank_candidates = args.rerank_candidates or settings.search_rerank_candidates
+    results = {
+        "size": args.size,
+        "chunks": indexing["chunks"],
+        "k": args.k,
+        "rerank_candidates": rerank_candidates,
+        "modes": {},
+    }
+
+    # Autocommit, so no transaction holds locks while ann_index.py drops indexes
+    with psycopg.connect(settings.cocoindex_database_url, autocommit=True) as conn:
+        register_vector(conn)
+        results["table_bytes"] = conn.execute(
+            "SELECT pg_table_size(%s::regclass)", (table_name,)
+        ).fetchone()[0]
+        vectors = query_vectors(conn, table_name, args.sample_queries)
+        exact = exact_results(conn, table_name, vectors, args.k)
+        results["queries"] = len(vectors)
+
+        for mode in args.modes or VECTOR_STORAGES:
+            results["modes"][mode] = benchmark_mode(
+                conn,
+                table_name,
+                mode,
+                vectors,
+                exact,
+                args.k,
+                rerank_candidates,
+                args.repeat,
+            )
+
+    print(
+        f"{results['chunks']} chunks, {results['queries']} queries, "
+        f"table {results['table_bytes'] / 1024 / 1024:.1f} MiB"
+    )
+    print(
+        f"{'mode':<8} {'index MiB':>10} {'build s':>8} {'p50 ms':>8} "
+        f"{'p99 ms':>8} {f'recall@{args.k}':>10}"
+    )
+    for mode, mode_results in results["modes"].items():
+        recall = mode_results[f"recall_at_{args.k}"]
+        print(
+            f"{mode:<8} {mode_results['index_bytes'] / 1024 / 1024:>10.2f} "
+            f"{mode_results['build_seconds']:>8.2f} {mode_results['p50_ms']:>8.2f} "
+            f"{mode_results['p99_ms']:>8.2f} "
+            f"{recall if recall is not None else float('nan'):>10.3f}"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
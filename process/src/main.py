@@ -1,32 +1,68 @@
 from typing import TypedDict
+from uuid import uuid4
+import argparse
+import time
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.sqlite import SqliteSaver
 from langgraph.graph import StateGraph, START, END
-from dotenv import load_dotenv
 
 from agents.development.task_iterator_agent import create_task_iterator_agent
+from agents.development.task_scheduler import create_task_scheduler
+from agents.tools.codebase_index import reindex_stats
 from agents.discovery.workflow import create_discovery_workflow
+from agents.planning.plan_store import PlanStore
 from agents.planning.tasks_planner_agent import create_tasks_planner_agent
+from agents.planning.tasks_planner_agent import system_prompt as planner_prompt
+from utils.artifact_memo import memoize_artifact_node
+from utils.lazy_agent import LazyAgent
+from utils.retrieval_first import with_retrieval_first
+from utils.event_stream import STREAM_MODES, ConsoleEventPrinter, FileEventWriter
+from utils.llm_cache import get_llm_cache
+from utils.llm_client_pool import client_pool_stats
+from utils.model_cascade import model_cascade_stats
+from utils.search_cache import get_search_cache
+from utils.settings import get_settings, use_run_settings
+from utils.stable_prefix_middleware import prompt_cache_stats
+from utils.telemetry import TelemetryCallbackHandler
 import os
 
-load_dotenv()
-
 
 class State(TypedDict):
     pass
 
 
-def create_workflow():
+def create_workflow(checkpointer: BaseCheckpointSaver | None = None):
+    settings = get_settings()
     discovery_workflow = create_discovery_workflow()
-    planning_agent = create_tasks_planner_agent(
-        model_name=os.getenv("TASK_PLANNER_AGENT_MODEL_NAME")
-    )
-    development_agent = create_task_iterator_agent(
-        model_name=os.getenv("TASK_ITERATOR_AGENT_MODEL_NAME")
+    planning_agent = LazyAgent(
+        lambda: create_tasks_planner_agent(
+            model_name=settings.task_planner_agent_model_name
+        )
     )
+    if settings.development_scheduler == "dag":
+        development_agent = create_task_scheduler()
+    else:
+        development_agent = LazyAgent(
+            lambda: create_task_iterator_agent(
+                model_name=settings.task_iterator_agent_model_name
+            )
+        )
 
     workflow = StateGraph(State)
 
     workflow.add_node("discovery", discovery_workflow)
-    workflow.add_node("planning", planning_agent)
+    output_dir = settings.output_dir
+    workflow.add_node(
+        "planning",
+        memoize_artifact_node(
+            name="planning",
+            agent=planning_agent,
+            artifact_path=os.path.join(output_dir, "plan.json"),
+            upstream_paths=[os.path.join(output_dir, "docs", "synthesizer_results.md")],
+            prompt=with_retrieval_first(planner_prompt),
+            model_name=settings.task_planner_agent_model_name,
+        ),
+    )
     workflow.add_node("development", development_agent)
 
     workflow.add_edge(START, "discovery")
@@ -34,21 +70,192 @@ def create_workflow():
     workflow.add_edge("planning", "development")
     workflow.add_edge("development", END)
 
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
 
 
-def main():
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Run the discovery, planning and development workflow."
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="THREAD_ID",
+        help="Continue an interrupted run from its last checkpoint.",
+    )
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Do not print streamed events; write them to the events file instead.",
+    )
+    parser.add_argument(
+        "--events-file",
+        metavar="PATH",
+        help="Append every streamed event as JSON Lines "
+        "(default with --quiet: DATA_DIR_PATH/output/events.jsonl).",
+    )
+    return parser.parse_args()
+
+
+def run_pipeline(
+    settings_overrides: dict | None = None,
+    resume: str | None = None,
+    quiet: bool = False,
+    events_file: str | None = None,
+) -> dict:
+    """
+    Run the workflow for one repository and return a summary of the run.
+
+    settings_overrides replace fields of the process settings for this run
+    only (e.g. input_dir_path, data_dir_path); they are passed to the graph
+    in config["configurable"]["settings"], where get_settings reads them.
+    """
+    with use_run_settings(settings_overrides):
+        return _run_pipeline(settings_overrides or {}, resume, quiet, events_file)
+
+
+def _run_pipeline(
+    settings_overrides: dict, resume: str | None, quiet: bool, events_file: str | None
+) -> dict:
+    settings = get_settings()
+
+    checkpoint_path = settings.checkpoint_db_path or os.path.join(
+        settings.output_dir, "checkpoints.sqlite"
+    )
+    os.makedirs(os.path.dirname(checkpoint_path), exist_ok=True)
+
+    telemetry_dir = settings.telemetry_dir_path or os.path.join(
+        settings.output_dir, "telemetry"
+    )
+    os.makedirs(telemetry_dir, exist_ok=True)
+    telemetry = TelemetryCallbackHandler(telemetry_dir)
+
+    if quiet and not events_file:
+        events_file = os.path.join(settings.output_dir, "events.jsonl")
+    sinks = [] if quiet else [ConsoleEventPrinter()]
+    if events_file:
+        sinks.append(FileEventWriter(events_file))
+
+    thread_id = resume or uuid4().hex
+    summary = {
+        "thread_id": thread_id,
+        "input_dir_path": settings.input_dir_path,
+        "output_dir": settings.output_dir,
+        "telemetry_dir": telemetry_dir,
+    }
+    started_at = time.perf_counter()
+    with SqliteSaver.from_conn_string(checkpoint_path) as checkpointer:
+        agent = create_workflow(checkpointer)
+
+        config = {
+            "configurable": {"thread_id": thread_id, "settings": settings_overrides},
+            "callbacks": [telemetry],
+        }
+
+        if resume:
+            snapshot = agent.get_state(config)
+            if not snapshot.next:
+                print(f"Nothing to resume for thread {thread_id}.")
+                return {**summary, "status": "nothing to resume"}
+
+            # Tasks interrupted mid-development are restarted from scratch
+            PlanStore.open_default().reset_in_progress()
+            print(f"Resuming thread {thread_id} at: {', '.join(snapshot.next)}")
+            workflow_input = None
+        else:
+            print(f"Starting thread {thread_id} (continue with --resume {thread_id})")
+            query = "Let's start the workflow"
+            workflow_input = {"messages": [{"role": "user", "content": query}]}
+
+        try:
+            for namespace, mode, data in agent.stream(
+                workflow_input, config, stream_mode=STREAM_MODES, subgraphs=True
+            ):
+                for sink in sinks:
+                    sink.handle(namespace, mode, data)
+        finally:
+            telemetry.flush()
+            telemetry.append_agent_tokens(
+                os.path.join(settings.output_dir, "report_tokens.jsonl"),
+                {"thread_id": thread_id, "retrieval_first": settings.retrieval_first},
+            )
+            for sink in sinks:
+                sink.close()
+
+    print_stats()
+    print(telemetry.summary())
+    print(f"Telemetry written to {telemetry_dir}")
 
-    agent = create_workflow()
+    agent_totals = telemetry.agent_totals.values()
+    return {
+        **summary,
+        "status": "completed",
+        "seconds": time.perf_counter() - started_at,
+        "model_calls": int(sum(totals["calls"] for totals in agent_totals)),
+        "model_errors": int(sum(totals["errors"] for totals in agent_totals)),
+        "input_tokens": int(sum(totals["input_tokens"] for totals in agent_totals)),
+        "output_tokens": int(sum(totals["output_tokens"] for totals in agent_totals)),
+        "cost": sum(totals["cost"] for totals in agent_totals),
+    }
 
-    query = "Let's start the workflow"
 
-    for chunk in agent.stream(
-        {"messages": [{"role": "user", "content": query}]},
-        stream_mode="values",
-    ):
-        if "messages" in chunk:
-            chunk["messages"][-1].pretty_print()
+def print_stats():
+    """Print the process-wide cache, re-indexing and LLM client statistics"""
+    llm_cache = get_llm_cache()
+    if llm_cache is not None:
+        stats = llm_cache.stats()
+        print(
+            f"LLM cache: {stats['hits']} hits, {stats['misses']} misses, "
+            f"hit rate {stats['hit_rate']:.1%}, {stats['tokens_saved']} tokens saved"
+        )
+
+    search_cache = get_search_cache()
+    if search_cache is not None:
+        stats = search_cache.stats()
+        if stats["hits"] or stats["misses"] or stats["uncached"]:
+            print(
+                f"Search cache: {stats['hits']} hits, {stats['misses']} misses, "
+                f"{stats['uncached']} uncached, hit rate {stats['hit_rate']:.1%}, "
+                f"{stats['entries']} entries ({stats['bytes'] / 1024:.0f} KiB), "
+                f"{stats['evictions']} evictions"
+            )
+
+    stats = reindex_stats()
+    if stats["calls"]:
+        print(
+            f"Re-indexing: {stats['calls']} calls, {stats['paths']} files, "
+            f"{stats['chunks']} chunks, {stats['errors']} errors, "
+            f"p50 {stats['p50_ms']:.0f} ms, max {stats['max_ms']:.0f} ms"
+        )
+
+    for model_name, stats in client_pool_stats().items():
+        print(
+            f"{model_name}: {stats['requests']} requests, {stats['retries']} retries, "
+            f"{stats['throttled']} throttled, queueing {stats['queue_seconds']:.1f}s, "
+            f"model latency {stats['latency_seconds']:.1f}s"
+        )
+
+    for agent_name, stats in prompt_cache_stats().items():
+        print(
+            f"{agent_name}: {stats['cached_input_tokens']} cached / "
+            f"{stats['uncached_input_tokens']} uncached input tokens"
+        )
+
+    for agent_name, stats in model_cascade_stats().items():
+        rate = stats["escalations"] / stats["calls"] if stats["calls"] else 0.0
+        reasons = ", ".join(
+            f"{reason} {count}"
+            for reason, count in stats.items()
+            if reason not in ("calls", "escalations")
+        )
+        print(
+            f"{agent_name}: {stats['escalations']}/{stats['calls']} calls escalated "
+            f"({rate:.1%}){f' - {reasons}' if reasons else ''}"
+        )
+
+
+def main():
+    args = parse_args()
+    run_pipeline(resume=args.resume, quiet=args.quiet, events_file=args.events_file)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,127 @@
+import pytest
+
+from agents.tools import apply_patch_tool
+from agents.tools.apply_patch_tool import (
+    ApplyPatchTool,
+    Hunk,
+    PatchError,
+    apply_hunks,
+    parse_unified_diff,
+)
+
+
+def write(path, content: str):
+    path.write_bytes(content.encode("utf-8"))
+
+
+def read(path) -> str:
+    return path.read_bytes().decode("utf-8")
+
+
+def test_unified_hunk_applies_at_offset():
+    content = "extra 1\nextra 2\none\ntwo\nthree\n"
+    hunk = Hunk("@@ -1,3 +1,3 @@", ["one", "two", "three"], ["one", "2", "three"], 1)
+
+    new_content, failures = apply_hunks(content, [hunk])
+
+    assert failures == []
+    assert new_content == "extra 1\nextra 2\none\n2\nthree\n"
+
+
+def test_removed_line_starting_with_double_dash(tmp_path):
+    write(tmp_path / "b.sql", "select 1;\n-- comment\nselect 2;\n")
+    patch = (
+        "--- a/b.sql\n"
+        "+++ b/b.sql\n"
+        "@@ -1,3 +1,2 @@\n"
+        " select 1;\n"
+        "--- comment\n"
+        " select 2;\n"
+    )
+
+    (file_patch,) = parse_unified_diff(patch)
+    assert file_patch.hunks[0].old == ["select 1;", "-- comment", "select 2;"]
+
+    result = ApplyPatchTool(root_dir=str(tmp_path))._run(patch)
+
+    assert result.startswith("Patch applied")
+    assert read(tmp_path / "b.sql") == "select 1;\nselect 2;\n"
+
+
+def test_hunk_longer_than_its_header_is_rejected():
+    patch = "--- a/x.py\n+++ b/x.py\n@@ -1 +1 @@\n-a\n+b\n+c\n"
+
+    with pytest.raises(PatchError, match="outside of any hunk"):
+        parse_unified_diff(patch)
+
+
+def test_ambiguous_search_changes_nothing(tmp_path):
+    write(tmp_path / "a.py", "x = 1\ny = 2\nx = 1\n")
+    patch = "a.py\n<<<<<<< SEARCH\nx = 1\n=======\nx = 3\n>>>>>>> REPLACE\n"
+
+    result = ApplyPatchTool(root_dir=str(tmp_path))._run(patch)
+
+    assert "matches 2 places" in result
+    assert read(tmp_path / "a.py") == "x = 1\ny = 2\nx = 1\n"
+
+
+def test_crlf_and_missing_final_newline_are_kept():
+    content = "one\r\ntwo\r\nthree"
+    hunk = Hunk("block 1", ["two"], ["2"])
+
+    new_content, failures = apply_hunks(content, [hunk])
+
+    assert failures == []
+    assert new_content == "one\r\n2\r\nthree"
+
+
+def test_failing_hunk_changes_no_file(tmp_path):
+    write(tmp_path / "a.py", "a = 1\n")
+    write(tmp_path / "b.py", "b = 1\n")
+    patch = (
+        "--- a/a.py\n+++ b/a.py\n@@ -1 +1 @@\n-a = 1\n+a = 2\n"
+        "--- a/b.py\n+++ b/b.py\n@@ -1 +1 @@\n-missing\n+b = 2\n"
+    )
+
+    result = ApplyPatchTool(root_dir=str(tmp_path))._run(patch)
+
+    assert result.startswith("Patch not applied")
+    assert read(tmp_path / "a.py") == "a = 1\n"
+    assert read(tmp_path / "b.py") == "b = 1\n"
+
+
+def test_write_error_rolls_back_written_files(tmp_path, monkeypatch):
+    write(tmp_path / "a.py", "a = 1\n")
+    write(tmp_path / "b.py", "b = 1\n")
+    patch = (
+        "--- a/a.py\n+++ b/a.py\n@@ -1 +1 @@\n-a = 1\n+a = 2\n"
+        "--- /dev/null\n+++ b/new.py\n@@ -0,0 +1 @@\n+new = 1\n"
+        "--- a/b.py\n+++ b/b.py\n@@ -1 +1 @@\n-b = 1\n+b = 2\n"
+    )
+    replace = apply_patch_tool.os.replace
+
+    def failing_replace(source, destination):
+        if destination.endswith("b.py"):
+            raise OSError("disk full")
+        replace(source, destination)
+
+    monkeypatch.setattr(apply_patch_tool.os, "replace", failing_replace)
+
+    result = ApplyPatchTool(root_dir=str(tmp_path))._run(patch)
+
+    assert "rolled back" in result
+    assert read(tmp_path / "a.py") == "a = 1\n"
+    assert read(tmp_path / "b.py") == "b = 1\n"
+    assert not (tmp_path / "new.py").exists()
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["a.py", "b.py"]
+
+
+def test_zero_context_insertions_go_after_their_line(tmp_path):
+    write(tmp_path / "a.txt", "1\n2\n3\n4\n5\n")
+    # git diff -U0 of inserting X after line 2 and Y after line 5
+    patch = "--- a/a.txt\n+++ b/a.txt\n@@ -2,0 +3 @@\n+X\n@@ -5,0 +7 @@\n+Y\n"
+
+    result = ApplyPatchTool(root_dir=str(tmp_path))._run(patch)
+
+    assert result.startswith("Patch applied")
+    assert read(tmp_path / "a.txt") == "1\n2\nX\n3\n4\n5\nY\n"
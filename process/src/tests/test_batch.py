@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from batch import load_manifest, partition_llm_limits
+
+
+def manifest(tmp_path, content) -> str:
+    path = tmp_path / "manifest.json"
+    path.write_text(json.dumps(content))
+    return str(path)
+
+
+def test_repositories_get_their_own_data_directory(tmp_path):
+    path = manifest(
+        tmp_path,
+        {
+            "defaults": {"TEST_WORKERS": "2"},
+            "repositories": [
+                {"input_dir_path": "/repos/a/"},
+                {"name": "bee", "input_dir_path": "/repos/b", "test_workers": 4},
+            ],
+        },
+    )
+
+    runs, llm_limits = load_manifest(path, "/batch")
+
+    assert list(runs) == ["a", "bee"]
+    assert runs["a"]["data_dir_path"] == "/batch/a"
+    assert runs["a"]["test_workers"] == "2"
+    assert runs["bee"]["test_workers"] == 4
+    assert runs["bee"]["checkpoint_db_path"] is None
+    assert llm_limits == {}
+
+
+def test_llm_limits_are_batch_totals(tmp_path):
+    path = manifest(
+        tmp_path,
+        {
+            "defaults": {"LLM_MAX_CONCURRENCY": "8", "llm_requests_per_second": 4},
+            "repositories": [{"input_dir_path": "/repos/a"}],
+        },
+    )
+
+    runs, llm_limits = load_manifest(path, "/batch")
+    share = partition_llm_limits(2, llm_limits)
+
+    assert "llm_max_concurrency" not in runs["a"]
+    assert share["llm_max_concurrency"] == 4
+    assert share["llm_requests_per_second"] == 2.0
+    assert share["llm_initial_concurrency"] <= share["llm_max_concurrency"]
+
+
+def test_per_repository_llm_limits_are_rejected(tmp_path):
+    path = manifest(tmp_path, [{"input_dir_path": "/repos/a", "LLM_BURST": 9}])
+
+    with pytest.raises(ValueError, match="llm_burst can only be set"):
+        load_manifest(path, "/batch")
+
+
+@pytest.mark.parametrize(
+    "entries, error",
+    [
+        ([{"name": "a"}], "without input_dir_path"),
+        ([{"input_dir_path": "/a/x"}, {"input_dir_path": "/b/x"}], "Duplicate"),
+        ([{"input_dir_path": "/a", "fast_model_names": "x"}], "fast_model_names"),
+    ],
+)
+def test_invalid_repositories_are_rejected(tmp_path, entries, error):
+    with pytest.raises(ValueError, match=error):
+        load_manifest(manifest(tmp_path, entries), "/batch")
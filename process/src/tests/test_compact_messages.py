@@ -0,0 +1,72 @@
+from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage, ToolMessage
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
+
+from utils.compact_messages import (
+    REFLECTION_MESSAGE_NAME,
+    SUMMARY_MESSAGE_NAME,
+    compact_messages,
+)
+
+
+def attempt(number: int) -> list:
+    return [
+        AIMessage(
+            f"attempt {number} " + "code " * 500,
+            tool_calls=[{"name": "apply_patch", "args": {}, "id": f"call-{number}"}],
+        ),
+        ToolMessage(f"patched {number}", tool_call_id=f"call-{number}"),
+        AIMessage(f"attempt {number} done"),
+        AIMessage(
+            f"Reflection:\nErrors detected:\n- error {number} in app.py\n- other",
+            name=REFLECTION_MESSAGE_NAME,
+        ),
+    ]
+
+
+def history() -> list:
+    return [
+        HumanMessage("Implement task 1"),
+        HumanMessage("Context for task 1"),
+        *attempt(1),
+        *attempt(2),
+        *attempt(3),
+    ]
+
+
+def test_history_within_budget_is_kept():
+    assert compact_messages(history(), token_budget=100_000) == ([], 0)
+
+
+def test_compaction_keeps_task_latest_turn_and_reflection():
+    messages = history()
+
+    updates, tokens_saved = compact_messages(messages, token_budget=1000)
+
+    assert tokens_saved > 0
+    assert updates[0] == RemoveMessage(id=REMOVE_ALL_MESSAGES)
+    kept = updates[1:]
+    summary = kept[2]
+    assert kept[:2] == messages[:2]
+    assert summary.name == SUMMARY_MESSAGE_NAME
+    assert summary.text.splitlines()[1:] == [
+        "- Attempt 1: 2 error(s), e.g. error 1 in app.py",
+        "- Attempt 2: 2 error(s), e.g. error 2 in app.py",
+    ]
+    # The latest generate turn and its reflection follow verbatim
+    assert kept[3:] == attempt(3)
+    assert kept[-1].name == REFLECTION_MESSAGE_NAME
+
+
+def test_earlier_summaries_are_merged():
+    updates, _ = compact_messages(history(), token_budget=1000)
+    messages = updates[1:] + attempt(4)
+
+    updates, tokens_saved = compact_messages(messages, token_budget=1000)
+
+    assert tokens_saved > 0
+    assert updates[3].text.splitlines()[1:] == [
+        "- Attempt 1: 2 error(s), e.g. error 1 in app.py",
+        "- Attempt 2: 2 error(s), e.g. error 2 in app.py",
+        "- Attempt 3: 2 error(s), e.g. error 3 in app.py",
+    ]
+    assert updates[4:] == attempt(4)
@@ -0,0 +1,23 @@
+from utils.fingerprint_errors import fingerprint_errors, pyright_errors
+
+PYRIGHT_OUTPUT = """/repo/app.py
+  /repo/app.py:3:8 - error: Import "foo" could not be resolved (reportMissingImports)
+  /repo/app.py:9:1 - warning: Variable "x" is not accessed
+1 error, 1 warning, 0 informations
+"""
+
+
+def test_pyright_errors_keep_only_errors():
+    assert pyright_errors(PYRIGHT_OUTPUT) == [
+        '/repo/app.py: Import "foo" could not be resolved (reportMissingImports)'
+    ]
+
+
+def test_fingerprint_ignores_locations_order_and_formatting():
+    first = fingerprint_errors(['app.py:3:8 Import "foo" could not be resolved.', "b"])
+    second = fingerprint_errors(["B", "`app.py:12` import 'foo' could not be resolved"])
+
+    assert first == second
+    assert first != fingerprint_errors(
+        ['app.py:3:8 Import "bar" could not be resolved']
+    )
@@ -0,0 +1,39 @@
+from agents.tools.run_tests_tool import affected_tests, conservative_tests
+
+GRAPH = {
+    "pkg/__init__.py": set(),
+    "pkg/mod.py": set(),
+    "tests/conftest.py": {"tests/fixtures.py"},
+    "tests/fixtures.py": set(),
+    "tests/test_mod.py": {"pkg/mod.py"},
+    "other/test_other.py": set(),
+}
+
+
+def test_import_graph_selection():
+    assert affected_tests(GRAPH, ["pkg/mod.py"]) == ["tests/test_mod.py"]
+    assert conservative_tests(GRAPH, ["pkg/mod.py"]) == ([], [])
+
+
+def test_fixture_change_selects_tests_under_conftest():
+    tests, reasons = conservative_tests(GRAPH, ["tests/fixtures.py"])
+
+    assert tests == ["tests/test_mod.py"]
+    assert reasons == ["tests/conftest.py"]
+
+
+def test_data_file_selects_tests_of_nearest_directory_with_tests():
+    tests, reasons = conservative_tests(GRAPH, ["tests/data/input.json"])
+
+    assert tests == ["tests/test_mod.py"]
+    assert reasons == ["tests/data/input.json"]
+
+
+def test_root_config_selects_the_full_suite():
+    tests, _ = conservative_tests(GRAPH, ["pytest.ini"])
+
+    assert tests == ["other/test_other.py", "tests/test_mod.py"]
+
+
+def test_documentation_selects_nothing():
+    assert conservative_tests(GRAPH, ["README.md"]) == ([], [])
@@ -0,0 +1,94 @@
+from contextlib import contextmanager, nullcontext
+
+from pgvector import psycopg as pgvector_psycopg
+
+from agents.tools import search_codebase_tool
+from agents.tools.search_codebase_tool import SearchCodebaseTool
+from utils.search_cache import SearchResultCache, _result_size
+
+ROW = ("app.py", "def main(): pass", 0.25, 1, 2)
+
+
+def results(name: str) -> list[tuple]:
+    return [(f"{name}.py", "x" * 100, 0.25, 1, 2)]
+
+
+def test_least_recently_used_entries_are_evicted_by_bytes():
+    size = _result_size(results("a"))
+    cache = SearchResultCache(max_bytes=2 * size + size // 2)
+
+    cache.put("a", results("a"))
+    cache.put("b", results("b"))
+    assert cache.get("a") == results("a")
+    cache.put("c", results("c"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") == results("a")
+    assert cache.get("c") == results("c")
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 1
+    assert stats["bytes"] <= cache.max_bytes
+
+
+def test_results_larger_than_the_cache_are_not_stored():
+    cache = SearchResultCache(max_bytes=_result_size(results("a")) - 1)
+
+    cache.put("a", results("a"))
+
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 0
+
+
+class FakePool:
+    @contextmanager
+    def connection(self):
+        yield self
+
+    def cursor(self):
+        return nullcontext()
+
+
+def search_tool(monkeypatch, versions: list):
+    cache = SearchResultCache(max_bytes=1024 * 1024)
+    searches = []
+
+    def search_index(cursor, table_name, query_vector, k, *args):
+        searches.append(query_vector)
+        return [ROW]
+
+    class Embedding:
+        def eval(self, query):
+            return query
+
+    monkeypatch.setattr(pgvector_psycopg, "register_vector", lambda conn: None)
+    monkeypatch.setattr(search_codebase_tool, "connection_pool", FakePool)
+    monkeypatch.setattr(search_codebase_tool, "code_to_embedding", Embedding)
+    monkeypatch.setattr(search_codebase_tool, "search_index", search_index)
+    monkeypatch.setattr(
+        search_codebase_tool, "index_version", lambda cursor, table: versions.pop(0)
+    )
+    monkeypatch.setattr(search_codebase_tool, "get_search_cache", lambda: cache)
+    return SearchCodebaseTool(), cache, searches
+
+
+def test_unversioned_index_is_never_cached(monkeypatch):
+    tool, cache, searches = search_tool(monkeypatch, [None, None])
+
+    assert "app.py" in tool._run("main function")
+    assert "app.py" in tool._run("main function")
+
+    assert len(searches) == 2
+    assert cache.stats()["uncached"] == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_cached_results_are_keyed_by_index_version(monkeypatch):
+    tool, cache, searches = search_tool(monkeypatch, [(1, 1), (1, 1), (1, 2)])
+
+    tool._run("main function")
+    tool._run("  Main   FUNCTION ")
+    tool._run("main function")
+
+    assert len(searches) == 2
+    assert cache.stats()["hits"] == 1
@@ -0,0 +1,60 @@
+import pytest
+
+from utils.settings import Settings
+
+SETTINGS = Settings()
+
+
+def test_strings_are_parsed_like_the_environment():
+    settings = SETTINGS.with_overrides(
+        {"TEST_WORKERS": "8", "llm_burst": "2.5", "retrieval_first": "yes"}
+    )
+
+    assert settings.test_workers == 8
+    assert settings.llm_burst == 2.5
+    assert settings.retrieval_first is True
+
+
+def test_values_of_the_field_type_are_kept():
+    settings = SETTINGS.with_overrides(
+        {
+            "test_workers": 8,
+            "llm_burst": 3,
+            "project_id": None,
+            "fast_model_names": {"code_quality_agent": "fast/model"},
+        }
+    )
+
+    assert settings.test_workers == 8
+    assert settings.llm_burst == 3.0
+    assert isinstance(settings.llm_burst, float)
+    assert settings.project_id is None
+    assert settings.fast_model_names == {"code_quality_agent": "fast/model"}
+
+
+def test_empty_strings_are_ignored():
+    settings = SETTINGS.with_overrides({"project_id": "", "test_workers": ""})
+
+    assert settings == SETTINGS
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"test_workers": True},
+        {"test_workers": 2.5},
+        {"retrieval_first": 1},
+        {"project_id": 5},
+        {"fast_model_names": "x"},
+        {"fast_model_names": {"code_quality_agent": 1}},
+        {"test_workers": "many"},
+    ],
+)
+def test_values_of_the_wrong_type_are_rejected(overrides):
+    with pytest.raises(ValueError):
+        SETTINGS.with_overrides(overrides)
+
+
+def test_unknown_settings_are_rejected():
+    with pytest.raises(ValueError, match="Unknown setting: TEST_WORKER"):
+        SETTINGS.with_overrides({"TEST_WORKER": 8})
@@ -0,0 +1,58 @@
+from agents.discovery.sharded_analysis import (
+    group_by_size,
+    merge_groups,
+    partition_codebase,
+)
+
+
+def write(path, size: int):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("x" * size)
+
+
+def test_oversized_directories_are_split_and_small_shards_packed(tmp_path):
+    write(tmp_path / "a.py", 10)
+    write(tmp_path / "big" / "x.py", 60)
+    write(tmp_path / "big" / "y.py", 60)
+    write(tmp_path / "big" / "sub" / "z.py", 30)
+    write(tmp_path / ".git" / "objects", 500)
+
+    shards = partition_codebase(str(tmp_path), 100)
+
+    assert [(shard.name, shard.size) for shard in shards] == [
+        ("repository root, big", 70),
+        ("big, big/sub", 90),
+    ]
+    assert [path.removeprefix(f"{tmp_path}/") for path in shards[1].files] == [
+        "big/y.py",
+        "big/sub/z.py",
+    ]
+
+
+def test_directory_within_budget_is_one_shard(tmp_path):
+    write(tmp_path / "pkg" / "a.py", 10)
+    write(tmp_path / "pkg" / "sub" / "b.py", 20)
+
+    (shard,) = partition_codebase(str(tmp_path), 100)
+
+    assert shard.name == "repository root"
+    assert shard.size == 30
+    assert [path.removeprefix(f"{tmp_path}/") for path in shard.files] == [
+        "pkg/a.py",
+        "pkg/sub/b.py",
+    ]
+
+
+def test_group_by_size_packs_consecutive_texts():
+    assert group_by_size(["aaaa", "bb", "cc", "dddddd"], 6) == [
+        ["aaaa", "bb"],
+        ["cc"],
+        ["dddddd"],
+    ]
+
+
+def test_merge_groups_falls_back_to_pairs():
+    reports = ["a" * 8, "b" * 8, "c" * 8]
+
+    assert merge_groups(reports, 10) == [["a" * 8, "b" * 8], ["c" * 8]]
+    assert merge_groups(["aa", "bb", "c" * 8], 10) == [["aa", "bb"], ["c" * 8]]
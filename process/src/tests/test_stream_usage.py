@@ -0,0 +1,74 @@
+import json
+
+import httpx
+from langchain.agents import create_agent
+from langgraph.graph import START, MessagesState, StateGraph
+
+from utils import create_model as create_model_module
+from utils.event_stream import STREAM_MODES
+from utils.settings import use_run_settings
+from utils.telemetry import TelemetryCallbackHandler
+
+USAGE = {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15, "cost": 0.01}
+
+
+def completion(request: httpx.Request) -> httpx.Response:
+    body = json.loads(request.content)
+    message = {"role": "assistant", "content": "done"}
+    if not body.get("stream"):
+        return httpx.Response(
+            200,
+            json={
+                "id": "1",
+                "object": "chat.completion",
+                "created": 0,
+                "model": body["model"],
+                "choices": [{"index": 0, "message": message, "finish_reason": "stop"}],
+                "usage": USAGE,
+            },
+        )
+
+    chunk = {"id": "1", "object": "chat.completion.chunk", "created": 0}
+    chunk["model"] = body["model"]
+    chunks = [
+        {**chunk, "choices": [{"index": 0, "delta": message, "finish_reason": None}]},
+        {**chunk, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]},
+    ]
+    # The OpenAI API only sends the usage chunk when include_usage is requested
+    if body.get("stream_options", {}).get("include_usage"):
+        chunks.append({**chunk, "choices": [], "usage": USAGE})
+    lines = [f"data: {json.dumps(chunk)}\n\n" for chunk in chunks]
+    return httpx.Response(
+        200,
+        headers={"content-type": "text/event-stream"},
+        content="".join(lines) + "data: [DONE]\n\n",
+    )
+
+
+def test_streamed_workflow_records_token_usage(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        create_model_module,
+        "get_http_client",
+        lambda model_name: httpx.Client(transport=httpx.MockTransport(completion)),
+    )
+    with use_run_settings({"openrouter_api_key": "test"}):
+        model = create_model_module.create_model("test/model", "code_analyst")
+    agent = create_agent(model, tools=[])
+    workflow = StateGraph(MessagesState)
+    workflow.add_node("code_analyst", agent)
+    workflow.add_edge(START, "code_analyst")
+    telemetry = TelemetryCallbackHandler(str(tmp_path))
+
+    for _ in workflow.compile().stream(
+        {"messages": [{"role": "user", "content": "Analyse"}]},
+        {"callbacks": [telemetry]},
+        stream_mode=STREAM_MODES,
+        subgraphs=True,
+    ):
+        pass
+
+    totals = telemetry.agent_totals["code_analyst"]
+    assert totals["calls"] == 1
+    assert totals["input_tokens"] == 10
+    assert totals["output_tokens"] == 5
+    assert totals["cost"] == 0.01
@@ -0,0 +1,78 @@
+import os
+
+import pytest
+
+from agents.tools.read_artifact_tool import ReadArtifactTool
+from utils.settings import use_run_settings
+from utils.tool_output import artifact_path, spill_output
+
+MAX_CHARS = 100
+
+
+@pytest.fixture(autouse=True)
+def settings(tmp_path):
+    overrides = {"data_dir_path": str(tmp_path), "tool_output_max_chars": MAX_CHARS}
+    with use_run_settings(overrides):
+        yield
+
+
+def spill(output: str) -> str:
+    preview = spill_output("terminal_tool", output)
+    return preview.split("artifact '")[1].split("'")[0]
+
+
+def test_outputs_up_to_the_threshold_are_returned_unchanged(tmp_path):
+    output = "x" * MAX_CHARS
+
+    assert spill_output("terminal_tool", output) == output
+    assert not os.path.exists(tmp_path / "output" / "artifacts")
+
+
+def test_larger_outputs_are_stored_and_previewed():
+    output = "".join(f"line {number}\n" for number in range(1, 101))
+
+    preview = spill_output("terminal_tool", output)
+    handle = spill(output)
+
+    assert preview.startswith("line 1\n")
+    assert preview.endswith("line 100")
+    assert "100 lines" in preview
+    with open(artifact_path(handle), "rb") as f:
+        assert f.read() == output.encode("utf-8")
+    assert artifact_path("../" + handle) is None
+
+
+def test_line_and_byte_ranges():
+    handle = spill("".join(f"line {number}\n" for number in range(1, 101)))
+    tool = ReadArtifactTool()
+
+    assert tool._run(handle, start_line=3, end_line=4) == (
+        f"[{handle} lines 3-4]\nline 3\nline 4\n"
+    )
+    assert tool._run(handle, start_byte=7, end_byte=14) == (
+        f"[{handle} bytes 7-14]\nline 2\n"
+    )
+
+
+def test_line_range_is_truncated_at_the_budget():
+    handle = spill("".join(f"line {number:03}\n" for number in range(1, 101)))
+
+    result = ReadArtifactTool()._run(handle, start_line=1)
+
+    assert result.startswith(f"[{handle} lines 1-11]\nline 001\n")
+    assert result.endswith("... [truncated, continue with start_line=12]\n")
+
+
+def test_oversized_first_line_is_cut_with_a_byte_offset():
+    handle = spill("é" * 150 + "\nnext\n")
+
+    result = ReadArtifactTool()._run(handle, start_line=1)
+
+    assert result == (
+        f"[{handle} lines 1-1]\n{'é' * MAX_CHARS}\n"
+        f"... [line 1 truncated at {MAX_CHARS} characters, "
+        f"continue with start_byte={2 * MAX_CHARS}]\n"
+    )
+    continued = ReadArtifactTool()._run(handle, start_byte=2 * MAX_CHARS)
+    # Byte ranges are capped at the budget too
+    assert continued == f"[{handle} bytes 200-300]\n" + "é" * 50
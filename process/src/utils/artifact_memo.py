@@ -0,0 +1,138 @@
+from collections import OrderedDict
+import hashlib
+import json
+import threading
+
+from langchain_core.runnables import Runnable, RunnableConfig
+import os
+
+from utils.event_stream import emit_event
+from utils.lazy_agent import LazyAgent
+from utils.settings import get_settings
+
+DIGEST_SUFFIX = ".digest"
+MAX_CODEBASE_DIGESTS = 64
+
+# Codebase digest by (thread id, path), computed once per run and shared by
+# every memoised node of that run; only the most recent runs are kept
+_codebase_digests: OrderedDict[tuple[str, str], str] = OrderedDict()
+_codebase_digests_lock = threading.Lock()
+
+
+def file_digest(path: str) -> str | None:
+    """SHA-256 of a file's content, or None if it does not exist"""
+    if not os.path.isfile(path):
+        return None
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def directory_digest(dir_path: str) -> str:
+    """
+    SHA-256 over the relative paths and contents of every file in a directory.
+
+    Hidden directories (.git, .venv, ...) are skipped, as in list_codebase.
+    """
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(dir_path):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for file in sorted(files):
+            file_path = os.path.join(root, file)
+            relative_path = os.path.relpath(file_path, dir_path).replace(os.sep, "/")
+            digest.update(relative_path.encode("utf-8"))
+            digest.update((file_digest(file_path) or "").encode("utf-8"))
+    return digest.hexdigest()
+
+
+def codebase_digest(dir_path: str, config: RunnableConfig) -> str:
+    """
+    directory_digest of the codebase, cached for the run (thread) in config.
+
+    The memoised nodes run before development changes the codebase, so one
+    digest per run serves all of them. Without a thread id it is recomputed.
+    """
+    thread_id = (config or {}).get("configurable", {}).get("thread_id")
+    if thread_id is None:
+        return directory_digest(dir_path)
+
+    key = (thread_id, os.path.abspath(dir_path))
+    # Held while hashing, so parallel nodes wait for one computation
+    with _codebase_digests_lock:
+        if key not in _codebase_digests:
+            _codebase_digests[key] = directory_digest(dir_path)
+            if len(_codebase_digests) > MAX_CODEBASE_DIGESTS:
+                _codebase_digests.popitem(last=False)
+        _codebase_digests.move_to_end(key)
+        return _codebase_digests[key]
+
+
+def memoize_artifact_node(
+    name: str,
+    agent: Runnable | LazyAgent,
+    artifact_path: str,
+    upstream_paths: list[str],
+    prompt: str,
+    model_name: str,
+):
+    """
+    Wrap an agent that writes a single artifact into a graph node that skips it
+    when its inputs are unchanged.
+
+    The digest of the agent's inputs (codebase snapshot, upstream artifacts,
+    prompt and model) is stored next to the artifact. When the artifact exists
+    and the stored digest matches, the node returns without calling the agent.
+    Otherwise the stale artifact is removed and the agent runs. Because upstream
+    artifacts are part of the digest, regenerating a node invalidates exactly the
+    nodes downstream of it.
+    """
+
+    def node(state, config: RunnableConfig):
+        digest = json.dumps(
+            {
+                "codebase": codebase_digest(get_settings().input_dir_path, config),
+                "upstream": {
+                    os.path.basename(path): file_digest(path) for path in upstream_paths
+                },
+                "prompt": hashlib.sha256(prompt.encode("utf-8")).hexdigest(),
+                "model": model_name,
+            },
+            sort_keys=True,
+        )
+        digest_path = artifact_path + DIGEST_SUFFIX
+
+        if _is_non_empty(artifact_path) and _read(digest_path) == digest:
+            emit_event(
+                f"inputs unchanged, reusing {artifact_path}",
+                node=name,
+                reused=artifact_path,
+            )
+            return {}
+
+        for path in (artifact_path, digest_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+        result = agent.invoke(state, config)
+
+        if _is_non_empty(artifact_path):
+            with open(digest_path, "w", encoding="utf-8") as f:
+                f.write(digest)
+        return result
+
+    node.__name__ = name
+    return node
+
+
+def _is_non_empty(path: str) -> bool:
+    return os.path.isfile(path) and os.path.getsize(path) > 0
+
+
+def _read(path: str) -> str | None:
+    if not os.path.isfile(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
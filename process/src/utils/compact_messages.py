@@ -0,0 +1,84 @@
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, RemoveMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
+
+REFLECTION_MESSAGE_NAME = "reflection"
+SUMMARY_MESSAGE_NAME = "history_summary"
+
+MAX_SUMMARY_ERROR_LENGTH = 200
+
+
+def compact_messages(
+    messages: list[BaseMessage], token_budget: int
+) -> tuple[list[BaseMessage], int]:
+    """
+    Compact the generate/check/reflect history once it exceeds the token budget.
+
+    The task description (leading human messages), the latest generate turn and
+    the latest reflection are kept verbatim. Older turns are replaced by a single
+    summary message listing the error sets they produced.
+
+    Args:
+        messages: Current message history
+        token_budget: Approximate token count above which compaction happens
+
+    Returns:
+        Tuple of (updates for the messages channel, number of tokens saved).
+        The updates are empty when nothing was compacted.
+    """
+    tokens_before = count_tokens_approximately(messages)
+    if tokens_before <= token_budget:
+        return [], 0
+
+    head_end = 0
+    while head_end < len(messages) and isinstance(messages[head_end], HumanMessage):
+        head_end += 1
+
+    reflection_indices = [
+        i
+        for i, message in enumerate(messages)
+        if i >= head_end and message.name == REFLECTION_MESSAGE_NAME
+    ]
+    if len(reflection_indices) < 2:
+        return [], 0
+
+    tail_start = reflection_indices[-2] + 1
+    middle = messages[head_end:tail_start]
+    if not middle:
+        return [], 0
+
+    summary = AIMessage(
+        content=_summarize(middle),
+        name=SUMMARY_MESSAGE_NAME,
+    )
+    compacted = [*messages[:head_end], summary, *messages[tail_start:]]
+
+    tokens_saved = tokens_before - count_tokens_approximately(compacted)
+    if tokens_saved <= 0:
+        return [], 0
+
+    return [RemoveMessage(id=REMOVE_ALL_MESSAGES), *compacted], tokens_saved
+
+
+def _summarize(messages: list[BaseMessage]) -> str:
+    """
+    Build a short summary of dropped turns from their reflection messages.
+    """
+    lines = []
+    for message in messages:
+        if message.name == SUMMARY_MESSAGE_NAME:
+            lines.extend(message.text.splitlines()[1:])
+        elif message.name == REFLECTION_MESSAGE_NAME:
+            errors = [
+                line.strip()[2:]
+                for line in message.text.splitlines()
+                if line.strip().startswith("- ")
+            ]
+            first_error = errors[0] if errors else "unknown error"
+            if len(first_error) > MAX_SUMMARY_ERROR_LENGTH:
+                first_error = first_error[:MAX_SUMMARY_ERROR_LENGTH] + "..."
+            lines.append(
+                f"- Attempt {len(lines) + 1}: {len(errors)} error(s), e.g. {first_error}"
+            )
+
+    return "Summary of earlier attempts (details omitted):\n" + "\n".join(lines)
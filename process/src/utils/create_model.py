@@ -1,13 +1,42 @@
-import os
-from langchain_openai import ChatOpenAI
-from dotenv import load_dotenv
+from typing import Callable
+from langchain_core.language_models import BaseChatModel
 
-load_dotenv()
+from utils.llm_cache import get_llm_cache
+from utils.llm_client_pool import get_http_client
+from utils.settings import get_settings
 
+_model_factory: Callable[[str, str | None], BaseChatModel] | None = None
 
-def create_model(model_name: str):
-    return ChatOpenAI(
+
+def set_model_factory(factory: Callable[[str, str | None], BaseChatModel] | None):
+    """
+    Replace the model every agent is created with, e.g. by a scripted model for
+    offline benchmarks. Must be called before the agents are created; pass None
+    to restore the OpenRouter models.
+    """
+    global _model_factory
+    _model_factory = factory
+
+
+def create_model(model_name: str, agent_name: str | None = None):
+    if _model_factory is not None:
+        return _model_factory(model_name, agent_name)
+
+    # langchain_openai is slow to import, so it is only loaded once a model is needed
+    from utils.openrouter_chat_model import ChatOpenRouter
+
+    return ChatOpenRouter(
         openai_api_base="https://openrouter.ai/api/v1",
-        openai_api_key=os.getenv("OPENROUTER_API_KEY"),
+        openai_api_key=get_settings().openrouter_api_key,
         model_name=model_name,
+        cache=get_llm_cache(),
+        http_client=get_http_client(model_name),
+        # Retries with backoff are handled by the shared client pool
+        max_retries=0,
+        # Streamed calls (the "messages" stream mode) report usage only if asked
+        stream_usage=True,
+        # Lets telemetry attribute model calls to the agent that made them
+        metadata={"agent_name": agent_name},
+        # Ask OpenRouter to report the cost of each call in the usage block
+        extra_body={"usage": {"include": True}},
     )
@@ -0,0 +1,144 @@
+from datetime import datetime, timezone
+from typing import Any, TextIO
+import json
+import sys
+
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+
+STREAM_MODES = ["updates", "messages", "custom"]
+PREVIEW_CHARS = 500
+
+
+def emit_event(message: str, **fields: Any):
+    """
+    Report progress from inside a graph node through the "custom" stream mode,
+    so it is printed, or only written to the events file under --quiet
+    """
+    from langgraph.config import get_stream_writer
+
+    get_stream_writer()({"message": message, **fields})
+
+
+def namespace_label(namespace: tuple[str, ...], node: str | None = None) -> str:
+    """Readable path of a (sub)graph event, e.g. "development > generate > model" """
+    parts = [part.split(":")[0] for part in namespace]
+    if node is not None:
+        parts.append(node)
+    return " > ".join(parts) or "workflow"
+
+
+class ConsoleEventPrinter:
+    """
+    Print streamed workflow events incrementally.
+
+    Model output is printed token by token as it arrives; node updates only
+    print the messages that have not been shown yet (tool calls, tool results,
+    messages created without streaming), so the output never repeats history.
+    """
+
+    def __init__(self, out: TextIO = sys.stdout):
+        self.out = out
+        self._current_source: str | None = None
+        self._seen_ids: set[str] = set()
+        self._streamed_ids: set[str] = set()
+
+    def handle(self, namespace: tuple[str, ...], mode: str, data: Any):
+        if mode == "messages":
+            chunk, metadata = data
+            self._print_token(namespace, chunk, metadata)
+        elif mode == "updates":
+            for node, update in data.items():
+                self._print_update(namespace, node, update)
+        elif mode == "custom" and isinstance(data, dict) and "message" in data:
+            label = namespace_label(namespace, data.get("node"))
+            self._write_line(f"[{label}] {data['message']}")
+        self.out.flush()
+
+    def close(self):
+        self._end_line()
+        self.out.flush()
+
+    def _print_token(self, namespace: tuple[str, ...], chunk: Any, metadata: dict):
+        if not isinstance(chunk, AIMessageChunk) or not chunk.text:
+            return
+
+        source = namespace_label(namespace, metadata.get("langgraph_node"))
+        if source != self._current_source:
+            self._end_line()
+            self.out.write(f"[{source}] ")
+            self._current_source = source
+        self.out.write(chunk.text)
+        if chunk.id:
+            self._streamed_ids.add(chunk.id)
+
+    def _print_update(self, namespace: tuple[str, ...], node: str, update: Any):
+        messages = update.get("messages", []) if isinstance(update, dict) else []
+        if not isinstance(messages, list):
+            messages = [messages]
+
+        label = namespace_label(namespace, node)
+        for message in messages:
+            if not isinstance(message, BaseMessage):
+                continue
+            if message.id is not None:
+                if message.id in self._seen_ids:
+                    continue
+                self._seen_ids.add(message.id)
+
+            if isinstance(message, AIMessage):
+                if message.id not in self._streamed_ids and message.text:
+                    self._write_line(f"[{label}] {_preview(message.text)}")
+                for tool_call in message.tool_calls:
+                    args = _preview(json.dumps(tool_call["args"], default=str))
+                    self._write_line(f"[{label}] -> {tool_call['name']}({args})")
+            else:
+                self._write_line(
+                    f"[{label}] {message.type}: {_preview(str(message.content))}"
+                )
+
+    def _write_line(self, line: str):
+        self._end_line()
+        self.out.write(line + "\n")
+
+    def _end_line(self):
+        if self._current_source is not None:
+            self.out.write("\n")
+            self._current_source = None
+
+
+class FileEventWriter:
+    """Append every streamed event to a JSON Lines file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+
+    def handle(self, namespace: tuple[str, ...], mode: str, data: Any):
+        event = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "namespace": list(namespace),
+            "mode": mode,
+        }
+        if mode == "messages":
+            chunk, metadata = data
+            event["node"] = metadata.get("langgraph_node")
+            event["data"] = chunk
+        else:
+            event["data"] = data
+        self._file.write(json.dumps(event, default=_to_json) + "\n")
+
+    def close(self):
+        self._file.close()
+
+
+def _to_json(value: Any):
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    return str(value)
+
+
+def _preview(text: str) -> str:
+    text = text.strip()
+    if len(text) <= PREVIEW_CHARS:
+        return text
+    return text[:PREVIEW_CHARS] + f"... ({len(text) - PREVIEW_CHARS} more characters)"
@@ -0,0 +1,33 @@
+import hashlib
+import re
+
+_LOCATION_PATTERN = re.compile(r":\d+(:\d+)?")
+_WORD_PATTERN = re.compile(r"\w+")
+_PYRIGHT_ERROR_PATTERN = re.compile(
+    r"^\s*(?P<path>\S.*?):\d+:\d+ - error: (?P<message>.*)$", re.MULTILINE
+)
+
+
+def pyright_errors(output: str) -> list[str]:
+    """Error diagnostics of a pyright text report, as "path: message" lines"""
+    return [
+        f"{match['path']}: {match['message'].strip()}"
+        for match in _PYRIGHT_ERROR_PATTERN.finditer(output)
+    ]
+
+
+def fingerprint_errors(errors: list[str]) -> str:
+    """
+    Build a stable fingerprint for a set of errors.
+
+    Line and column numbers, case, punctuation and whitespace are ignored, so
+    the same errors reported after unrelated edits shift them, or worded with
+    different quoting or formatting, still match.
+    """
+    normalized = sorted(
+        {
+            " ".join(_WORD_PATTERN.findall(_LOCATION_PATTERN.sub("", error).lower()))
+            for error in errors
+        }
+    )
+    return hashlib.sha256("\n".join(normalized).encode("utf-8")).hexdigest()[:16]
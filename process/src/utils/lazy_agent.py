@@ -0,0 +1,32 @@
+from typing import Any, Callable
+import threading
+
+from langchain_core.runnables import Runnable, RunnableConfig
+
+
+class LazyAgent:
+    """
+    Agent built by `factory` on first use.
+
+    Can be invoked like the agent itself or added to a graph as a node, so
+    building a workflow does not construct agents (or import their model and
+    tool dependencies) until a run actually reaches them.
+    """
+
+    def __init__(self, factory: Callable[[], Runnable]):
+        self.factory = factory
+        self._agent: Runnable | None = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Runnable:
+        if self._agent is None:
+            with self._lock:
+                if self._agent is None:
+                    self._agent = self.factory()
+        return self._agent
+
+    def invoke(self, input: Any, config: RunnableConfig | None = None, **kwargs: Any):
+        return self.get().invoke(input, config, **kwargs)
+
+    def __call__(self, state: Any, config: RunnableConfig):
+        return self.invoke(state, config)
@@ -0,0 +1,153 @@
+from contextlib import closing
+import functools
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+import os
+
+from utils.settings import get_settings
+
+
+class DiskLLMCache(BaseCache):
+    """
+    Persistent LLM response cache stored in a SQLite file.
+
+    Entries are keyed by the serialized messages and the model's llm_string,
+    which covers the model name, bound tools and call parameters. Entries older
+    than ttl_seconds are ignored and evicted; once the cache grows beyond
+    max_bytes the least recently used entries are evicted.
+    """
+
+    def __init__(self, path: str, ttl_seconds: int | None, max_bytes: int):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._tokens_saved = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = _cache_key(prompt, llm_string)
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and not self._is_expired(row[1], now):
+                conn.execute(
+                    "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+            else:
+                row = None
+
+        if row is None:
+            with self._lock:
+                self._misses += 1
+            return None
+
+        generations = [loads(item) for item in json.loads(row[0])]
+        with self._lock:
+            self._hits += 1
+            self._tokens_saved += sum(_total_tokens(g) for g in generations)
+        return generations
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        value = json.dumps([dumps(generation) for generation in return_val])
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO responses (key, value, size, created_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (_cache_key(prompt, llm_string), value, len(value), now, now),
+            )
+            self._evict(conn, now)
+
+    def clear(self, **kwargs: Any) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM responses")
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "tokens_saved": self._tokens_saved,
+            }
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        if self.ttl_seconds is not None:
+            conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)
+            )
+
+        total_size = conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+        if total_size <= self.max_bytes:
+            return
+
+        evicted = []
+        for key, size in conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at"
+        ).fetchall():
+            if total_size <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total_size -= size
+        conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and created_at < now - self.ttl_seconds
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+
+def _cache_key(prompt: str, llm_string: str) -> str:
+    return hashlib.sha256(f"{llm_string}\n{prompt}".encode("utf-8")).hexdigest()
+
+
+def _total_tokens(generation: Any) -> int:
+    usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+    return usage.get("total_tokens", 0) if usage else 0
+
+
+@functools.cache
+def get_llm_cache() -> DiskLLMCache | None:
+    """
+    Process-wide response cache, enabled by setting LLM_CACHE_PATH.
+    """
+    settings = get_settings()
+    if not settings.llm_cache_path:
+        return None
+
+    return DiskLLMCache(
+        path=settings.llm_cache_path,
+        ttl_seconds=settings.llm_cache_ttl_seconds,
+        max_bytes=settings.llm_cache_max_bytes,
+    )
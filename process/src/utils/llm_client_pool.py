@@ -0,0 +1,243 @@
+import functools
+import random
+import threading
+import time
+
+import httpx
+
+from utils.settings import get_settings
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class TokenBucket:
+    """
+    Token bucket allowing `rate` requests per second with bursts up to `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated_at) * self.rate
+                )
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Concurrency limit that grows additively on success and halves on throttling (AIMD).
+    """
+
+    def __init__(self, initial_limit: int, max_limit: int):
+        self.limit = float(initial_limit)
+        self.max_limit = max_limit
+        self._in_flight = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            while self._in_flight >= int(self.limit):
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(self, throttled: bool):
+        with self._condition:
+            self._in_flight -= 1
+            if throttled:
+                self.limit = max(1.0, self.limit / 2)
+            else:
+                self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+
+class ClosingByteStream(httpx.SyncByteStream):
+    """Response body that calls `on_close` once, when the response is closed"""
+
+    def __init__(self, stream: httpx.SyncByteStream, on_close):
+        self.stream = stream
+        self.on_close = on_close
+        self._closed = False
+
+    def __iter__(self):
+        yield from self.stream
+
+    def close(self):
+        try:
+            self.stream.close()
+        finally:
+            if not self._closed:
+                self._closed = True
+                self.on_close()
+
+
+class RateLimitedTransport(httpx.BaseTransport):
+    """
+    Transport for a single model that shares the pooled connections of `transport`.
+
+    Every request waits for the model's token bucket and concurrency limiter, and
+    429/5xx responses are retried with jittered exponential backoff (honouring
+    Retry-After). Time spent waiting is tracked separately from request latency.
+
+    A request holds its concurrency slot until its response is closed, so
+    streamed generations count as in flight until the body is consumed, and
+    latency covers the whole body rather than the time to headers.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.BaseTransport,
+        bucket: TokenBucket,
+        limiter: AdaptiveConcurrencyLimiter,
+        max_retries: int,
+    ):
+        self.transport = transport
+        self.bucket = bucket
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self._lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "retries": 0,
+            "throttled": 0,
+            "queue_seconds": 0.0,
+            "latency_seconds": 0.0,
+        }
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+        attempt = 0
+        while True:
+            queued_at = time.monotonic()
+            self.bucket.acquire()
+            self.limiter.acquire()
+            started_at = time.monotonic()
+
+            def finish(
+                throttled: bool,
+                started_at=started_at,
+                queued_at=queued_at,
+                attempt=attempt,
+            ):
+                self.limiter.release(throttled)
+                self._record(
+                    queue_seconds=started_at - queued_at,
+                    latency_seconds=time.monotonic() - started_at,
+                    throttled=throttled,
+                    retry=attempt > 0,
+                )
+
+            try:
+                response = self.transport.handle_request(request)
+            except httpx.TransportError:
+                finish(throttled=True)
+                if attempt >= self.max_retries:
+                    raise
+                response = None
+            except BaseException:
+                finish(throttled=False)
+                raise
+
+            throttled = response is None or response.status_code in RETRY_STATUS_CODES
+            if not throttled or attempt >= self.max_retries:
+                response.stream = ClosingByteStream(
+                    response.stream, functools.partial(finish, throttled)
+                )
+                return response
+
+            delay = self._backoff(attempt, response)
+            if response is not None:
+                response.close()
+                finish(throttled=True)
+            time.sleep(delay)
+            attempt += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+    def _backoff(self, attempt: int, response: httpx.Response | None) -> float:
+        retry_after = response.headers.get("retry-after") if response else None
+        if retry_after:
+            try:
+                return float(retry_after) + random.uniform(0, 1)
+            except ValueError:
+                pass
+        return random.uniform(0, min(60.0, 2**attempt))
+
+    def _record(
+        self, queue_seconds: float, latency_seconds: float, throttled: bool, retry: bool
+    ):
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["retries"] += int(retry)
+            self._stats["throttled"] += int(throttled)
+            self._stats["queue_seconds"] += queue_seconds
+            self._stats["latency_seconds"] += latency_seconds
+
+
+@functools.cache
+def shared_transport() -> httpx.HTTPTransport:
+    """Connection pool shared by every model client in the process"""
+    settings = get_settings()
+    return httpx.HTTPTransport(
+        limits=httpx.Limits(
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_connections,
+        )
+    )
+
+
+_transports: dict[str, RateLimitedTransport] = {}
+_clients: dict[str, httpx.Client] = {}
+_registry_lock = threading.Lock()
+
+
+def get_http_client(model_name: str) -> httpx.Client:
+    """
+    Process-wide HTTP client for a model, rate limited per model.
+    """
+    with _registry_lock:
+        if model_name not in _clients:
+            _clients[model_name] = httpx.Client(
+                transport=_get_transport(model_name),
+                timeout=httpx.Timeout(get_settings().llm_timeout_seconds),
+            )
+        return _clients[model_name]
+
+
+def _get_transport(model_name: str) -> RateLimitedTransport:
+    if model_name not in _transports:
+        settings = get_settings()
+        _transports[model_name] = RateLimitedTransport(
+            transport=shared_transport(),
+            bucket=TokenBucket(
+                rate=settings.llm_requests_per_second,
+                capacity=settings.llm_burst,
+            ),
+            limiter=AdaptiveConcurrencyLimiter(
+                initial_limit=settings.llm_initial_concurrency,
+                max_limit=settings.llm_max_concurrency,
+            ),
+            max_retries=settings.llm_max_retries,
+        )
+    return _transports[model_name]
+
+
+def client_pool_stats() -> dict[str, dict]:
+    """Per-model request, retry and throttling counts with queueing time and latency"""
+    with _registry_lock:
+        return {name: transport.stats() for name, transport in _transports.items()}
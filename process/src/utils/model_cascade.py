@@ -0,0 +1,115 @@
+from typing import Callable
+import threading
+
+from langchain.agents.middleware import AgentMiddleware, ModelRequest, ModelResponse
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, ToolMessage
+
+from utils.create_model import create_model
+from utils.settings import get_settings
+
+LOW_CONFIDENCE_FINISH_REASONS = ("length", "content_filter")
+
+_stats: dict[str, dict[str, int]] = {}
+_stats_lock = threading.Lock()
+
+
+class ModelCascadeMiddleware(AgentMiddleware):
+    """
+    Try a fast, cheap model first and escalate to the agent's own model.
+
+    A call goes straight to the strong model when the previous tool call failed.
+    Otherwise the fast model answers first, and its answer is discarded in favour
+    of the strong model when it raises, fails structured output validation or
+    looks unreliable (truncated, malformed tool calls or empty).
+    """
+
+    def __init__(self, agent_name: str, fast_model: BaseChatModel):
+        self.agent_name = agent_name
+        self.fast_model = fast_model
+
+    def wrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], ModelResponse],
+    ) -> ModelResponse:
+        if _last_tool_failed(request):
+            self._record("tool_error")
+            return handler(request)
+
+        try:
+            response = handler(request.override(model=self.fast_model))
+        except Exception:
+            self._record("fast_model_error")
+            return handler(request)
+
+        reason = _escalation_reason(request, response)
+        if reason is not None:
+            self._record(reason)
+            return handler(request)
+
+        self._record(None)
+        return response
+
+    def _record(self, reason: str | None):
+        with _stats_lock:
+            stats = _stats.setdefault(self.agent_name, {"calls": 0, "escalations": 0})
+            stats["calls"] += 1
+            if reason is not None:
+                stats["escalations"] += 1
+                stats[reason] = stats.get(reason, 0) + 1
+
+
+def _last_tool_failed(request: ModelRequest) -> bool:
+    for message in reversed(request.messages):
+        if not isinstance(message, ToolMessage):
+            return False
+        if message.status == "error" or str(message.content).startswith("Error"):
+            return True
+    return False
+
+
+def _escalation_reason(request: ModelRequest, response: ModelResponse) -> str | None:
+    if request.response_format is not None and any(
+        isinstance(message, ToolMessage) for message in response.result
+    ):
+        if response.structured_response is None:
+            return "schema_validation"
+
+    for message in response.result:
+        if not isinstance(message, AIMessage):
+            continue
+        if message.invalid_tool_calls:
+            return "low_confidence"
+        if (
+            message.response_metadata.get("finish_reason")
+            in LOW_CONFIDENCE_FINISH_REASONS
+        ):
+            return "low_confidence"
+        if not message.tool_calls and not message.text.strip():
+            if response.structured_response is None:
+                return "low_confidence"
+    return None
+
+
+def model_cascade_middleware(agent_name: str):
+    """
+    Cascade for an agent, enabled by setting <AGENT>_FAST_MODEL_NAME
+    (e.g. CODE_QUALITY_AGENT_FAST_MODEL_NAME).
+    """
+    fast_model_name = get_settings().fast_model_names.get(agent_name)
+    if not fast_model_name:
+        return ()
+
+    return (
+        ModelCascadeMiddleware(
+            agent_name=agent_name,
+            fast_model=create_model(fast_model_name, agent_name=agent_name),
+        ),
+    )
+
+
+def model_cascade_stats() -> dict[str, dict[str, int]]:
+    """Model calls, escalations and escalation reasons per agent"""
+    with _stats_lock:
+        return {agent: dict(stats) for agent, stats in _stats.items()}
@@ -0,0 +1,25 @@
+from langchain_core.outputs import ChatGenerationChunk
+from langchain_openai import ChatOpenAI
+
+
+class ChatOpenRouter(ChatOpenAI):
+    """
+    ChatOpenAI that keeps OpenRouter's usage block on streamed calls.
+
+    ChatOpenAI only turns the usage chunk of a stream into token counts, so the
+    cost OpenRouter reports in it would be lost; it is kept as `token_usage` in
+    the response metadata, as for non-streamed calls.
+    """
+
+    def _convert_chunk_to_generation_chunk(
+        self,
+        chunk: dict,
+        default_chunk_class: type,
+        base_generation_info: dict | None,
+    ) -> ChatGenerationChunk | None:
+        generation_chunk = super()._convert_chunk_to_generation_chunk(
+            chunk, default_chunk_class, base_generation_info
+        )
+        if generation_chunk is not None and chunk.get("usage"):
+            generation_chunk.message.response_metadata["token_usage"] = chunk["usage"]
+        return generation_chunk
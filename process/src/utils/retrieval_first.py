@@ -0,0 +1,16 @@
+from utils.settings import get_settings
+
+RETRIEVAL_FIRST_INSTRUCTIONS = """
+
+Retrieval-first mode
+- Answer targeted questions with search_codebase first; use list_codebase for the structure.
+- Call read_codebase only when the search results are not enough to complete the report (for example to confirm a whole module's imports), or when search_codebase returns an error.
+- Prefer several precise searches over reading the whole codebase.
+"""
+
+
+def with_retrieval_first(system_prompt: str) -> str:
+    """System prompt with the retrieval-first instructions, if RETRIEVAL_FIRST is set"""
+    if not get_settings().retrieval_first:
+        return system_prompt
+    return system_prompt + RETRIEVAL_FIRST_INSTRUCTIONS
@@ -0,0 +1,94 @@
+from collections import OrderedDict
+import functools
+import sys
+import threading
+from typing import Hashable
+
+from utils.settings import get_settings
+
+
+def normalize_query(query: str) -> str:
+    """
+    Queries that embed identically: the embedding model is uncased and
+    ignores repeated whitespace.
+    """
+    return " ".join(query.split()).casefold()
+
+
+def _result_size(results: list[tuple]) -> int:
+    return sys.getsizeof(results) + sum(
+        sum(sys.getsizeof(value) for value in row) for row in results
+    )
+
+
+class SearchResultCache:
+    """
+    In-memory cache of search_codebase results.
+
+    Keys include the index version, so results cached before the index changed
+    are never returned again; they are evicted as least recently used once the
+    cache grows beyond max_bytes.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, tuple[list[tuple], int]] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._uncached = 0
+        self._evictions = 0
+
+    def get(self, key: Hashable) -> list[tuple] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, results: list[tuple]):
+        size = _result_size(results)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries.pop(key)[1]
+            self._entries[key] = (results, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                self._evictions += 1
+
+    def record_uncached(self):
+        """Count a search that could not be cached because the index is unversioned"""
+        with self._lock:
+            self._uncached += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "uncached": self._uncached,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "evictions": self._evictions,
+            }
+
+
+@functools.cache
+def get_search_cache() -> SearchResultCache | None:
+    """
+    Process-wide search result cache, disabled by setting SEARCH_CACHE_MAX_BYTES=0.
+    """
+    max_bytes = get_settings().search_cache_max_bytes
+    if max_bytes <= 0:
+        return None
+    return SearchResultCache(max_bytes)
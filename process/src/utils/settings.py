@@ -0,0 +1,212 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field, replace
+import functools
+import os
+import typing
+
+from dotenv import load_dotenv
+
+FAST_MODEL_SUFFIX = "_FAST_MODEL_NAME"
+
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    Configuration of a run, read from the environment and .env once.
+
+    See process/.env.example for what each variable does. A run can override
+    any field through config["configurable"]["settings"], so one process can
+    serve several repositories (see get_settings).
+    """
+
+    openrouter_api_key: str | None = None
+    cocoindex_database_url: str | None = None
+    project_id: str | None = None
+    vector_storage: str = "vector"
+    search_rerank_candidates: int = 50
+    search_cache_max_bytes: int = 64 * 1024 * 1024
+    reindex_on_edit: bool = False
+    index_languages: str = "python,text"
+
+    tool_output_max_chars: int = 50_000
+
+    terminal_timeout_seconds: float = 60
+    terminal_sandbox: bool = False
+    terminal_cpu_seconds: int = 300
+    terminal_memory_mb: int = 4096
+    terminal_max_processes: int = 256
+    terminal_max_output_bytes: int = 10 * 1024 * 1024
+
+    test_workers: int = 4
+    test_timeout_seconds: float = 300
+
+    data_dir_path: str | None = None
+    input_dir_path: str | None = None
+    input_dir_python_path: str | None = None
+
+    code_analyst_agent_model_name: str | None = None
+    domain_context_agent_model_name: str | None = None
+    data_governance_agent_model_name: str | None = None
+    synthesizer_agent_model_name: str | None = None
+    task_planner_agent_model_name: str | None = None
+    task_iterator_agent_model_name: str | None = None
+    implementation_agent_model_name: str | None = None
+    code_quality_agent_model_name: str | None = None
+    # Agent name -> model tried before the agent's own model (<AGENT>_FAST_MODEL_NAME)
+    fast_model_names: dict[str, str] = field(default_factory=dict)
+
+    debug: bool = False
+
+    development_history_token_budget: int = 60000
+    development_max_escalations: int = 1
+    development_scheduler: str = "llm"
+    development_max_workers: int = 2
+
+    llm_cache_path: str | None = None
+    llm_cache_ttl_seconds: int | None = None
+    llm_cache_max_bytes: int = 512 * 1024 * 1024
+
+    llm_requests_per_second: float = 2
+    llm_burst: float = 5
+    llm_initial_concurrency: int = 4
+    llm_max_concurrency: int = 16
+    llm_max_retries: int = 6
+    llm_max_connections: int = 32
+    llm_timeout_seconds: float = 600
+
+    discovery_stable_prefix: bool = False
+    discovery_sharded: bool = False
+    discovery_shard_max_chars: int = 200_000
+    discovery_shard_concurrency: int = 4
+    retrieval_first: bool = False
+
+    checkpoint_db_path: str | None = None
+    telemetry_dir_path: str | None = None
+
+    @property
+    def output_dir(self) -> str:
+        if not self.data_dir_path:
+            raise ValueError("DATA_DIR_PATH is not set")
+        return os.path.join(self.data_dir_path, "output")
+
+    @classmethod
+    def parse(cls, name: str, value: str):
+        """Value of a field from its environment variable string"""
+        settings_field = cls.__dataclass_fields__[name]
+        if settings_field.type is bool:
+            return value.lower() in ("true", "1", "yes", "y")
+        elif settings_field.type in (int, int | None):
+            return int(value)
+        elif settings_field.type is float:
+            return float(value)
+        return value
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        values = {}
+        for name in cls.__dataclass_fields__:
+            value = os.getenv(name.upper())
+            if name == "fast_model_names" or value is None or value == "":
+                continue
+            values[name] = cls.parse(name, value)
+
+        values["fast_model_names"] = {
+            name.removesuffix(FAST_MODEL_SUFFIX).lower(): value
+            for name, value in os.environ.items()
+            if name.endswith(FAST_MODEL_SUFFIX) and value
+        }
+        return cls(**values)
+
+    @classmethod
+    def convert(cls, name: str, value):
+        """
+        Value of a field from an override: strings are parsed like the
+        environment's, other values must already have the field's type.
+
+        Raises:
+            ValueError: If the value does not fit the field
+        """
+        field_type = cls.__dataclass_fields__[name].type
+        if typing.get_origin(field_type) is dict:
+            if isinstance(value, dict) and all(
+                isinstance(item, str) for pair in value.items() for item in pair
+            ):
+                return value
+        elif isinstance(value, str):
+            return cls.parse(name, value)
+        else:
+            allowed = typing.get_args(field_type) or (field_type,)
+            if field_type is float and type(value) is int:
+                return float(value)
+            # bool is an int subclass, but not a valid int setting
+            if isinstance(value, allowed) and (
+                not isinstance(value, bool) or bool in allowed
+            ):
+                return value
+        expected = field_type.__name__ if isinstance(field_type, type) else field_type
+        raise ValueError(f"Invalid value for {name}: {value!r} (expected {expected})")
+
+    def with_overrides(self, overrides: dict) -> "Settings":
+        """
+        Copy with some fields replaced. Keys are field names or their
+        environment variable names; string values are parsed like the
+        environment's, and empty ones are ignored.
+
+        Raises:
+            ValueError: On an unknown setting or a value of the wrong type
+        """
+        values = {}
+        for key, value in overrides.items():
+            name = key.lower()
+            if name not in self.__dataclass_fields__:
+                raise ValueError(f"Unknown setting: {key}")
+            if value == "":
+                continue
+            values[name] = self.convert(name, value)
+        return replace(self, **values)
+
+
+# Overrides of the current run when there is no graph config, e.g. while the
+# graph is built (see use_run_settings)
+_run_settings: ContextVar[dict | None] = ContextVar("run_settings", default=None)
+
+
+@functools.cache
+def load_settings() -> Settings:
+    """Process-wide settings, loading .env on first use"""
+    load_dotenv()
+    return Settings.from_env()
+
+
+def run_settings_overrides() -> dict:
+    """Settings overrides of the current run, from the graph config first"""
+    from langchain_core.runnables.config import var_child_runnable_config
+
+    config = var_child_runnable_config.get() or {}
+    overrides = config.get("configurable", {}).get("settings")
+    if overrides is None:
+        overrides = _run_settings.get()
+    return overrides or {}
+
+
+def get_settings() -> Settings:
+    """
+    Settings of the current run: the process settings with the overrides in
+    config["configurable"]["settings"] of the running graph, or of the
+    enclosing use_run_settings block.
+    """
+    overrides = run_settings_overrides()
+    if not overrides:
+        return load_settings()
+    return load_settings().with_overrides(overrides)
+
+
+@contextmanager
+def use_run_settings(overrides: dict | None):
+    """Apply settings overrides to get_settings calls in this context"""
+    token = _run_settings.set(overrides or None)
+    try:
+        yield
+    finally:
+        _run_settings.reset(token)
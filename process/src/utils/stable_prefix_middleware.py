@@ -0,0 +1,84 @@
+from typing import Callable
+import functools
+import threading
+
+from langchain.agents.middleware import AgentMiddleware, ModelRequest, ModelResponse
+from langchain_core.messages import AIMessage, SystemMessage
+
+from agents.tools.read_codebase_tool import ReadCodebaseTool
+
+# Providers routed through OpenRouter that need explicit cache_control markers;
+# the others (OpenAI, DeepSeek, ...) cache identical prompt prefixes automatically.
+CACHE_MARKER_MODEL_PREFIXES = ("anthropic/", "google/gemini")
+
+PREFIX_NOTE = (
+    "The full content of the input codebase is included at the start of this prompt. "
+    "Use it instead of calling read_codebase to read the whole codebase again."
+)
+
+_stats: dict[str, dict[str, int]] = {}
+_stats_lock = threading.Lock()
+
+
+@functools.cache
+def codebase_snapshot(root_dir: str) -> str:
+    """
+    Content of every file under root_dir in a stable order, read once per process.
+    """
+    return ReadCodebaseTool(root_dir=root_dir, spill=False)._run()
+
+
+class StablePrefixMiddleware(AgentMiddleware):
+    """
+    Put shared codebase content at the very start of every model request.
+
+    Agents that use the same prefix send byte-identical leading tokens, so the
+    provider can serve them from its prompt cache. The agent's own system prompt
+    follows the prefix. Cached and uncached input tokens are recorded per agent.
+    """
+
+    def __init__(self, agent_name: str, model_name: str, prefix: Callable[[], str]):
+        self.agent_name = agent_name
+        self.prefix = prefix
+        self.cache_markers = model_name.startswith(CACHE_MARKER_MODEL_PREFIXES)
+
+    def wrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], ModelResponse],
+    ) -> ModelResponse:
+        prefix_block = {"type": "text", "text": self.prefix()}
+        if self.cache_markers:
+            prefix_block["cache_control"] = {"type": "ephemeral"}
+
+        system_prompt = f"{PREFIX_NOTE}\n\n{request.system_prompt or ''}".strip()
+        system_message = SystemMessage(
+            content=[prefix_block, {"type": "text", "text": system_prompt}]
+        )
+        response = handler(
+            request.override(
+                system_prompt=None,
+                messages=[system_message, *request.messages],
+            )
+        )
+
+        for message in response.result:
+            if isinstance(message, AIMessage) and message.usage_metadata:
+                self._record(message.usage_metadata)
+        return response
+
+    def _record(self, usage: dict):
+        input_tokens = usage.get("input_tokens", 0)
+        cached = usage.get("input_token_details", {}).get("cache_read", 0) or 0
+        with _stats_lock:
+            stats = _stats.setdefault(
+                self.agent_name, {"cached_input_tokens": 0, "uncached_input_tokens": 0}
+            )
+            stats["cached_input_tokens"] += cached
+            stats["uncached_input_tokens"] += input_tokens - cached
+
+
+def prompt_cache_stats() -> dict[str, dict[str, int]]:
+    """Cached vs uncached input tokens per agent"""
+    with _stats_lock:
+        return {agent: dict(stats) for agent, stats in _stats.items()}
@@ -0,0 +1,297 @@
+from collections import defaultdict
+from datetime import datetime, timezone
+import json
+import threading
+import time
+from typing import Any
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+DEVELOPMENT_NODES = ("generate", "check", "reflect", "escalate", "compact")
+
+
+class TelemetryCallbackHandler(BaseCallbackHandler):
+    """
+    Local, offline telemetry for the pipeline.
+
+    Records wall time, token usage, cost and errors for every model call (per
+    agent, taken from the model's `agent_name` metadata), every tool call (per
+    agent and tool) and every development loop node (per iteration). Events are
+    appended to events.jsonl as they happen; aggregated counters are written to
+    metrics.prom in the Prometheus text format by `flush`.
+    """
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        self.events_path = f"{output_dir}/events.jsonl"
+        self.metrics_path = f"{output_dir}/metrics.prom"
+        self._lock = threading.Lock()
+        self._parents: dict[UUID, UUID | None] = {}
+        self._agents: dict[UUID, str] = {}
+        self._iterations: dict[UUID, int] = {}
+        self._generate_counts: dict[UUID | None, int] = defaultdict(int)
+        self._started: dict[UUID, tuple[float, dict]] = {}
+        self.agent_totals: dict[str, dict[str, float]] = defaultdict(
+            lambda: defaultdict(float)
+        )
+        self.tool_totals: dict[tuple[str, str], dict[str, float]] = defaultdict(
+            lambda: defaultdict(float)
+        )
+
+    def on_chain_start(
+        self,
+        serialized: dict[str, Any],
+        inputs: Any,
+        *,
+        run_id: UUID,
+        parent_run_id: UUID | None = None,
+        name: str | None = None,
+        **kwargs: Any,
+    ):
+        with self._lock:
+            self._parents[run_id] = parent_run_id
+            if name in DEVELOPMENT_NODES:
+                if name == "generate":
+                    self._generate_counts[parent_run_id] += 1
+                self._iterations[run_id] = self._generate_counts[parent_run_id]
+                self._started[run_id] = (time.perf_counter(), {"node": name})
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any):
+        self._finish_node(run_id, error=False)
+        self._forget(run_id)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        self._finish_node(run_id, error=True)
+        self._forget(run_id)
+
+    def on_chat_model_start(
+        self,
+        serialized: dict[str, Any],
+        messages: list,
+        *,
+        run_id: UUID,
+        parent_run_id: UUID | None = None,
+        metadata: dict[str, Any] | None = None,
+        **kwargs: Any,
+    ):
+        agent = (metadata or {}).get("agent_name") or "unknown"
+        with self._lock:
+            self._parents[run_id] = parent_run_id
+            ancestor = parent_run_id
+            while ancestor is not None:
+                self._agents.setdefault(ancestor, agent)
+                ancestor = self._parents.get(ancestor)
+            self._started[run_id] = (
+                time.perf_counter(),
+                {"agent": agent, "iteration": self._iteration(run_id)},
+            )
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any):
+        usage = {"input_tokens": 0, "output_tokens": 0}
+        cost = 0.0
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                if message is None:
+                    continue
+                usage_metadata = getattr(message, "usage_metadata", None) or {}
+                usage["input_tokens"] += usage_metadata.get("input_tokens", 0)
+                usage["output_tokens"] += usage_metadata.get("output_tokens", 0)
+                token_usage = message.response_metadata.get("token_usage") or {}
+                cost += token_usage.get("cost") or 0.0
+        self._finish_llm(run_id, error=False, cost=cost, **usage)
+        self._forget(run_id)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        self._finish_llm(run_id, error=True, cost=0.0, input_tokens=0, output_tokens=0)
+        self._forget(run_id)
+
+    def on_tool_start(
+        self,
+        serialized: dict[str, Any],
+        input_str: str,
+        *,
+        run_id: UUID,
+        parent_run_id: UUID | None = None,
+        **kwargs: Any,
+    ):
+        tool = serialized.get("name") or kwargs.get("name") or "unknown"
+        with self._lock:
+            self._parents[run_id] = parent_run_id
+            self._started[run_id] = (
+                time.perf_counter(),
+                {
+                    "agent": self._agent(run_id),
+                    "tool": tool,
+                    "iteration": self._iteration(run_id),
+                },
+            )
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any):
+        self._finish_tool(run_id, error=False)
+        self._forget(run_id)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        self._finish_tool(run_id, error=True)
+        self._forget(run_id)
+
+    def flush(self):
+        """Write the aggregated counters to metrics.prom"""
+        lines = []
+        with self._lock:
+            for metric, key, help_text in (
+                ("pipeline_llm_calls_total", "calls", "Model calls"),
+                ("pipeline_llm_errors_total", "errors", "Failed model calls"),
+                ("pipeline_llm_seconds_total", "seconds", "Model call wall time"),
+                ("pipeline_llm_input_tokens_total", "input_tokens", "Input tokens"),
+                ("pipeline_llm_output_tokens_total", "output_tokens", "Output tokens"),
+                ("pipeline_llm_cost_total", "cost", "Model cost reported by the API"),
+            ):
+                lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+                for agent, totals in sorted(self.agent_totals.items()):
+                    lines.append(f'{metric}{{agent="{agent}"}} {totals[key]}')
+
+            for metric, key, help_text in (
+                ("pipeline_tool_calls_total", "calls", "Tool calls"),
+                ("pipeline_tool_errors_total", "errors", "Failed tool calls"),
+                ("pipeline_tool_seconds_total", "seconds", "Tool call wall time"),
+            ):
+                lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+                for (agent, tool), totals in sorted(self.tool_totals.items()):
+                    lines.append(
+                        f'{metric}{{agent="{agent}",tool="{tool}"}} {totals[key]}'
+                    )
+
+        with open(self.metrics_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def append_agent_tokens(self, path: str, labels: dict):
+        """
+        Append this run's token usage per agent to a JSON Lines file, tagged with
+        `labels`, so runs with different settings can be compared.
+        """
+        timestamp = datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            rows = [
+                {
+                    "timestamp": timestamp,
+                    **labels,
+                    "agent": agent,
+                    "calls": int(totals["calls"]),
+                    "input_tokens": int(totals["input_tokens"]),
+                    "output_tokens": int(totals["output_tokens"]),
+                }
+                for agent, totals in sorted(self.agent_totals.items())
+            ]
+        with open(path, "a", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+
+    def summary(self, top: int = 10) -> str:
+        """Table of the agents and tools with the most wall time and tokens"""
+        with self._lock:
+            rows = [
+                (
+                    agent,
+                    totals["seconds"],
+                    totals["input_tokens"] + totals["output_tokens"],
+                )
+                for agent, totals in self.agent_totals.items()
+            ] + [
+                (f"{agent} / {tool}", totals["seconds"], 0)
+                for (agent, tool), totals in self.tool_totals.items()
+            ]
+
+        by_time = sorted(rows, key=lambda row: row[1], reverse=True)[:top]
+        by_tokens = sorted(
+            (row for row in rows if row[2]), key=lambda row: row[2], reverse=True
+        )[:top]
+
+        width = max([len(row[0]) for row in rows] + [10])
+        lines = [f"{'Top time consumers':<{width}}  {'seconds':>10}"]
+        lines += [f"{name:<{width}}  {seconds:>10.1f}" for name, seconds, _ in by_time]
+        lines += ["", f"{'Top token consumers':<{width}}  {'tokens':>10}"]
+        lines += [f"{name:<{width}}  {tokens:>10.0f}" for name, _, tokens in by_tokens]
+        return "\n".join(lines)
+
+    def _finish_llm(self, run_id: UUID, error: bool, cost: float, **tokens: int):
+        with self._lock:
+            started = self._started.pop(run_id, None)
+            if started is None:
+                return
+            start_time, event = started
+            seconds = time.perf_counter() - start_time
+            totals = self.agent_totals[event["agent"]]
+            totals["calls"] += 1
+            totals["errors"] += int(error)
+            totals["seconds"] += seconds
+            totals["cost"] += cost
+            for key, value in tokens.items():
+                totals[key] += value
+        self._write_event(
+            {"type": "llm", **event, "seconds": seconds, "error": error, "cost": cost}
+            | tokens
+        )
+
+    def _finish_tool(self, run_id: UUID, error: bool):
+        with self._lock:
+            started = self._started.pop(run_id, None)
+            if started is None:
+                return
+            start_time, event = started
+            seconds = time.perf_counter() - start_time
+            totals = self.tool_totals[(event["agent"], event["tool"])]
+            totals["calls"] += 1
+            totals["errors"] += int(error)
+            totals["seconds"] += seconds
+        self._write_event({"type": "tool", **event, "seconds": seconds, "error": error})
+
+    def _finish_node(self, run_id: UUID, error: bool):
+        with self._lock:
+            started = self._started.pop(run_id, None)
+            if started is None:
+                return
+            start_time, event = started
+            iteration = self._iterations.get(run_id)
+        self._write_event(
+            {
+                "type": "development_iteration",
+                **event,
+                "iteration": iteration,
+                "seconds": time.perf_counter() - start_time,
+                "error": error,
+            }
+        )
+
+    def _forget(self, run_id: UUID):
+        """Drop a finished run; its descendants have finished before it"""
+        with self._lock:
+            self._parents.pop(run_id, None)
+            self._agents.pop(run_id, None)
+            self._iterations.pop(run_id, None)
+            self._generate_counts.pop(run_id, None)
+            self._started.pop(run_id, None)
+
+    def _agent(self, run_id: UUID) -> str:
+        ancestor = self._parents.get(run_id)
+        while ancestor is not None:
+            if ancestor in self._agents:
+                return self._agents[ancestor]
+            ancestor = self._parents.get(ancestor)
+        return "unknown"
+
+    def _iteration(self, run_id: UUID) -> int | None:
+        ancestor = self._parents.get(run_id)
+        while ancestor is not None:
+            if ancestor in self._iterations:
+                return self._iterations[ancestor]
+            ancestor = self._parents.get(ancestor)
+        return None
+
+    def _write_event(self, event: dict):
+        event = {"timestamp": datetime.now(timezone.utc).isoformat(), **event}
+        with self._lock:
+            with open(self.events_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(event) + "\n")
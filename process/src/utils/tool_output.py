@@ -0,0 +1,52 @@
+import hashlib
+
+from utils.settings import get_settings
+import os
+
+PREVIEW_LINES = 40
+
+
+def artifacts_dir() -> str:
+    return os.path.join(get_settings().output_dir, "artifacts")
+
+
+def artifact_path(handle: str) -> str | None:
+    """Path of a stored artifact, or None if the handle does not name one"""
+    if os.path.basename(handle) != handle or not handle.endswith(".txt"):
+        return None
+    path = os.path.join(artifacts_dir(), handle)
+    return path if os.path.isfile(path) else None
+
+
+def spill_output(tool_name: str, output: str) -> str:
+    """
+    Output to return to the model for a tool call.
+
+    Outputs longer than TOOL_OUTPUT_MAX_CHARS are written to output/artifacts/
+    and replaced by a head/tail preview with the artifact's handle, which
+    read_artifact accepts to fetch line or byte ranges on demand.
+    """
+    max_chars = get_settings().tool_output_max_chars
+    if max_chars <= 0 or len(output) <= max_chars:
+        return output
+
+    data = output.encode("utf-8")
+    handle = f"{tool_name}-{hashlib.sha256(data).hexdigest()[:16]}.txt"
+    os.makedirs(artifacts_dir(), exist_ok=True)
+    path = os.path.join(artifacts_dir(), handle)
+    if not os.path.exists(path):
+        with open(path, "wb") as f:
+            f.write(data)
+
+    lines = output.splitlines()
+    budget = max_chars // 2
+    head = "\n".join(lines[:PREVIEW_LINES])[:budget]
+    tail = "\n".join(lines[-PREVIEW_LINES:])[-budget:]
+    return (
+        f"{head}\n\n"
+        f"... [output too large: {len(lines)} lines, {len(data)} bytes. "
+        f"The full output is stored as artifact '{handle}'; call read_artifact with "
+        f"this handle and a line range (start_line/end_line) or byte range "
+        f"(start_byte/end_byte) to read the parts you need] ...\n\n"
+        f"{tail}"
+    )